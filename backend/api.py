@@ -3,9 +3,10 @@ from flask_cors import CORS
 import json
 import os
 import traceback
-from analyze_repo import analyze_suspect_repo
+from analyze_repo import analyze_suspect_repo, get_topic_extractor
 from github_search import search_github_repos
 from repo_utils import clone_repo
+from workspace import Workspace
 from compare_utils import (
     compare_file_structure,
     cosine_similarity_text,
@@ -34,6 +35,8 @@ def analyze_plagiarism():
         "max_candidates": 5    // optional, defaults to 5
     }
     """
+    # Checkouts of this request live in their own workspace, removed at the end
+    workspace = None
     try:
         data = request.get_json()
         
@@ -52,7 +55,8 @@ def analyze_plagiarism():
         
         # Step 1: Analyze the suspect repository
         print(f"🔍 Step 1: Analyzing suspect repo: {repo_url}")
-        suspect_info = analyze_suspect_repo(repo_url)
+        workspace = Workspace.create(label="api")
+        suspect_info = analyze_suspect_repo(repo_url, workspace.subdir("suspect"))
         print(f"✅ Suspect repo analyzed: {suspect_info['repo_name']} by {suspect_info['repo_owner']}")
         print(f"📝 Topic: {suspect_info['topic']}")
         print(f"🏷️  Keywords: {', '.join(suspect_info['keywords'][:5])}...")  # Show first 5 keywords
@@ -104,7 +108,7 @@ def analyze_plagiarism():
                 print(f"🔍 Step 3.{i}: Analyzing candidate {i}/{len(candidate_repos)}: {repo['html_url']}")
                 
                 # Clone candidate repository
-                candidate_dir = os.path.join("candidates", repo["full_name"].replace("/", "_"))
+                candidate_dir = workspace.subdir("candidates", repo["full_name"])
                 print(f"📥 Cloning {repo['full_name']}...")
                 clone_repo(repo["html_url"], candidate_dir)
                 
@@ -197,6 +201,9 @@ def analyze_plagiarism():
             "error": "Internal server error",
             "message": error_message
         }), 500
+    finally:
+        if workspace:
+            workspace.cleanup()
 
 @app.route('/analyze-repo-only', methods=['POST'])
 def analyze_repo_only():
@@ -218,8 +225,19 @@ def analyze_repo_only():
         if not repo_url:
             return jsonify({"error": "repo_url is required"}), 400
         
-        # Analyze the repository
-        suspect_info = analyze_suspect_repo(repo_url)
+        # Analyze the repository; bypass_cache forces a fresh Gemini call and
+        # topic_extractor picks "auto", "gemini" or "local" (offline)
+        try:
+            topic_extractor = get_topic_extractor(data.get('topic_extractor'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        with Workspace.create(label="api-repo-only") as workspace:
+            suspect_info = analyze_suspect_repo(
+                repo_url,
+                workspace.subdir("suspect"),
+                bypass_cache=bool(data.get('bypass_cache')),
+                topic_extractor=topic_extractor
+            )
         
         return jsonify({
             "repo_name": suspect_info['repo_name'],
@@ -227,7 +245,7 @@ def analyze_repo_only():
             "repo_url": repo_url,
             "topic": suspect_info['topic'],
             "keywords": suspect_info['keywords'],
-            "local_path": suspect_info['local_path']
+            "topic_source": suspect_info['topic_source']
         })
         
     except Exception as e:
@@ -1,21 +1,42 @@
+import threading
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
-import os
 
-# Load environment variables
+# Load .env into the environment for libraries and subprocesses that read it
+# directly; the app's own settings go through utils.config_loader.get_settings()
 load_dotenv()
 
 # Import routes
-from routes.auth import auth_bp
-from routes.plagiarism import plagiarism_bp
+from routes.auth import auth_bp, user_model
+from routes.plagiarism import plagiarism_bp, job_queue, result_model
+from utils.analysis_coalescer import analysis_coalescer
+from utils.clone_cache import clone_cache
+from utils.fingerprint_store import fingerprint_store
+from utils.github_cache import github_cache
+from utils.github_client import get_github_client
+from utils.gemini_cache import gemini_cache
+from utils.user_cache import user_cache
+from utils.workspace import sweep_orphaned_workspaces
+from utils.config_loader import get_settings, install_reload_handlers
+from middleware.auth import auth_required
+
+def ensure_indexes(*models):
+    """Create every model's MongoDB indexes (idempotent)"""
+    if all([model.ensure_indexes() for model in models]):
+        print("🗂️  MongoDB indexes ensured")
 
 def create_app():
     app = Flask(__name__)
     
-    # Configuration
-    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+    # Configuration is loaded once and validated here; SIGHUP reloads it
+    settings = get_settings()
+    for problem in settings.validate():
+        print(f"⚠️  Config: {problem}")
+    install_reload_handlers()
+    
+    app.config['JWT_SECRET_KEY'] = settings.jwt_secret_key
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False  # Tokens don't expire (you can set timedelta for expiration)
     
     # Initialize extensions
@@ -26,6 +47,20 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(plagiarism_bp, url_prefix='/api/plagiarism')
     
+    # Drop scratch directories and half-written cache entries from crashed runs
+    sweep_orphaned_workspaces()
+    clone_cache.sweep_stale_tmp()
+    
+    # Indexes are built in the background so startup never waits on MongoDB
+    if settings.get_bool('MONGODB_ENSURE_INDEXES', True):
+        threading.Thread(
+            target=ensure_indexes, args=(user_model, result_model), name="ensure-indexes", daemon=True
+        ).start()
+    
+    # Resume analysis jobs queued before the last restart
+    if settings.get_bool('ANALYSIS_WORKERS_AUTOSTART', True):
+        job_queue.start()
+    
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
     def health_check():
@@ -36,6 +71,23 @@ def create_app():
             "version": "2.0.0"
         })
     
+    # Cache and worker counters for monitoring; off unless METRICS_ENABLED, and
+    # only for signed-in users since they expose usage of the whole service
+    if settings.get_bool('METRICS_ENABLED', False):
+        @app.route('/api/metrics', methods=['GET'])
+        @auth_required
+        def metrics():
+            """Operational metrics"""
+            return jsonify({
+                "analysis_coalescer": analysis_coalescer.stats(),
+                "clone_cache": clone_cache.stats(),
+                "fingerprint_store": fingerprint_store.stats(),
+                "github_cache": github_cache.stats(),
+                "github_client": get_github_client().stats(),
+                "gemini_cache": gemini_cache.stats(),
+                "user_cache": user_cache.stats()
+            })
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
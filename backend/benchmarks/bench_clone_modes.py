@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the clone modes in utils/repo_utils.py against local fixture repos.
+
+Builds throwaway git repositories with history and binary assets, serves
+them over file:// (so --depth and --filter are honoured) and reports
+elapsed time, bytes received into .git and bytes checked out per mode.
+
+Usage: python benchmarks/bench_clone_modes.py [--commits N] [--files N]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.repo_utils import CLONE_MODES, clone_repo, directory_size
+
+
+def git(*args, cwd=None):
+    subprocess.run(["git", *args], cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def build_fixture(path, commits, files_per_commit, asset_bytes):
+    """Create a repo whose history is much larger than its working tree"""
+    os.makedirs(path)
+    git("init", "-q", cwd=path)
+    git("config", "user.email", "bench@example.com", cwd=path)
+    git("config", "user.name", "bench", cwd=path)
+    git("config", "uploadpack.allowFilter", "true", cwd=path)
+    os.makedirs(os.path.join(path, "src"))
+    os.makedirs(os.path.join(path, "assets"))
+    with open(os.path.join(path, "README.md"), "w") as f:
+        f.write("# Fixture\n")
+
+    for c in range(commits):
+        for i in range(files_per_commit):
+            with open(os.path.join(path, "src", f"module_{i}.py"), "w") as f:
+                f.write(f"def f_{i}():\n    return {c * files_per_commit + i}\n" * 20)
+        with open(os.path.join(path, "assets", f"image_{c % 5}.png"), "wb") as f:
+            f.write(os.urandom(asset_bytes))
+        git("add", "-A", cwd=path)
+        git("commit", "-q", "-m", f"commit {c}", cwd=path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commits", type=int, default=40)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--asset-bytes", type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="plaghunt_bench_")
+    try:
+        fixture = os.path.join(workdir, "fixture")
+        print(f"Building fixture: {args.commits} commits x {args.files} files...")
+        build_fixture(fixture, args.commits, args.files, args.asset_bytes)
+        url = f"file://{fixture}"
+
+        print(f"\n{'mode':<10}{'seconds':>10}{'.git bytes':>14}{'checkout bytes':>16}{'files':>8}")
+        for mode in CLONE_MODES:
+            target = os.path.join(workdir, f"clone_{mode}")
+            start = time.perf_counter()
+            clone_repo(url, target, mode=mode, max_bytes=0, timeout=0)
+            elapsed = time.perf_counter() - start
+
+            git_bytes = directory_size(os.path.join(target, ".git"))
+            checkout_bytes = directory_size(target) - git_bytes
+            file_count = sum(len(files) for root, _, files in os.walk(target) if ".git" not in root)
+            print(f"{mode:<10}{elapsed:>10.2f}{git_bytes:>14,}{checkout_bytes:>16,}{file_count:>8}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
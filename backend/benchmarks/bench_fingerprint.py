@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare winnowing fingerprints with path-matched TF-IDF on a plagiarism
+fixture where the copied files were renamed, moved and had identifiers
+renamed.
+
+Usage: python benchmarks/bench_fingerprint.py [--files N] [--functions N]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compare_utils import compare_code_files
+from utils.fingerprint import fingerprint_repository, compare_fingerprints
+
+
+STATEMENTS = [
+    "    for {i} in range({a}):\n        if {i} % {n} == {m}:\n            {c}.append({i} {op} {b})\n",
+    "    while len({c}) < {n}:\n        {c}.append({b} {op} len({c}))\n",
+    "    {c} = [x {op} {n} for x in {c} if x > {m}]\n",
+    "    try:\n        {b} = int({b}) // {n}\n    except ValueError:\n        {b} = {m}\n",
+    "    if {a} and not {b}:\n        return {c}[:{n}]\n",
+    "    {c}.extend(sorted(set({c}), key=lambda x: (x % {n}, -x)))\n",
+    "    with open('{name}.txt') as handle:\n        {c} += [len(line) for line in handle]\n",
+    "    {c} = {{k: v {op} {m} for k, v in enumerate({c})}}\n",
+]
+
+OTHER_STATEMENTS = [
+    "    {c}.append({{'id': {n}, 'name': str({a})}})\n",
+    "    print(f'{{{a}}} -> {{{b}}}')\n",
+    "    assert isinstance({a}, (list, tuple)), {n}\n",
+    "    {c}.sort(reverse={a} is None)\n",
+    "    {b} = {b} or dict()\n    {b}.setdefault('count', 0)\n",
+    "    yield from reversed({c})\n",
+]
+
+def make_function(rng, name, statements=STATEMENTS):
+    a, b, c, i = (f"{name}_{x}" for x in "abci")
+    body = [f"def {name}({a}, {b}):\n", f"    {c} = []\n"]
+    for _ in range(rng.randint(4, 10)):
+        body.append(rng.choice(statements).format(
+            a=a, b=b, c=c, i=i, name=name, op=rng.choice(["+", "-", "*"]),
+            n=rng.randint(2, 99), m=rng.randint(0, 9)
+        ))
+    body.append(f"    return {c}\n\n")
+    return "".join(body)
+
+def build_repos(root, files, functions, seed=7):
+    rng = random.Random(seed)
+    suspect = os.path.join(root, "suspect")
+    copied = os.path.join(root, "copied")
+    unrelated = os.path.join(root, "unrelated")
+    for path in (suspect, copied, unrelated):
+        os.makedirs(path)
+
+    for i in range(files):
+        source = "".join(make_function(rng, f"func_{i}_{j}") for j in range(functions))
+        with open(os.path.join(suspect, f"module_{i}.py"), "w") as f:
+            f.write(source)
+
+        # Plagiarised copy: moved into a package, renamed file, renamed identifiers
+        renamed = source.replace(f"func_{i}_", f"helper{i}_").replace("item", "value")
+        package = os.path.join(copied, "lib", f"pkg{i % 5}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"renamed_{i}.py"), "w") as f:
+            f.write(renamed)
+
+        other_rng = random.Random(seed + 1000 + i)
+        unrelated_source = "".join(make_function(other_rng, f"other_{i}_{j}", OTHER_STATEMENTS) for j in range(functions))
+        with open(os.path.join(unrelated, f"module_{i}.py"), "w") as f:
+            f.write(unrelated_source)
+
+    return suspect, copied, unrelated
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def fingerprint_similarity(suspect, candidate):
+    similarity, matches = compare_fingerprints(fingerprint_repository(suspect), fingerprint_repository(candidate))
+    return similarity, matches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--functions", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="plaghunt_bench_")
+    try:
+        suspect, copied, unrelated = build_repos(workdir, args.files, args.functions)
+        print(f"Fixture: {args.files} files x {args.functions} functions\n")
+        print(f"{'method':<14}{'candidate':<12}{'seconds':>10}{'similarity':>12}")
+        for label, candidate in (("copied", copied), ("unrelated", unrelated)):
+            path_sim, path_time = timed(compare_code_files, suspect, candidate)
+            (fp_sim, matches), fp_time = timed(fingerprint_similarity, suspect, candidate)
+            print(f"{'path-match':<14}{label:<12}{path_time:>10.3f}{path_sim:>12.3f}")
+            print(f"{'winnowing':<14}{label:<12}{fp_time:>10.3f}{fp_sim:>12.3f}")
+            if matches and label == "copied":
+                top = matches[0]
+                print(f"  top match: {top['suspect_file']} -> {top['candidate_file']} "
+                      f"lines {top['suspect_lines'][:2]} -> {top['candidate_lines'][:2]}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Exercise the GitHub client against a local mock API that enforces a
+per-token primary limit (403 with X-RateLimit-Remaining: 0 until the
+reset) and randomly answers with secondary-limit 403s carrying
+Retry-After. Compares the old give-up-on-403 loop with the client using
+one token and a pool of tokens.
+
+Usage: python benchmarks/bench_github_client.py [--queries N] [--limit N] [--window S]
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import github_client
+from utils.github_client import GitHubClient
+from utils.config_loader import reload_settings
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    limit = 10
+    window = 2.0
+    secondary_rate = 0.05
+    rng = random.Random(5)
+    lock = threading.Lock()
+    windows = {}
+    counts = {"ok": 0, "primary_403": 0, "secondary_403": 0}
+
+    def do_GET(self):
+        token = self.headers.get("Authorization", "anonymous")
+        now = time.time()
+        with ThrottlingHandler.lock:
+            start, used = self.windows.get(token, (now, 0))
+            if now - start >= self.window:
+                start, used = now, 0
+            reset = start + self.window
+            if used >= self.limit:
+                status, remaining, retry_after = 403, 0, None
+                self.counts["primary_403"] += 1
+            elif self.rng.random() < self.secondary_rate:
+                status, remaining, retry_after = 403, self.limit - used, "1"
+                self.counts["secondary_403"] += 1
+            else:
+                used += 1
+                status, remaining, retry_after = 200, self.limit - used, None
+                self.counts["ok"] += 1
+            self.windows[token] = (start, used)
+
+        time.sleep(0.02)
+        body = json.dumps(
+            {"items": [{"id": 1}]} if status == 200
+            else {"message": "API rate limit exceeded" if remaining == 0 else "You have exceeded a secondary rate limit"}
+        ).encode()
+        self.send_response(status)
+        self.send_header("X-RateLimit-Limit", str(self.limit))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        self.send_header("X-RateLimit-Reset", f"{reset:.3f}")
+        self.send_header("X-RateLimit-Resource", "search")
+        if retry_after:
+            self.send_header("Retry-After", retry_after)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def reset_server():
+    ThrottlingHandler.windows = {}
+    ThrottlingHandler.counts = {"ok": 0, "primary_403": 0, "secondary_403": 0}
+    ThrottlingHandler.rng = random.Random(5)
+
+def naive_run(url, queries, concurrency):
+    """The old behaviour: one token, any 403 means no results for that query"""
+    session = requests.Session()
+    def one(i):
+        response = session.get(url, params={"q": f"query {i}"}, headers={"Authorization": "Bearer t0"})
+        return response.status_code == 200
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return sum(executor.map(one, range(queries)))
+
+def client_run(url, queries, concurrency, tokens):
+    client = GitHubClient(tokens=tokens, max_wait=30)
+    def one(i):
+        response = client.get(url, params={"q": f"query {i}"}, resource="search", use_cache=False)
+        return response.status_code == 200
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        ok = sum(executor.map(one, range(queries)))
+    return ok, client.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--limit", type=int, default=10, help="requests per token per window")
+    parser.add_argument("--window", type=float, default=2.0, help="mock rate-limit window in seconds")
+    parser.add_argument("--concurrency", type=int, default=6)
+    args = parser.parse_args()
+
+    ThrottlingHandler.limit = args.limit
+    ThrottlingHandler.window = args.window
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/search/repositories"
+    # The mock's window is seconds, not a minute: rely on its headers
+    os.environ["GITHUB_SEARCH_PER_MINUTE"] = "100000"
+    reload_settings()
+    github_client.BACKOFF_BASE = 0.1
+
+    print(f"Mock limit: {args.limit} requests per token per {args.window}s, "
+          f"{ThrottlingHandler.secondary_rate:.0%} secondary 403s; {args.queries} queries\n")
+    print(f"{'mode':<16}{'ok':>5}{'seconds':>9}{'primary 403':>13}{'secondary 403':>15}{'retries':>9}{'throttled':>11}")
+
+    runs = [("give up on 403", None), ("client, 1 token", ["t0"]), ("client, 3 tokens", ["t0", "t1", "t2"])]
+    for label, tokens in runs:
+        reset_server()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if tokens is None:
+                ok, stats = naive_run(url, args.queries, args.concurrency), {}
+            else:
+                ok, stats = client_run(url, args.queries, args.concurrency, tokens)
+        elapsed = time.perf_counter() - start
+        counts = ThrottlingHandler.counts
+        print(f"{label:<16}{ok:>5}{elapsed:>9.2f}{counts['primary_403']:>13}{counts['secondary_403']:>15}"
+              f"{stats.get('retries', '-'):>9}{stats.get('throttled', '-'):>11}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
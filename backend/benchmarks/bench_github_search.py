@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Measure end-to-end candidate search latency against a local mock of the
+GitHub search API with a fixed per-request delay, one query at a time
+versus the concurrent executor, then cold, warm and expired runs through
+the response cache.
+
+Usage: python benchmarks/bench_github_search.py [--latency-ms N] [--concurrency N]
+"""
+import os
+import sys
+import json
+import io
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import contextlib
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import github_search, github_client
+from utils.github_client import GitHubClient
+from utils.config_loader import reload_settings
+from utils.github_cache import GitHubCache
+
+LANGUAGES = ["JavaScript", "TypeScript", "CSS"]
+KEYWORDS = ["portfolio", "react", "tailwind", "framer motion", "vite"]
+
+
+class MockSearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like api.github.com
+    latency = 0.1
+    requests_served = 0
+    not_modified = 0
+    connections = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with MockSearchHandler.lock:
+            MockSearchHandler.requests_served += 1
+            MockSearchHandler.connections.add(self.client_address)
+        time.sleep(self.latency)
+        query = parse_qs(urlparse(self.path).query)
+        q = query.get("q", [""])[0]
+        per_page = int(query.get("per_page", ["30"])[0])
+        # Overlapping result sets so dedup matters: repo ids come from a small space
+        seed = int(hashlib.md5(q.encode()).hexdigest(), 16)
+        items = []
+        for i in range(per_page):
+            repo_id = (seed >> (i % 64)) % 200
+            items.append({
+                "full_name": f"user{repo_id}/repo{repo_id}",
+                "html_url": f"https://github.com/user{repo_id}/repo{repo_id}",
+                "stargazers_count": repo_id,
+                "description": q,
+                "owner": {"login": f"user{repo_id}"},
+                "language": "JavaScript"
+            })
+        body = json.dumps({"items": items}).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with MockSearchHandler.lock:
+                MockSearchHandler.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(concurrency):
+    os.environ["GITHUB_SEARCH_CONCURRENCY"] = str(concurrency)
+    reload_settings()
+    github_client._client = GitHubClient(tokens=["benchmark"])
+    MockSearchHandler.requests_served = 0
+    MockSearchHandler.not_modified = 0
+    MockSearchHandler.connections = set()
+    start = time.perf_counter()
+    results = github_search.search_github_repos_by_language(
+        KEYWORDS, LANGUAGES, topic="developer portfolio website", exclude_user="someone",
+        per_page=20, max_results=30, max_total=15
+    )
+    return results, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=github_search.DEFAULT_SEARCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    MockSearchHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockSearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    github_search.GITHUB_API_URL = f"http://127.0.0.1:{server.server_port}/search/repositories"
+    github_client.github_cache.enabled = False
+    # Measure latency only; bench_github_client.py covers throttling
+    os.environ["GITHUB_SEARCH_PER_MINUTE"] = "100000"
+
+    print(f"Mock GitHub search: {args.latency_ms} ms per request, {len(LANGUAGES)} languages\n")
+    print(f"{'concurrency':<13}{'seconds':>9}{'requests':>10}{'connections':>13}{'round-trips':>13}")
+    outcomes = {}
+    for concurrency in (1, args.concurrency):
+        with contextlib.redirect_stdout(io.StringIO()):
+            results, elapsed = run(concurrency)
+        outcomes[concurrency] = results
+        round_trips = elapsed / MockSearchHandler.latency
+        print(f"{concurrency:<13}{elapsed:>9.2f}{MockSearchHandler.requests_served:>10}"
+              f"{len(MockSearchHandler.connections):>13}{round_trips:>13.1f}")
+    same = outcomes[1] == outcomes[args.concurrency]
+    print(f"\nMerged results identical: {same}\n")
+
+    cache_dir = tempfile.mkdtemp(prefix="plaghunt_bench_cache_")
+    github_client.github_cache = GitHubCache(cache_dir=cache_dir, ttl=3600)
+    github_client.github_cache.enabled = True
+    print(f"{'cache run':<13}{'seconds':>9}{'requests':>10}{'304s':>7}{'hit ratio':>11}{'calls saved':>13}")
+    try:
+        for label in ("cold", "warm", "expired"):
+            if label == "expired":
+                github_client.github_cache.ttl = 0  # force revalidation with If-None-Match
+            with contextlib.redirect_stdout(io.StringIO()):
+                results, elapsed = run(args.concurrency)
+            stats = github_client.github_cache.stats()
+            print(f"{label:<13}{elapsed:>9.2f}{MockSearchHandler.requests_served:>10}"
+                  f"{MockSearchHandler.not_modified:>7}{stats['hit_ratio']:>11.2f}{stats['api_calls_saved']:>13}")
+            assert results == outcomes[1]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
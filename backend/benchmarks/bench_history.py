@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Time history page queries against a scratch MongoDB database: full
+documents with skip/limit and no indexes (the old query) versus the
+indexed summary projection with cursor pagination, as a user's history
+grows. "last page" is the deepest page a client would reach.
+
+Needs a reachable MongoDB (MONGODB_URI); uses and then drops the
+plaghunt_bench database.
+
+Usage: python benchmarks/bench_history.py [--sizes 100,1000,5000] [--candidates N]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['DB_NAME'] = 'plaghunt_bench'
+
+import bson
+from models.database import db
+from models.plagiarism_result import PlagiarismResult, HISTORY_PROJECTION, encode_cursor
+
+PAGE_SIZE = 20
+
+
+def make_analysis(rng, candidates):
+    results = [
+        {
+            "repo_name": f"candidate-{i}",
+            "repo_url": f"https://github.com/someone/candidate-{i}",
+            "similarity_scores": {"overall_similarity": rng.random() * 100},
+            "overlap_files": [f"src/module{j}/file_{j}.js" for j in range(50)],
+            "code_matches": [{"file_a": f"a{j}.js", "file_b": f"b{j}.js", "similarity": rng.random()} for j in range(20)]
+        }
+        for i in range(candidates)
+    ]
+    return {
+        "suspect_repo": {"name": "suspect", "owner": "me", "url": "https://github.com/me/suspect", "topic": "blog"},
+        "analysis_results": results,
+        "plagiarism_detected": False,
+        "summary": {"total_candidates_checked": candidates, "highest_similarity": 42.0}
+    }
+
+def seed(collection, user_id, count, candidates, rng):
+    now = datetime.utcnow()
+    docs = [
+        {
+            "user_id": user_id,
+            "repo_url": f"https://github.com/me/repo-{i}",
+            "analysis_data": make_analysis(rng, candidates),
+            "created_at": now - timedelta(minutes=i),
+            "status": "completed"
+        }
+        for i in range(count)
+    ]
+    for start in range(0, len(docs), 500):
+        collection.insert_many(docs[start:start + 500])
+
+def time_page(collection, user_id, projection, skip, repeats=5):
+    timings, size = [], 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        docs = list(collection.find({"user_id": user_id, "status": "completed"}, projection)
+                    .sort("created_at", -1).skip(skip).limit(PAGE_SIZE))
+        timings.append(time.perf_counter() - start)
+        size = sum(len(bson.encode(d)) for d in docs)
+    return statistics.median(timings) * 1000, size
+
+def time_cursor_page(model, user_id, cursor, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.get_user_history(user_id, limit=PAGE_SIZE, cursor=cursor)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,1000,5000")
+    parser.add_argument("--candidates", type=int, default=10)
+    args = parser.parse_args()
+
+    if not db.ping():
+        sys.exit("MongoDB is not reachable; set MONGODB_URI")
+
+    rng = random.Random(11)
+    model = PlagiarismResult()
+    collection = model.collection
+    try:
+        print(f"{'analyses':>9}  {'query':<24}{'page 1 ms':>10}{'last page ms':>13}{'page KB':>9}")
+        seeded = 0
+        for size in (int(s) for s in args.sizes.split(",")):
+            seed(collection, "bench-user", size - seeded, args.candidates, rng)
+            # Other users' analyses, so the unindexed query has to skip them
+            seed(collection, f"other-{size}", size - seeded, 1, rng)
+            seeded = size
+            last = max(0, size - PAGE_SIZE)
+
+            collection.drop_indexes()
+            first_ms, first_size = time_page(collection, "bench-user", None, 0)
+            last_ms, _ = time_page(collection, "bench-user", None, last)
+            print(f"{size:>9}  {'full, no index':<24}{first_ms:>10.1f}{last_ms:>13.1f}{first_size / 1024:>9.0f}")
+
+            model.ensure_indexes()
+            first_ms, first_size = time_page(collection, "bench-user", HISTORY_PROJECTION, 0)
+            # The cursor a client holds after paging down to the last page
+            before_last = collection.find({"user_id": "bench-user", "status": "completed"}).sort(
+                [("created_at", -1), ("_id", -1)]).skip(last - 1).limit(1)
+            cursor = encode_cursor(next(iter(before_last))) if last else None
+            last_ms = time_cursor_page(model, "bench-user", cursor)
+            print(f"{size:>9}  {'summary, cursor':<24}{first_ms:>10.1f}{last_ms:>13.1f}{first_size / 1024:>9.0f}")
+    finally:
+        db.client.drop_database('plaghunt_bench')
+
+if __name__ == "__main__":
+    main()
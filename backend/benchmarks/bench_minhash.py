@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure the MinHash prefilter: how closely signatures estimate Jaccard
+similarity, and the time saved by skipping the per-file code comparison
+for unrelated candidates.
+
+Usage: python benchmarks/bench_minhash.py [--pairs N] [--elements N] [--files N]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.minhash import MinHash, DEFAULT_NUM_PERM
+from utils.compare_utils import compare_repositories
+from utils.config_loader import reload_settings
+from bench_fingerprint import build_repos
+
+TARGET_JACCARDS = [0.9, 0.7, 0.5, 0.3, 0.2, 0.1]
+
+
+def mutate(rng, base, jaccard):
+    """Return a set whose Jaccard similarity with base is roughly jaccard"""
+    keep = int(round(len(base) * 2 * jaccard / (1 + jaccard)))
+    kept = rng.sample(sorted(base), keep)
+    extra = {rng.getrandbits(63) for _ in range(len(base) - keep)}
+    return set(kept) | extra
+
+def build_unrelated(root, count, files, seed=23):
+    """JavaScript repositories sharing neither paths nor code with the fixture"""
+    rng = random.Random(seed)
+    templates = [
+        "  let {a} = {b}.map((item) => item * {n});\n",
+        "  if ({a}.length > {n}) {{ {b}.push({a}.pop()); }}\n",
+        "  const {a} = await fetch(`/api/{name}/${{{b}}}`);\n",
+        "  for (const key of Object.keys({b})) {{ {a}[key] = {b}[key] || {n}; }}\n",
+        "  {a} = {b}.filter(Boolean).reduce((acc, x) => acc + x, {n});\n",
+    ]
+    paths = []
+    for r in range(count):
+        path = os.path.join(root, f"unrelated_{r}")
+        for i in range(files):
+            os.makedirs(os.path.join(path, "src", f"feature{i % 7}"), exist_ok=True)
+            body = []
+            for j in range(10):
+                name = f"handler{r}_{i}_{j}"
+                body.append(f"export async function {name}({name}A, {name}B) {{\n")
+                for _ in range(rng.randint(4, 10)):
+                    body.append(rng.choice(templates).format(a=f"{name}A", b=f"{name}B", name=name, n=rng.randint(2, 99)))
+                body.append(f"  return {name}A;\n}}\n\n")
+            with open(os.path.join(path, "src", f"feature{i % 7}", f"view_{i}.js"), "w") as f:
+                f.write("".join(body))
+        paths.append(path)
+    return paths
+
+def true_jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+def bench_estimates(pairs, elements, seed=11):
+    rng = random.Random(seed)
+    suspect = {rng.getrandbits(63) for _ in range(elements)}
+    start = time.perf_counter()
+    suspect_signature = MinHash.from_hashes(suspect)
+    build_time = time.perf_counter() - start
+    print(f"Signatures: {elements} elements, {DEFAULT_NUM_PERM} permutations, "
+          f"{build_time * 1000:.1f} ms each\n")
+
+    print(f"{'jaccard':>8}{'mean estimate':>15}{'mean error':>12}{'max error':>11}")
+    for target in TARGET_JACCARDS + [0.0]:
+        errors, estimates = [], []
+        for _ in range(pairs):
+            other = mutate(rng, suspect, target) if target else {rng.getrandbits(63) for _ in range(elements)}
+            estimate = MinHash.from_hashes(other).jaccard(suspect_signature)
+            estimates.append(estimate)
+            errors.append(abs(estimate - true_jaccard(suspect, other)))
+        print(f"{target:>8.1f}{sum(estimates) / pairs:>15.3f}{sum(errors) / pairs:>12.3f}{max(errors):>11.3f}")
+
+def bench_prefilter(files, functions, unrelated_count):
+    workdir = tempfile.mkdtemp(prefix="plaghunt_bench_")
+    try:
+        suspect, copied, _ = build_repos(workdir, files, functions)
+        candidates = [copied] + build_unrelated(workdir, unrelated_count, files)
+        print(f"\nPrefilter: 1 copied + {unrelated_count} unrelated candidates, {files} files each")
+        print(f"{'prefilter':<11}{'seconds':>10}{'kept':>6}{'copied jaccard':>16}{'max unrelated':>15}{'copied code':>13}")
+        for enabled in ("false", "true"):
+            os.environ["MINHASH_PREFILTER"] = enabled
+            reload_settings()
+            start = time.perf_counter()
+            results = [compare_repositories(suspect, path) for path in candidates]
+            elapsed = time.perf_counter() - start
+            kept = sum(1 for r in results if not r["prefiltered"])
+            estimates = [r["estimated_jaccard"] for r in results]
+            copied_jaccard = f"{estimates[0]:.3f}" if estimates[0] is not None else "-"
+            unrelated_jaccard = f"{max(estimates[1:]):.3f}" if estimates[0] is not None else "-"
+            print(f"{enabled:<11}{elapsed:>10.3f}{kept:>6}{copied_jaccard:>16}{unrelated_jaccard:>15}"
+                  f"{results[0]['code_similarity']:>13.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--elements", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=60)
+    parser.add_argument("--unrelated", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_estimates(args.pairs, args.elements)
+    bench_prefilter(args.files, 10, args.unrelated)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare prompt size and collection time of the token-budgeted project
+text collector with the old collect-everything loop on a large fixture
+(many small source files, vendored copies and generated duplicates).
+
+Usage: python benchmarks/bench_project_text.py [--files N] [--budget TOKENS]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import repo_snapshot
+from utils.project_text import collect_text, estimate_tokens
+from bench_fingerprint import make_function
+
+
+def legacy_collect_project_text(project_path):
+    """The previous implementation: every small file, appended with +="""
+    combined_text = ""
+    for name in ("README.md", "package.json"):
+        path = os.path.join(project_path, name)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                combined_text += f.read() + "\n"
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in ['node_modules', '.git', '__pycache__', '.venv', 'venv', 'artifacts', 'cache']]
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if (os.path.isfile(path) and not os.path.islink(path) and os.path.getsize(path) < 5000 and
+                        name.endswith((".js", ".ts", ".py", ".html", ".jsx", ".sol", ".vy", ".cairo"))):
+                    with open(path, "r", encoding="utf-8") as f:
+                        combined_text += f.read() + "\n"
+            except (OSError, UnicodeDecodeError):
+                continue
+    return combined_text
+
+def build_fixture(root, files, seed=3):
+    rng = random.Random(seed)
+    with open(os.path.join(root, "README.md"), "w") as f:
+        f.write("# Inventory service\n\nTracks stock levels across warehouses.\n" * 20)
+    with open(os.path.join(root, "package.json"), "w") as f:
+        f.write('{"name": "inventory", "dependencies": {"express": "^4.18.0", "mongoose": "^7.0.0"}}\n')
+    os.makedirs(os.path.join(root, "src"))
+    with open(os.path.join(root, "src", "index.py"), "w") as f:
+        f.write("from app import create_app\n\napp = create_app()\n")
+    for i in range(files):
+        package = os.path.join(root, "src", f"module{i % 25}")
+        os.makedirs(package, exist_ok=True)
+        source = "".join(make_function(rng, f"handler_{i}_{j}") for j in range(2))[:4900]
+        with open(os.path.join(package, f"file_{i}.py"), "w") as f:
+            f.write(source)
+        # Generated near-duplicates, e.g. compiled or copied variants
+        if i % 4 == 0:
+            generated = os.path.join(root, "generated", f"module{i % 25}")
+            os.makedirs(generated, exist_ok=True)
+            with open(os.path.join(generated, f"file_{i}.py"), "w") as f:
+                f.write(source.replace("    ", "  "))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--budget", type=int, default=None, help="token budget (default: PROJECT_TEXT_TOKEN_BUDGET)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="plaghunt_bench_")
+    try:
+        build_fixture(workdir, args.files)
+        print(f"Fixture: {args.files} source files (+{args.files // 4} generated near-duplicates)\n")
+        print(f"{'collector':<12}{'seconds':>9}{'chars':>12}{'~tokens':>10}{'files':>8}")
+
+        start = time.perf_counter()
+        legacy = legacy_collect_project_text(workdir)
+        elapsed = time.perf_counter() - start
+        print(f"{'legacy':<12}{elapsed:>9.3f}{len(legacy):>12}{estimate_tokens(legacy):>10}{'all':>8}")
+
+        # The snapshot is shared with language detection and comparison, so
+        # its scan is reported separately from the collection itself
+        repo_snapshot._cached_snapshot.cache_clear()
+        start = time.perf_counter()
+        repo_snapshot.get_snapshot(workdir)
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        text, files = collect_text(workdir, args.budget)
+        elapsed = time.perf_counter() - start
+        print(f"{'budgeted':<12}{elapsed:>9.3f}{len(text):>12}{estimate_tokens(text):>10}{len(files):>8}")
+        print(f"{'(snapshot)':<12}{scan_time:>9.3f}")
+        print(f"\nFirst files in the prompt: {', '.join(files[:6])}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
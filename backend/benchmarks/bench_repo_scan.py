@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Count filesystem calls for the suspect-side analysis stages plus N
+candidate comparisons, with the old per-stage os.walk loops versus the
+shared RepoSnapshot. Calls made from C inside os.walk (DirEntry.is_dir)
+are not counted on either side.
+
+Usage: python benchmarks/bench_repo_scan.py [--files N] [--candidates N]
+"""
+import os
+import sys
+import shutil
+import builtins
+import argparse
+import tempfile
+from collections import Counter
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import repo_snapshot
+from utils.analyze_repo import collect_project_text, get_repo_languages, get_detailed_language_info
+from utils.compare_utils import compare_file_structure, compare_code_files
+from utils.fingerprint import fingerprint_repository
+from utils.languages import LANGUAGE_MAP
+from bench_fingerprint import build_repos
+
+
+def legacy_walk_files(root, skip_hidden_dirs=True):
+    for dirpath, dirs, files in os.walk(root):
+        if skip_hidden_dirs:
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+        for name in files:
+            yield os.path.join(dirpath, name)
+
+def legacy_read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def legacy_suspect_stages(suspect):
+    # collect_project_text, get_repo_languages and get_detailed_language_info
+    # each walked the tree; the first also read every small source file
+    for path in legacy_walk_files(suspect):
+        if os.path.isfile(path) and not os.path.islink(path) and os.path.getsize(path) < 5000:
+            legacy_read(path)
+    for path in legacy_walk_files(suspect):
+        os.path.getsize(path)
+    for _ in legacy_walk_files(suspect):
+        pass
+
+def legacy_compare(suspect, candidate):
+    # list_files twice in compare_file_structure and twice more in
+    # compare_code_files, then both sides of every common file, then
+    # fingerprinting of both trees
+    def list_files(root):
+        return {os.path.relpath(p, root) for p in legacy_walk_files(root, skip_hidden_dirs=False)}
+    list_files(suspect), list_files(candidate)
+    common = list_files(suspect) & list_files(candidate)
+    for f in common:
+        legacy_read(os.path.join(suspect, f))
+        legacy_read(os.path.join(candidate, f))
+    for root in (suspect, candidate):
+        for path in legacy_walk_files(root):
+            if os.path.splitext(path.lower())[1] in LANGUAGE_MAP and os.path.getsize(path) < 1024 * 1024:
+                legacy_read(path)
+
+def snapshot_suspect_stages(suspect):
+    collect_project_text(suspect)
+    get_repo_languages(suspect)
+    get_detailed_language_info(suspect)
+
+def snapshot_compare(suspect, candidate):
+    compare_file_structure(suspect, candidate)
+    compare_code_files(suspect, candidate)
+    fingerprint_repository(suspect)
+    fingerprint_repository(candidate)
+
+def counted(fn):
+    counts = Counter()
+    # DirEntry.stat() does not go through os.stat; count one per scanned file
+    original_scan = repo_snapshot.RepoSnapshot.__init__
+    def scan(self, root):
+        original_scan(self, root)
+        counts["stat"] += len(self.files)
+    targets = {
+        "scandir": (os, "scandir"), "stat": (os, "stat"), "lstat": (os, "lstat"),
+        "open": (builtins, "open")
+    }
+    patches = [mock.patch.object(repo_snapshot.RepoSnapshot, "__init__", scan)]
+    for name, (module, attr) in targets.items():
+        original = getattr(module, attr)
+        def wrapper(*args, _original=original, _name=name, **kwargs):
+            counts[_name] += 1
+            return _original(*args, **kwargs)
+        patches.append(mock.patch.object(module, attr, wrapper))
+    for p in patches:
+        p.start()
+    try:
+        fn()
+    finally:
+        for p in patches:
+            p.stop()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=15)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="plaghunt_bench_")
+    try:
+        suspect, copied, unrelated = build_repos(workdir, args.files, 5)
+        # Every candidate is a distinct checkout, as in a real analysis
+        candidates = []
+        for i in range(args.candidates):
+            path = os.path.join(workdir, f"candidate_{i}")
+            shutil.copytree(copied if i % 2 else unrelated, path)
+            candidates.append(path)
+
+        def legacy():
+            legacy_suspect_stages(suspect)
+            for candidate in candidates:
+                legacy_compare(suspect, candidate)
+
+        def snapshot():
+            repo_snapshot._cached_snapshot.cache_clear()
+            snapshot_suspect_stages(suspect)
+            for candidate in candidates:
+                snapshot_compare(suspect, candidate)
+
+        print(f"Fixture: {args.files} files per repo, {args.candidates} candidate comparisons\n")
+        print(f"{'scanner':<10}{'scandir':>9}{'stat':>9}{'open':>9}{'total':>9}")
+        totals = {}
+        for label, fn in (("os.walk", legacy), ("snapshot", snapshot)):
+            counts = counted(fn)
+            totals[label] = sum(counts.values())
+            print(f"{label:<10}{counts['scandir']:>9}{counts['stat'] + counts['lstat']:>9}"
+                  f"{counts['open']:>9}{totals[label]:>9}")
+        print(f"\nReduction: {totals['os.walk'] / max(totals['snapshot'], 1):.1f}x fewer calls")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare the bytes written and read per analysis when the full payload is
+stored inline in plagiarism_results versus the compact summary document
+plus gzip-compressed per-candidate records in analysis_details.
+
+Runs offline: sizes are the BSON encodings MongoDB would store and return.
+
+Usage: python benchmarks/bench_result_storage.py [--candidates N] [--files N] [--matches N]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from models.analysis_details import split_analysis, merge_analysis, pack, unpack
+from models.plagiarism_result import HISTORY_PROJECTION
+
+
+def make_analysis(rng, candidates, files, matches):
+    dirs = ["src", "src/components", "src/pages", "src/utils", "lib", "test", "contracts", "scripts"]
+    results = []
+    for i in range(candidates):
+        overlap = [f"{rng.choice(dirs)}/{rng.choice(['index', 'utils', 'api', 'App', 'Token'])}_{j}.{rng.choice(['js', 'ts', 'sol'])}"
+                   for j in range(files)]
+        results.append({
+            "candidate_repo": {"name": f"someone/candidate-{i}", "url": f"https://github.com/someone/candidate-{i}",
+                               "stars": rng.randint(0, 5000), "description": "A candidate repository", "language": "JavaScript"},
+            "similarity_scores": {"structure_similarity": 40.0, "readme_similarity": 12.5, "code_similarity": 33.3,
+                                  "fingerprint_similarity": 20.1, "overall_similarity": 31.0},
+            "risk_assessment": {"risk_level": "Medium", "high_code_similarity": False,
+                                "high_structure_similarity": False, "high_readme_similarity": False},
+            "overlap_files": overlap,
+            "code_matches": [{"file1": rng.choice(overlap), "file2": rng.choice(overlap),
+                              "similarity": round(rng.random(), 3), "matched_lines": rng.randint(1, 300)}
+                             for _ in range(matches)],
+            "prefiltered": False,
+            "high_similarity": False
+        })
+    return {
+        "suspect_repo": {"name": "suspect", "owner": "me", "url": "https://github.com/me/suspect", "topic": "defi protocol",
+                         "keywords": ["swap", "liquidity"], "primary_languages": ["Solidity", "JavaScript"]},
+        "uniqueness_assessment": {"overall_uniqueness": 55.0},
+        "analysis_results": results,
+        "plagiarism_detected": False,
+        "summary": {"total_candidates_checked": candidates, "overall_risk_level": "Medium", "highest_similarity": 31.0}
+    }
+
+def projected(doc, projection):
+    out = {}
+    for path in projection:
+        head, _, rest = path.partition(".")
+        if head not in doc:
+            continue
+        if rest:
+            if rest in doc[head]:
+                out.setdefault(head, {})[rest] = doc[head][rest]
+        else:
+            out[head] = doc[head]
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=15)
+    parser.add_argument("--files", type=int, default=3000, help="overlap_files per candidate")
+    parser.add_argument("--matches", type=int, default=200, help="code_matches per candidate")
+    args = parser.parse_args()
+
+    analysis = make_analysis(random.Random(23), args.candidates, args.files, args.matches)
+    base = {"_id": bson.ObjectId(), "user_id": "u", "repo_url": "https://github.com/me/suspect", "status": "completed"}
+
+    inline_doc = dict(base, analysis_data=analysis)
+    start = time.perf_counter()
+    summary, details = split_analysis(analysis)
+    records = [{"result_id": base["_id"], "candidate_index": i, "data": pack(d)} for i, d in enumerate(details)]
+    split_time = time.perf_counter() - start
+    summary_doc = dict(base, analysis_data=summary)
+
+    inline_bytes = len(bson.encode(inline_doc))
+    summary_bytes = len(bson.encode(summary_doc))
+    detail_bytes = sum(len(bson.encode(r)) for r in records)
+
+    start = time.perf_counter()
+    merged = merge_analysis(summary, {r["candidate_index"]: unpack(r["data"]) for r in records})
+    merge_time = time.perf_counter() - start
+    assert merged == analysis, "round trip changed the analysis"
+
+    history_inline = len(bson.encode(projected(inline_doc, HISTORY_PROJECTION)))
+    history_split = len(bson.encode(projected(summary_doc, HISTORY_PROJECTION)))
+
+    kb = lambda n: f"{n / 1024:,.1f} KB"
+    print(f"{args.candidates} candidates, {args.files} overlap files and {args.matches} code matches each\n")
+    print(f"{'':<34}{'inline':>12}{'split':>12}")
+    print(f"{'result document':<34}{kb(inline_bytes):>12}{kb(summary_bytes):>12}")
+    print(f"{'written per analysis':<34}{kb(inline_bytes):>12}{kb(summary_bytes + detail_bytes):>12}")
+    print(f"{'read per /result/<id>':<34}{kb(inline_bytes):>12}{kb(summary_bytes + detail_bytes):>12}")
+    print(f"{'read per history row':<34}{kb(history_inline):>12}{kb(history_split):>12}")
+    print(f"{'read per full scan row':<34}{kb(inline_bytes):>12}{kb(summary_bytes):>12}")
+    print(f"\nInline document is {inline_bytes / (16 * 1024 * 1024):.0%} of the 16 MB limit")
+    print(f"split + compress: {split_time * 1000:.1f} ms, load + merge: {merge_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
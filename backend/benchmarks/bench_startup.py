@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Measure backend cold start: importing app, create_app() and the first
+requests, each in a fresh interpreter. MongoDB is pointed at a closed
+port by default to show startup does not depend on it.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--mongodb-uri URI]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import sys, time, json
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+client = flask_app.test_client()
+status = client.get('/api/health').status_code
+first_request = time.perf_counter()
+client.get('/api/metrics')
+metrics = time.perf_counter()
+heavy = [m for m in ('sklearn', 'google.generativeai', 'git', 'scipy') if m in sys.modules]
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "first_request": first_request - created,
+    "metrics": metrics - first_request,
+    "status": status,
+    "heavy_modules": heavy
+}))
+"""
+
+def run_once(env):
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=300
+    )
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr else "probe failed")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mongodb-uri", default="mongodb://127.0.0.1:1/",
+                        help="MongoDB URI (default: a closed port)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, MONGODB_URI=args.mongodb_uri, PYTHONDONTWRITEBYTECODE="1")
+    env.setdefault("GEMINI_API_KEY", "bench")
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts, MONGODB_URI={args.mongodb_uri}\n")
+    print(f"{'phase':<16}{'median ms':>11}{'max ms':>10}")
+    for phase in ("import", "create_app", "first_request", "metrics"):
+        values = [r[phase] * 1000 for r in runs]
+        print(f"{phase:<16}{statistics.median(values):>11.1f}{max(values):>10.1f}")
+    total = [sum(r[p] for p in ("import", "create_app", "first_request")) * 1000 for r in runs]
+    print(f"{'total':<16}{statistics.median(total):>11.1f}{max(total):>10.1f}")
+    print(f"\n/api/health status: {runs[-1]['status']}")
+    print(f"Heavy modules loaded at startup: {', '.join(runs[-1]['heavy_modules']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
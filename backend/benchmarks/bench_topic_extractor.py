@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Time the offline topic/keyword extractor on a synthetic project and,
+optionally, on real checkouts passed on the command line.
+
+Usage: python benchmarks/bench_topic_extractor.py [--files N] [PATH ...]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import repo_snapshot
+from utils.project_text import collect_text
+from utils.topic_extractor import extract_topic
+from bench_fingerprint import make_function
+
+
+def build_fixture(root, files, seed=5):
+    rng = random.Random(seed)
+    with open(os.path.join(root, "README.md"), "w") as f:
+        f.write("# Chat Server\n\nReal-time chat with rooms, private messages and a websocket gateway.\n"
+                "Users join a room and exchange messages instantly.\n")
+    with open(os.path.join(root, "package.json"), "w") as f:
+        f.write('{"name": "chat", "dependencies": {"express": "^4.18.0", "socket.io": "^4.7.0", "mongoose": "^7.0.0"}}\n')
+    for i in range(files):
+        package = os.path.join(root, "src", f"module{i % 20}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"file_{i}.js"), "w") as f:
+            f.write("const io = require('socket.io');\nimport express from 'express';\n")
+            f.write("".join(make_function(rng, f"handler_{i}_{j}") for j in range(2)))
+
+def measure(path):
+    repo_snapshot._cached_snapshot.cache_clear()
+    start = time.perf_counter()
+    text, _ = collect_text(path)
+    result = extract_topic(path, text)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("paths", nargs="*")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="plaghunt_bench_")
+    try:
+        build_fixture(workdir, args.files)
+        targets = [(f"fixture ({args.files} files)", workdir)] + [(p, p) for p in args.paths]
+        for label, path in targets:
+            elapsed, result = measure(path)
+            print(f"{label}: {elapsed:.3f}s (scan + text + extraction)")
+            print(f"  topic:    {result['topic']}")
+            print(f"  keywords: {', '.join(result['keywords'])}\n")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
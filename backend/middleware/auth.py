@@ -1,7 +1,37 @@
 from functools import wraps
 from flask import request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from models.user import User
+from utils.user_cache import user_cache
+from utils.config_loader import get_settings
+
+# Profile fields embedded in access tokens and trusted when
+# AUTH_TRUST_TOKEN_CLAIMS is on
+CLAIM_FIELDS = ("username", "email")
+
+def trust_token_claims():
+    return get_settings().get_bool('AUTH_TRUST_TOKEN_CLAIMS', False)
+
+def user_claims(user):
+    """Claims to sign into a user's tokens (see AUTH_TRUST_TOKEN_CLAIMS)"""
+    return {field: user[field] for field in CLAIM_FIELDS if user.get(field) is not None}
+
+def _user_from_claims(user_id):
+    claims = get_jwt()
+    if all(field in claims for field in CLAIM_FIELDS):
+        return dict({field: claims[field] for field in CLAIM_FIELDS}, _id=user_id)
+    return None
+
+def load_current_user(user_id):
+    """
+    Resolve a JWT identity to a user record: from the signed token claims
+    when trusted, else from the user cache, else from MongoDB.
+    """
+    if trust_token_claims():
+        user = _user_from_claims(user_id)
+        if user:
+            return user
+    return user_cache.get_or_load(user_id, User().get_user_by_id)
 
 def auth_required(f):
     """Decorator to require authentication"""
@@ -14,8 +44,7 @@ def auth_required(f):
                 return jsonify({"error": "Invalid token"}), 401
             
             # Verify user exists
-            user_model = User()
-            user = user_model.get_user_by_id(current_user_id)
+            user = load_current_user(current_user_id)
             if not user:
                 return jsonify({"error": "User not found"}), 401
             
@@ -36,9 +65,7 @@ def optional_auth(f):
             if 'Authorization' in request.headers:
                 current_user_id = get_jwt_identity()
                 if current_user_id:
-                    user_model = User()
-                    user = user_model.get_user_by_id(current_user_id)
-                    request.current_user = user
+                    request.current_user = load_current_user(current_user_id)
                 else:
                     request.current_user = None
             else:
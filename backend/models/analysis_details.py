@@ -0,0 +1,109 @@
+"""
+Per-candidate analysis details stored outside plagiarism_results.
+
+The bulky per-candidate fields (DETAIL_FIELDS: overlap file lists and
+code matches) are moved into one gzip-compressed JSON record per
+candidate in the analysis_details collection. The result document keeps
+a compact summary that history listings can read cheaply; /result/<id>
+merges the details back in.
+"""
+import gzip
+import json
+from bson.binary import Binary
+from pymongo import ASCENDING
+from models.database import db
+
+DETAIL_FIELDS = ("overlap_files", "code_matches")
+ENCODING = "json+gzip"
+COMPRESSION_LEVEL = 6
+
+
+def pack(data):
+    return Binary(gzip.compress(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"),
+                                compresslevel=COMPRESSION_LEVEL))
+
+def unpack(blob):
+    return json.loads(gzip.decompress(bytes(blob)).decode("utf-8"))
+
+def split_analysis(analysis_data):
+    """
+    Return (summary, details): a copy of analysis_data whose candidates
+    keep only their counts of DETAIL_FIELDS, and the per-candidate lists
+    of those fields in candidate order.
+    """
+    summary = dict(analysis_data)
+    candidates = []
+    details = []
+    for candidate in analysis_data.get("analysis_results") or []:
+        compact = dict(candidate)
+        detail = {}
+        for field in DETAIL_FIELDS:
+            if field in compact:
+                detail[field] = compact.pop(field)
+                compact[f"{field}_count"] = len(detail[field])
+        candidates.append(compact)
+        details.append(detail)
+    summary["analysis_results"] = candidates
+    summary["details_stored"] = ENCODING
+    return summary, details
+
+def merge_analysis(summary, details):
+    """Inverse of split_analysis"""
+    analysis_data = dict(summary)
+    analysis_data.pop("details_stored", None)
+    candidates = []
+    for index, candidate in enumerate(summary.get("analysis_results") or []):
+        candidate = dict(candidate)
+        for field in DETAIL_FIELDS:
+            count_field = f"{field}_count"
+            if count_field in candidate:
+                candidate.pop(count_field)
+                candidate[field] = details.get(index, {}).get(field, [])
+        candidates.append(candidate)
+    analysis_data["analysis_results"] = candidates
+    return analysis_data
+
+
+class AnalysisDetails:
+    @property
+    def collection(self):
+        return db.get_collection('analysis_details')
+
+    def ensure_indexes(self):
+        """Create the index used to load and delete a result's details (idempotent)"""
+        try:
+            self.collection.create_index(
+                [("result_id", ASCENDING), ("candidate_index", ASCENDING)],
+                name="result_candidate", unique=True
+            )
+            return True
+        except Exception as e:
+            print(f"Warning: could not create analysis_details indexes: {e}")
+            return False
+
+    def save(self, result_id, candidates, details):
+        """Replace the stored details of a result"""
+        self.collection.delete_many({"result_id": result_id})
+        records = [
+            {
+                "result_id": result_id,
+                "candidate_index": index,
+                "candidate": (candidate.get("candidate_repo") or {}).get("name"),
+                "encoding": ENCODING,
+                "data": pack(detail)
+            }
+            for index, (candidate, detail) in enumerate(zip(candidates, details))
+            if detail
+        ]
+        if records:
+            self.collection.insert_many(records, ordered=False)
+
+    def load(self, result_id):
+        """Return {candidate_index: detail} for a result"""
+        return {
+            record["candidate_index"]: unpack(record["data"])
+            for record in self.collection.find({"result_id": result_id}, {"candidate_index": 1, "data": 1})
+        }
+
+    def delete(self, result_id):
+        self.collection.delete_many({"result_id": result_id})
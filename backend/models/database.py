@@ -1,28 +1,49 @@
+import threading
 from pymongo import MongoClient
 from datetime import datetime
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.config_loader import get_settings
 
 class Database:
+    """
+    MongoDB handle. The client is created on first use, so importing the
+    models never blocks on (or fails because of) an unreachable server.
+    """
+
     def __init__(self):
-        self.client = None
-        self.db = None
+        self._client = None
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
         self.connect()
-    
+        return self._client
+
+    @property
+    def db(self):
+        self.connect()
+        return self._db
+
     def connect(self):
-        """Connect to MongoDB"""
+        """Create the MongoDB client (idempotent; pymongo connects in the background)"""
+        if self._client is not None:
+            return
+        with self._lock:
+            if self._client is None:
+                settings = get_settings()
+                client = MongoClient(settings.mongodb_uri)
+                self._db = client[settings.db_name]
+                self._client = client
+                print("MongoDB client initialized")
+
+    def ping(self):
+        """Return True if the server answers"""
         try:
-            mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-            self.client = MongoClient(mongo_uri)
-            self.db = self.client[os.getenv('DB_NAME', 'plagiarism_detector')]
-            # Test connection
             self.client.admin.command('ping')
-            print("Successfully connected to MongoDB")
+            return True
         except Exception as e:
             print(f"Error connecting to MongoDB: {e}")
-            raise e
+            return False
     
     def get_collection(self, collection_name):
         """Get a collection from the database"""
@@ -30,8 +51,11 @@ class Database:
     
     def close(self):
         """Close database connection"""
-        if self.client:
-            self.client.close()
+        with self._lock:
+            if self._client:
+                self._client.close()
+                self._client = None
+                self._db = None
 
-# Initialize database instance
+# Initialize database instance (connects lazily)
 db = Database()
@@ -1,46 +1,203 @@
 from models.database import db
-from datetime import datetime
+from models.user_stats import UserStats, risk_level
+from models.analysis_details import AnalysisDetails, split_analysis, merge_analysis
+from datetime import datetime, timedelta
+import json
+import base64
+import binascii
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, ASCENDING, DESCENDING
+
+# Fields the history list needs; per-candidate analysis_results (with their
+# overlap_files) are only loaded by get_result_by_id
+HISTORY_PROJECTION = {
+    "user_id": 1,
+    "repo_url": 1,
+    "status": 1,
+    "created_at": 1,
+    "finished_at": 1,
+    "analysis_data.suspect_repo": 1,
+    "analysis_data.summary": 1,
+    "analysis_data.plagiarism_detected": 1,
+    "analysis_data.language": 1,
+    "analysis_data.candidates_analyzed": 1
+}
+
+# What a shared history entry copies from the result it reuses
+SHARE_PROJECTION = {"analysis_data": 1, "details_id": 1}
+
+def encode_cursor(doc):
+    """Opaque history cursor pointing just after doc"""
+    position = {"t": doc["created_at"].isoformat(), "id": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Return (created_at, ObjectId) from encode_cursor output; ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(position["t"]), ObjectId(position["id"])
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, InvalidId, ValueError):
+        raise ValueError("Invalid cursor")
 
 class PlagiarismResult:
     def __init__(self):
-        self.collection = db.get_collection('plagiarism_results')
+        self.stats = UserStats()
+        self.details = AnalysisDetails()
+    
+    @property
+    def collection(self):
+        return db.get_collection('plagiarism_results')
     
-    def save_result(self, user_id, repo_url, analysis_data):
-        """Save plagiarism analysis result"""
+    def ensure_indexes(self):
+        """Create the indexes used by history, stats and the job queue (idempotent)"""
+        try:
+            # History listing and stats: equality on user_id/status, sorted or ranged by
+            # created_at, with _id as the tie-breaker of the history cursor
+            self.collection.create_index(
+                [("user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_status_created_id"
+            )
+            # Job queue: oldest queued job, stale running jobs
+            self.collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created")
+            self.collection.create_index([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated")
+            # Request deduplication: identical active jobs, recent identical results,
+            # attached jobs and results sharing stored details
+            self.collection.create_index([("request_key", ASCENDING), ("status", ASCENDING)], name="request_key_status", sparse=True)
+            self.collection.create_index([("dedup_key", ASCENDING), ("completed_at", DESCENDING)], name="dedup_key_completed", sparse=True)
+            self.collection.create_index([("attached_to", ASCENDING)], name="attached_to", sparse=True)
+            self.collection.create_index([("details_id", ASCENDING)], name="details_id", sparse=True)
+            return self.details.ensure_indexes()
+        except Exception as e:
+            print(f"Warning: could not create plagiarism_results indexes: {e}")
+            return False
+    
+    def _store_details(self, result_id, analysis_data):
+        """Move per-candidate details to analysis_details; return the compact analysis_data to store inline"""
+        summary, details = split_analysis(analysis_data)
+        self.details.save(result_id, summary["analysis_results"], details)
+        return summary
+    
+    def save_result(self, user_id, repo_url, analysis_data, dedup_key=None):
+        """Save plagiarism analysis result; dedup_key lets identical requests reuse it"""
+        result_id = ObjectId()
+        # Details first, so a visible result always has them
+        summary = self._store_details(result_id, analysis_data)
+        now = datetime.utcnow()
         result_data = {
+            "_id": result_id,
             "user_id": user_id,
             "repo_url": repo_url,
-            "analysis_data": analysis_data,
-            "created_at": datetime.utcnow(),
+            "analysis_data": summary,
+            "details_id": result_id,
+            "created_at": now,
+            "completed_at": now,
             "status": "completed"
         }
+        if dedup_key:
+            result_data["dedup_key"] = dedup_key
         
         result = self.collection.insert_one(result_data)
+        self.stats.record(user_id, result_data["created_at"], risk_level(analysis_data))
+        return str(result.inserted_id)
+    
+    def find_recent_result(self, dedup_key, max_age_seconds):
+        """Newest completed result for dedup_key finished within max_age_seconds, or None"""
+        if not dedup_key or max_age_seconds <= 0:
+            return None
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+        try:
+            return self.collection.find_one(
+                {"dedup_key": dedup_key, "status": "completed", "completed_at": {"$gte": cutoff}},
+                SHARE_PROJECTION,
+                sort=[("completed_at", -1)]
+            )
+        except Exception as e:
+            print(f"Error looking up recent results: {e}")
+            return None
+    
+    def get_share_source(self, result_id):
+        """The stored analysis of a completed result, for save_shared_result"""
+        try:
+            return self.collection.find_one({"_id": ObjectId(result_id), "status": "completed"}, SHARE_PROJECTION)
+        except Exception as e:
+            print(f"Error loading result {result_id}: {e}")
+            return None
+    
+    @staticmethod
+    def _shared_fields(source):
+        """Fields that make a result reuse the stored analysis of source"""
+        return {
+            # result_id inside the payload names the source's job, not the new entry
+            "analysis_data": {k: v for k, v in source["analysis_data"].items() if k != "result_id"},
+            "details_id": source.get("details_id", source["_id"]),
+            "shared_from": str(source["_id"])
+        }
+    
+    def save_shared_result(self, user_id, repo_url, source):
+        """
+        Give a user their own history entry for an analysis served from
+        source (a find_recent_result document). Shared entries have no
+        dedup_key, so serving them never extends the freshness window.
+        """
+        now = datetime.utcnow()
+        result_data = dict(
+            self._shared_fields(source),
+            user_id=user_id,
+            repo_url=repo_url,
+            created_at=now,
+            completed_at=now,
+            status="completed"
+        )
+        result = self.collection.insert_one(result_data)
+        self.stats.record(user_id, now, risk_level(source["analysis_data"]))
         return str(result.inserted_id)
     
-    def get_user_history(self, user_id, limit=50, skip=0):
-        """Get user's plagiarism analysis history"""
+    def get_user_history(self, user_id, limit=20, cursor=None, skip=0):
+        """
+        Get summaries of a user's analyses, newest first (full documents via
+        get_result_by_id). Returns (history, next_cursor); pass next_cursor
+        back to get the following page. next_cursor is None on the last page.
+        skip is only for clients still paging by number.
+        """
+        query = {"user_id": user_id, "status": "completed"}
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            # Keyset pagination: strictly after the last item of the previous page
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": last_id}}
+            ]
         try:
-            results = self.collection.find(
-                {"user_id": user_id}
-            ).sort("created_at", -1).limit(limit).skip(skip)
+            results = self.collection.find(query, HISTORY_PROJECTION).sort(
+                [("created_at", -1), ("_id", -1)]
+            ).skip(skip).limit(limit + 1)
             
-            history = []
-            for result in results:
+            history = list(results)
+            next_cursor = encode_cursor(history[limit - 1]) if len(history) > limit else None
+            history = history[:limit]
+            for result in history:
                 result['_id'] = str(result['_id'])
-                history.append(result)
             
-            return history
+            return history, next_cursor
         except Exception as e:
             print(f"Error fetching user history: {e}")
-            return []
+            return [], None
     
-    def get_result_by_id(self, result_id):
-        """Get specific plagiarism result by ID"""
+    def get_result_by_id(self, result_id, include_details=True):
+        """Get specific plagiarism result by ID, with the per-candidate details merged back in"""
         try:
             result = self.collection.find_one({"_id": ObjectId(result_id)})
             if result:
+                analysis_data = result.get('analysis_data') or {}
+                if include_details and analysis_data.get('details_stored'):
+                    details_id = result.get('details_id', result['_id'])
+                    result['analysis_data'] = merge_analysis(analysis_data, self.details.load(details_id))
+                if 'details_id' in result:
+                    result['details_id'] = str(result['details_id'])
+                if 'attached_to' in result:
+                    result['attached_to'] = str(result['attached_to'])
                 result['_id'] = str(result['_id'])
                 return result
             return None
@@ -50,30 +207,226 @@ class PlagiarismResult:
     def delete_result(self, result_id, user_id):
         """Delete a plagiarism result (only by owner)"""
         try:
-            result = self.collection.delete_one({
-                "_id": ObjectId(result_id),
-                "user_id": user_id
-            })
-            return result.deleted_count > 0
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(result_id), "user_id": user_id},
+                projection={"status": 1, "created_at": 1, "details_id": 1, "analysis_data.summary.overall_risk_level": 1}
+            )
+            if deleted is None:
+                return False
+            # Details may be shared with other users' entries
+            details_id = deleted.get("details_id", deleted["_id"])
+            if self.collection.count_documents({"details_id": details_id}, limit=1) == 0:
+                self.details.delete(details_id)
+            self._release_attached(deleted["_id"])
+            if deleted.get("status") == "completed":
+                self.stats.record(user_id, deleted["created_at"], risk_level(deleted.get("analysis_data")), delta=-1)
+            return True
         except:
             return False
     
     def get_stats(self, user_id):
-        """Get user statistics"""
+        """Get user statistics (totals, last 30 days, risk levels) from the precomputed stats document"""
         try:
-            total_analyses = self.collection.count_documents({"user_id": user_id})
-            
-            # Get recent analyses (last 30 days)
-            thirty_days_ago = datetime.utcnow().replace(day=datetime.utcnow().day - 30)
-            recent_analyses = self.collection.count_documents({
-                "user_id": user_id,
-                "created_at": {"$gte": thirty_days_ago}
-            })
-            
-            return {
-                "total_analyses": total_analyses,
-                "recent_analyses": recent_analyses
-            }
+            return self.stats.get(user_id)
         except Exception as e:
             print(f"Error fetching stats: {e}")
-            return {"total_analyses": 0, "recent_analyses": 0}
+            return {"total_analyses": 0, "recent_analyses": 0, "risk_levels": {}}
+
+    def create_job(self, user_id, repo_url, params=None, request_key=None):
+        """
+        Queue a plagiarism analysis job. If an identical request (same
+        request_key) is already queued or running, the new job is attached
+        to it instead and completes with its result.
+        """
+        now = datetime.utcnow()
+        job_data = {
+            "user_id": user_id,
+            "repo_url": repo_url,
+            "params": params or {},
+            "status": "queued",
+            "progress": {"step": "queued", "message": "Waiting for a worker"},
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now
+        }
+        if request_key:
+            job_data["request_key"] = request_key
+            leader = self.collection.find_one(
+                {"request_key": request_key, "status": {"$in": ["queued", "running"]}},
+                {"_id": 1},
+                sort=[("created_at", 1)]
+            )
+            if leader:
+                job_data["status"] = "attached"
+                job_data["attached_to"] = leader["_id"]
+                job_data["progress"] = {"step": "attached", "message": "Waiting for an identical analysis in progress"}
+
+        result = self.collection.insert_one(job_data)
+        if job_data["status"] == "attached":
+            self._recheck_leader(job_data["attached_to"])
+        return str(result.inserted_id)
+
+    def _recheck_leader(self, leader_id):
+        """
+        Settle jobs attached to leader_id if it finished before they were
+        inserted; its own completion or failure found nothing to update then
+        """
+        leader = self.collection.find_one({"_id": leader_id}, {"status": 1, **SHARE_PROJECTION, "shared_from": 1})
+        if leader and leader["status"] in ("queued", "running"):
+            return
+        if leader and leader["status"] == "completed":
+            self._complete_attached(leader_id, leader, datetime.utcnow())
+        else:
+            self._release_attached(leader_id)
+
+    def claim_next_job(self, worker_id):
+        """Atomically move the oldest queued job to running and return it"""
+        now = datetime.utcnow()
+        job = self.collection.find_one_and_update(
+            {"status": "queued"},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job:
+            job['_id'] = str(job['_id'])
+        return job
+
+    def update_job_progress(self, job_id, progress):
+        """Record the current step of a running job (doubles as a heartbeat)"""
+        now = datetime.utcnow()
+        progress = dict(progress, updated_at=now)
+        self.collection.update_one(
+            {"_id": ObjectId(job_id), "status": "running"},
+            {"$set": {"progress": progress, "updated_at": now}}
+        )
+
+    def complete_job(self, job_id, analysis_data=None, dedup_key=None, source=None):
+        """
+        Store the final analysis result on a job, either analysis_data or
+        the stored analysis of source (a find_recent_result document).
+        Jobs attached to this one complete with the same result.
+        """
+        now = datetime.utcnow()
+        job_oid = ObjectId(job_id)
+        if source is not None:
+            fields = self._shared_fields(source)
+        else:
+            fields = {"analysis_data": self._store_details(job_oid, analysis_data), "details_id": job_oid}
+            if dedup_key:
+                fields["dedup_key"] = dedup_key
+        # Only the first completion counts toward the user's stats
+        job = self.collection.find_one_and_update(
+            {"_id": job_oid, "status": {"$ne": "completed"}},
+            {"$set": dict(
+                fields,
+                status="completed",
+                progress={"step": "completed", "message": "Analysis completed", "updated_at": now},
+                finished_at=now,
+                completed_at=now,
+                updated_at=now
+            )},
+            projection={"user_id": 1, "created_at": 1}
+        )
+        if job is not None:
+            self.stats.record(job["user_id"], job["created_at"], risk_level(fields["analysis_data"]))
+        elif source is None and self.collection.count_documents({"_id": job_oid}, limit=1) == 0:
+            # Deleted while it ran: nothing references the details just stored
+            self.details.delete(job_oid)
+            return
+        self._complete_attached(job_oid, fields, now)
+    
+    def _complete_attached(self, leader_id, fields, now):
+        followers = list(self.collection.find(
+            {"attached_to": leader_id, "status": "attached"}, {"user_id": 1, "created_at": 1}
+        ))
+        if not followers:
+            return
+        shared = self._shared_fields(dict(fields, _id=leader_id))
+        shared["shared_from"] = fields.get("shared_from", shared["shared_from"])
+        result = self.collection.update_many(
+            {"_id": {"$in": [f["_id"] for f in followers]}, "status": "attached"},
+            {"$set": dict(
+                shared,
+                status="completed",
+                progress={"step": "completed", "message": "Analysis completed (shared)", "updated_at": now},
+                finished_at=now,
+                completed_at=now,
+                updated_at=now
+            )}
+        )
+        if result.modified_count:
+            for follower in followers:
+                self.stats.record(follower["user_id"], follower["created_at"], risk_level(fields["analysis_data"]))
+            print(f"🔗 Completed {result.modified_count} attached jobs with the result of {leader_id}")
+    
+    def _release_attached(self, leader_id):
+        """Requeue jobs waiting on leader_id so they run on their own"""
+        try:
+            result = self.collection.update_many(
+                {"attached_to": leader_id, "status": "attached"},
+                {
+                    "$set": {
+                        "status": "queued",
+                        "progress": {"step": "queued", "message": "Waiting for a worker"},
+                        "updated_at": datetime.utcnow()
+                    },
+                    "$unset": {"attached_to": ""}
+                }
+            )
+            return result.modified_count
+        except Exception as e:
+            print(f"Error releasing attached jobs: {e}")
+            return 0
+
+    def fail_job(self, job_id, error, details=None):
+        """Mark a job as failed"""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {
+                "status": "failed",
+                "error": error,
+                "error_details": details,
+                "progress": {"step": "failed", "message": error, "updated_at": now},
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+        # Jobs attached to a failed one get a run of their own
+        self._release_attached(ObjectId(job_id))
+
+    def requeue_stale_jobs(self, stale_after_seconds, max_attempts=3):
+        """Requeue running jobs whose worker stopped reporting (e.g. after a restart)"""
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        try:
+            exhausted = [job["_id"] for job in self.collection.find(
+                {"status": "running", "updated_at": {"$lt": cutoff}, "attempts": {"$gte": max_attempts}}, {"_id": 1}
+            )]
+            if exhausted:
+                self.collection.update_many(
+                    {"_id": {"$in": exhausted}, "status": "running"},
+                    {"$set": {"status": "failed", "error": "Job exceeded maximum attempts", "updated_at": datetime.utcnow()}}
+                )
+                for job_id in exhausted:
+                    self._release_attached(job_id)
+            result = self.collection.update_many(
+                {"status": "running", "updated_at": {"$lt": cutoff}},
+                {"$set": {
+                    "status": "queued",
+                    "progress": {"step": "queued", "message": "Requeued after worker interruption"},
+                    "updated_at": datetime.utcnow()
+                }}
+            )
+            return result.modified_count
+        except Exception as e:
+            print(f"Error requeueing stale jobs: {e}")
+            return 0
@@ -1,11 +1,24 @@
 from models.database import db
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
+from utils.user_cache import user_cache
 import bcrypt
 
 class User:
-    def __init__(self):
-        self.collection = db.get_collection('users')
+    @property
+    def collection(self):
+        return db.get_collection('users')
+    
+    def ensure_indexes(self):
+        """Create the indexes used by login and registration (idempotent)"""
+        try:
+            self.collection.create_index([("username", ASCENDING)], name="username")
+            self.collection.create_index([("email", ASCENDING)], name="email")
+            return True
+        except Exception as e:
+            print(f"Warning: could not create users indexes: {e}")
+            return False
     
     def create_user(self, username, email, password):
         """Create a new user"""
@@ -65,6 +78,8 @@ class User:
                 {"_id": ObjectId(user_id)},
                 {"$set": update_data}
             )
+            # auth_required must not serve the old record
+            user_cache.invalidate(user_id)
             return result.modified_count > 0
         except:
             return False
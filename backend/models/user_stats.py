@@ -0,0 +1,126 @@
+"""
+Per-user analysis statistics, maintained incrementally.
+
+One document per user in user_stats:
+
+    {"_id": user_id, "total": 12, "daily": {"2026-10-17": 3, ...},
+     "risk_levels": {"Low": 9, "High": 3}, "updated_at": ...}
+
+PlagiarismResult bumps it with an atomic $inc whenever a completed
+analysis is saved or deleted, so reading stats is a single _id lookup.
+Documents missing for a user are rebuilt from plagiarism_results on first
+read; rebuild everything with:
+
+    python -m models.user_stats rebuild
+"""
+import sys
+from datetime import datetime, timedelta
+from models.database import db
+
+RECENT_DAYS = 30
+UNKNOWN_RISK = "Unknown"
+
+
+def day_key(created_at):
+    return created_at.strftime("%Y-%m-%d")
+
+def risk_level(analysis_data):
+    level = ((analysis_data or {}).get("summary") or {}).get("overall_risk_level")
+    # Field names can't contain '.' or start with '$'
+    if not isinstance(level, str) or not level or "." in level or level.startswith("$"):
+        return UNKNOWN_RISK
+    return level
+
+
+class UserStats:
+    @property
+    def collection(self):
+        return db.get_collection('user_stats')
+
+    def record(self, user_id, created_at, risk, delta=1):
+        """Count (delta=1) or uncount (delta=-1) one completed analysis"""
+        try:
+            self.collection.update_one(
+                {"_id": user_id},
+                {
+                    "$inc": {
+                        "total": delta,
+                        f"daily.{day_key(created_at)}": delta,
+                        f"risk_levels.{risk}": delta
+                    },
+                    "$set": {"updated_at": datetime.utcnow()}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            # The totals drift until the next rebuild, the analysis itself is saved
+            print(f"Warning: could not update stats for user {user_id}: {e}")
+
+    def get(self, user_id):
+        """Return {total_analyses, recent_analyses, risk_levels} for a user"""
+        doc = self.collection.find_one({"_id": user_id})
+        if doc is None:
+            doc = self.rebuild(user_id).get(user_id) or {}
+
+        cutoff = day_key(datetime.utcnow() - timedelta(days=RECENT_DAYS))
+        daily = doc.get("daily") or {}
+        stale = [day for day in daily if day < cutoff]
+        if stale:
+            # Old buckets only ever count toward the total; drop them
+            self.collection.update_one({"_id": user_id}, {"$unset": {f"daily.{day}": "" for day in stale}})
+        return {
+            "total_analyses": max(0, doc.get("total", 0)),
+            "recent_analyses": max(0, sum(count for day, count in daily.items() if day >= cutoff)),
+            "risk_levels": {level: count for level, count in (doc.get("risk_levels") or {}).items() if count > 0}
+        }
+
+    def rebuild(self, user_id=None):
+        """
+        Recompute stats from plagiarism_results for one user (or everyone)
+        and replace the stored documents. Returns {user_id: stats document}.
+        """
+        match = {"status": "completed"}
+        if user_id is not None:
+            match["user_id"] = user_id
+        cutoff = datetime.utcnow() - timedelta(days=RECENT_DAYS)
+        pipeline = [
+            {"$match": match},
+            {"$project": {
+                "user_id": 1,
+                "risk": {"$ifNull": ["$analysis_data.summary.overall_risk_level", UNKNOWN_RISK]},
+                "day": {"$cond": [
+                    {"$gte": ["$created_at", cutoff]},
+                    {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                    None
+                ]}
+            }},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "risk": "$risk", "day": "$day"},
+                "count": {"$sum": 1}
+            }}
+        ]
+
+        docs = {}
+        if user_id is not None:
+            docs[user_id] = {"_id": user_id, "total": 0, "daily": {}, "risk_levels": {}}
+        for group in db.get_collection('plagiarism_results').aggregate(pipeline, allowDiskUse=True):
+            key = group["_id"]
+            doc = docs.setdefault(key["user_id"], {"_id": key["user_id"], "total": 0, "daily": {}, "risk_levels": {}})
+            doc["total"] += group["count"]
+            risk = risk_level({"summary": {"overall_risk_level": key.get("risk")}})
+            doc["risk_levels"][risk] = doc["risk_levels"].get(risk, 0) + group["count"]
+            if key.get("day"):
+                doc["daily"][key["day"]] = doc["daily"].get(key["day"], 0) + group["count"]
+
+        now = datetime.utcnow()
+        for doc in docs.values():
+            doc["updated_at"] = now
+            self.collection.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+        return docs
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["rebuild"]:
+        sys.exit("usage: python -m models.user_stats rebuild [user_id]")
+    rebuilt = UserStats().rebuild(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"✅ Rebuilt stats for {len(rebuilt)} users")
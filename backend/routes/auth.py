@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token
 from models.user import User
+from middleware.auth import user_claims, load_current_user
 import re
 
 auth_bp = Blueprint('auth', __name__)
@@ -50,8 +51,9 @@ def register():
         
         if status_code == 201:
             # Generate tokens
-            access_token = create_access_token(identity=result['user_id'])
-            refresh_token = create_refresh_token(identity=result['user_id'])
+            claims = user_claims({"username": username, "email": email})
+            access_token = create_access_token(identity=result['user_id'], additional_claims=claims)
+            refresh_token = create_refresh_token(identity=result['user_id'], additional_claims=claims)
             
             return jsonify({
                 "message": "User created successfully",
@@ -88,8 +90,9 @@ def login():
             return jsonify({"error": "Invalid credentials"}), 401
         
         # Generate tokens
-        access_token = create_access_token(identity=user['_id'])
-        refresh_token = create_refresh_token(identity=user['_id'])
+        claims = user_claims(user)
+        access_token = create_access_token(identity=user['_id'], additional_claims=claims)
+        refresh_token = create_refresh_token(identity=user['_id'], additional_claims=claims)
         
         return jsonify({
             "message": "Login successful",
@@ -110,12 +113,12 @@ def login():
 def refresh():
     """Refresh access token"""
     try:
-        from flask_jwt_extended import jwt_required, get_jwt_identity
+        from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
         
         @jwt_required(refresh=True)
         def _refresh():
             current_user_id = get_jwt_identity()
-            new_token = create_access_token(identity=current_user_id)
+            new_token = create_access_token(identity=current_user_id, additional_claims=user_claims(get_jwt()))
             return jsonify({"access_token": new_token}), 200
         
         return _refresh()
@@ -137,7 +140,7 @@ def verify_token():
                 return jsonify({"error": "Invalid token"}), 401
             
             # Get user details
-            user = user_model.get_user_by_id(current_user_id)
+            user = load_current_user(current_user_id)
             if not user:
                 return jsonify({"error": "User not found"}), 401
             
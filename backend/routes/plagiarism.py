@@ -1,21 +1,22 @@
-from flask import Blueprint, request, jsonify
-from middleware.auth import auth_required, optional_auth
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from middleware.auth import auth_required
 from models.plagiarism_result import PlagiarismResult
-import requests
 import re
-import os
+import threading
 import traceback
-from utils.analyze_repo import analyze_suspect_repo
-from utils.github_search import search_github_repos
-from utils.repo_utils import clone_repo
-from utils.compare_utils import (
-    compare_file_structure,
-    cosine_similarity_text,
-    compare_code_files
-)
+from utils.analysis_pipeline import run_plagiarism_analysis, NoCandidatesError
+from utils.job_queue import JobQueue
+from utils.github_client import get_github_client
+from utils.analyze_repo import get_topic_extractor
+from utils.config_loader import get_settings
+from utils.analysis_coalescer import analysis_coalescer, result_key, get_dedup_window
+from utils.progress_stream import ProgressStream
+
+DEFAULT_HISTORY_MAX_PAGE_SIZE = 100
 
 plagiarism_bp = Blueprint('plagiarism', __name__)
 result_model = PlagiarismResult()
+job_queue = JobQueue(result_model)
 
 def parse_github_url(url):
     """Extract owner and repo name from GitHub URL"""
@@ -26,99 +27,6 @@ def parse_github_url(url):
     owner, repo = m.group(1), m.group(2).replace(".git", "")
     return owner, repo
 
-def get_readme_content(repo_path):
-    """Extract README content from a repository"""
-    readme_files = ['README.md', 'README.txt', 'README.rst', 'README']
-    for readme_file in readme_files:
-        readme_path = os.path.join(repo_path, readme_file)
-        if os.path.exists(readme_path):
-            try:
-                with open(readme_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            except Exception:
-                continue
-    return ""
-
-def assess_project_uniqueness(suspect_info, candidate_repos):
-    """Assess how unique the project is based on topic and functionality"""
-    
-    suspect_topic = suspect_info.get('topic', '').lower()
-    suspect_keywords = [k.lower() for k in suspect_info.get('keywords', [])]
-    
-    # Common project types (less unique)
-    common_topics = [
-        'todo app', 'calculator', 'weather app', 'blog', 'portfolio',
-        'chat app', 'ecommerce', 'crud app', 'login system', 'basic website',
-        'simple game', 'contact form', 'image gallery', 'basic api'
-    ]
-    
-    # Advanced project types (more unique)
-    advanced_topics = [
-        'machine learning', 'blockchain', 'compiler', 'database engine',
-        'operating system', 'game engine', 'ai model', 'distributed system',
-        'neural network', 'cryptocurrency', 'computer vision', 'nlp',
-        'deep learning', 'microservices', 'kubernetes', 'docker', 'solidity',
-        'smart contract', 'defi', 'nft', 'web3', 'ethereum', 'dapp'
-    ]
-    
-    # Calculate topic uniqueness
-    is_common = any(common in suspect_topic for common in common_topics)
-    is_advanced = any(advanced in suspect_topic for advanced in advanced_topics)
-    
-    if is_advanced:
-        topic_uniqueness = 0.8
-    elif is_common:
-        topic_uniqueness = 0.3
-    else:
-        topic_uniqueness = 0.6
-    
-    # Calculate keyword overlap with candidates - FIX THE ERROR HERE
-    total_overlap = 0
-    valid_candidates = 0
-    
-    for repo in candidate_repos:
-        try:
-            # Safe handling of None values
-            repo_desc = repo.get('description') or ''
-            repo_name = repo.get('name') or ''
-            
-            # Convert to lowercase safely
-            repo_desc = repo_desc.lower() if repo_desc else ''
-            repo_name = repo_name.lower() if repo_name else ''
-            
-            keyword_matches = sum(1 for keyword in suspect_keywords 
-                                if keyword and (keyword in repo_desc or keyword in repo_name))
-            
-            if len(suspect_keywords) > 0:
-                overlap_ratio = keyword_matches / len(suspect_keywords)
-                total_overlap += overlap_ratio
-                valid_candidates += 1
-                
-        except (AttributeError, TypeError) as e:
-            print(f"Warning: Error processing repository {repo.get('name', 'unknown')}: {e}")
-            continue
-    
-    # Calculate average overlap only from valid candidates
-    if valid_candidates > 0:
-        avg_keyword_overlap = total_overlap / valid_candidates
-    else:
-        avg_keyword_overlap = 0.0
-    
-    # Higher overlap = less unique
-    keyword_uniqueness = 1.0 - min(avg_keyword_overlap, 0.8)
-    
-    # Combined uniqueness score
-    overall_uniqueness = (topic_uniqueness + keyword_uniqueness) / 2
-    
-    return {
-        'overall_uniqueness': round(overall_uniqueness * 100, 1),  # Convert to percentage
-        'topic_uniqueness': round(topic_uniqueness * 100, 1),
-        'keyword_uniqueness': round(keyword_uniqueness * 100, 1),
-        'is_common_project_type': is_common,
-        'is_advanced_project_type': is_advanced,
-        'avg_keyword_overlap': round(avg_keyword_overlap * 100, 1)
-    }
-
 def simple_github_search(language="Python", per_page=10):
     """Simple GitHub search without advanced analysis"""
     try:
@@ -129,7 +37,7 @@ def simple_github_search(language="Python", per_page=10):
             "order": "desc"
         }
         
-        response = requests.get("https://api.github.com/search/repositories", params=params)
+        response = get_github_client().get("/search/repositories", params=params, resource="search")
         if response.status_code == 200:
             results = response.json()
             return results.get("items", [])[:5]  # Return top 5 results
@@ -138,6 +46,97 @@ def simple_github_search(language="Python", per_page=10):
     
     return []
 
+def read_analysis_request():
+    """
+    Validate the JSON body of an analysis request. Returns (options, None)
+    or (None, error response).
+    """
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return None, (jsonify({"error": "No JSON data provided"}), 400)
+    
+    repo_url = data.get('repo_url')
+    if not repo_url:
+        return None, (jsonify({"error": "repo_url is required"}), 400)
+    
+    options = {
+        "repo_url": repo_url,
+        # Optional parameters with defaults - language will be auto-detected
+        "manual_language": data.get('language'),  # User can still override if needed
+        "bypass_cache": bool(data.get('bypass_cache')),  # Force a fresh topic analysis
+        "topic_extractor": data.get('topic_extractor'),  # "auto", "gemini" or "local"
+        "async": bool(data.get('async'))
+    }
+    
+    # Validate GitHub URL and extractor choice
+    try:
+        parse_github_url(repo_url)
+        get_topic_extractor(options['topic_extractor'])
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+    return options, None
+
+def perform_analysis(current_user, repo_url, manual_language=None, bypass_cache=False,
+                     topic_extractor=None, progress=None):
+    """
+    Run (or reuse) an analysis for /analyze and /analyze/stream and save it
+    to the user's history. Returns (payload, status code).
+    """
+    params = {"language": manual_language, "bypass_cache": bypass_cache, "topic_extractor": topic_extractor}
+    
+    # Serve a recent identical analysis of the same commit if there is one
+    dedup_key = result_key(repo_url, params)
+    source = result_model.find_recent_result(dedup_key, get_dedup_window())
+    shared_source = source and result_model.get_result_by_id(source['_id'])
+    if shared_source:
+        analysis_coalescer.count("recent_hits")
+        print(f"♻️  Serving recent analysis {source['_id']} for: {repo_url}")
+        response_data = {k: v for k, v in shared_source['analysis_data'].items() if k != 'result_id'}
+        if current_user:
+            response_data['result_id'] = result_model.save_shared_result(current_user['_id'], repo_url, source)
+        response_data['shared_result'] = True
+        return response_data, 200
+    
+    def analyze_and_save():
+        print(f"Starting plagiarism analysis for: {repo_url}")
+        analysis_data = run_plagiarism_analysis(
+            repo_url, manual_language, progress=progress,
+            bypass_cache=bypass_cache, topic_extractor=topic_extractor
+        )
+        # Save to database if user is authenticated
+        if current_user:
+            analysis_data['result_id'] = result_model.save_result(
+                user_id=current_user['_id'],
+                repo_url=repo_url,
+                analysis_data=analysis_data,
+                dedup_key=dedup_key
+            )
+        return analysis_data
+    
+    def on_wait():
+        if progress:
+            progress("attached", "Waiting for an identical analysis in progress")
+    
+    try:
+        # Concurrent identical requests in this process share one run
+        response_data, shared = analysis_coalescer.run(dedup_key, analyze_and_save, on_wait=on_wait)
+    except NoCandidatesError as e:
+        return e.payload, 404
+    
+    if shared:
+        # Point this user's entry at the stored result of the run we joined
+        source = response_data.get('result_id') and result_model.get_share_source(response_data['result_id'])
+        response_data.pop('result_id', None)
+        if current_user and source:
+            response_data['result_id'] = result_model.save_shared_result(current_user['_id'], repo_url, source)
+        elif current_user:
+            response_data['result_id'] = result_model.save_result(current_user['_id'], repo_url, response_data)
+        response_data['shared_result'] = True
+    
+    print("Analysis completed successfully")
+    return response_data, 200
+
 @plagiarism_bp.route('/analyze', methods=['POST'])
 @auth_required
 def analyze_plagiarism():
@@ -145,324 +144,155 @@ def analyze_plagiarism():
     Analyze a repository for plagiarism (simplified version)
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
-        
-        repo_url = data.get('repo_url')
-        if not repo_url:
-            return jsonify({"error": "repo_url is required"}), 400
+        options, error = read_analysis_request()
+        if error:
+            return error
         
-        # Optional parameters with defaults - language will be auto-detected
-        manual_language = data.get('language')  # User can still override if needed
+        # Hand off to the background workers if the client asked for it
+        if options['async']:
+            return submit_analysis_job(
+                options['repo_url'], options['manual_language'], options['bypass_cache'], options['topic_extractor']
+            )
         
-        print(f"Starting plagiarism analysis for: {repo_url}")
+        response_data, status = perform_analysis(
+            getattr(request, 'current_user', None),
+            options['repo_url'],
+            options['manual_language'],
+            bypass_cache=options['bypass_cache'],
+            topic_extractor=options['topic_extractor']
+        )
+        return jsonify(response_data), status
         
-        # Validate GitHub URL
+    except Exception as e:
+        print(f"Error in plagiarism analysis: {str(e)}")
+        traceback.print_exc()
+        return jsonify({
+            "error": "Internal server error during analysis",
+            "details": str(e)
+        }), 500
+
+@plagiarism_bp.route('/analyze/stream', methods=['POST'])
+@auth_required
+def analyze_plagiarism_stream():
+    """
+    Analyze a repository, streaming progress as Server-Sent Events.
+    
+    Every pipeline stage is sent as an event named after its step (see
+    the README); the stream ends with a "result" event carrying the
+    same payload /analyze returns, or an "error" event.
+    """
+    options, error = read_analysis_request()
+    if error:
+        return error
+    
+    stream = ProgressStream()
+    current_user = getattr(request, 'current_user', None)
+    
+    def run():
         try:
-            owner, repo_name = parse_github_url(repo_url)
-        except ValueError as e:
-            return jsonify({"error": str(e)}), 400
+            payload, status = perform_analysis(
+                current_user,
+                options['repo_url'],
+                options['manual_language'],
+                bypass_cache=options['bypass_cache'],
+                topic_extractor=options['topic_extractor'],
+                progress=stream.progress
+            )
+            if status == 200:
+                stream.finish("result", payload)
+            else:
+                stream.finish("error", dict(payload, http_status=status))
+        except Exception as e:
+            print(f"Error in streamed plagiarism analysis: {e}")
+            traceback.print_exc()
+            stream.finish("error", {
+                "error": "Internal server error during analysis",
+                "details": str(e),
+                "http_status": 500
+            })
+    
+    # The analysis keeps running (and is saved) if the client disconnects
+    threading.Thread(target=run, name="analysis-stream", daemon=True).start()
+    return Response(stream_with_context(stream.events()), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+def submit_analysis_job(repo_url, manual_language=None, bypass_cache=False, topic_extractor=None):
+    """Queue an analysis for the current user and return 202 with the job id"""
+    current_user = getattr(request, 'current_user', None)
+    job_id = job_queue.submit(
+        user_id=current_user['_id'],
+        repo_url=repo_url,
+        params={"language": manual_language, "bypass_cache": bypass_cache, "topic_extractor": topic_extractor}
+    )
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/plagiarism/jobs/{job_id}"
+    }), 202
 
-        # Step 1: Analyze the suspect repository (now includes language detection)
-        print(f"🔍 Step 1: Analyzing suspect repo: {repo_url}")
-        suspect_info = analyze_suspect_repo(repo_url)
+@plagiarism_bp.route('/jobs', methods=['POST'])
+@auth_required
+def create_job():
+    """Queue a plagiarism analysis and return immediately with a job id"""
+    try:
+        options, error = read_analysis_request()
+        if error:
+            return error
         
-        # Extract primary languages from the repository
-        primary_languages = suspect_info.get('primary_languages', ['Python'])
-        main_language = manual_language or primary_languages[0] if primary_languages else 'Python'
+        return submit_analysis_job(
+            options['repo_url'], options['manual_language'], options['bypass_cache'], options['topic_extractor']
+        )
         
-        print(f"✅ Suspect repo analyzed: {suspect_info['repo_name']} by {suspect_info['repo_owner']}")
-        print(f"📝 Topic: {suspect_info['topic']}")
-        print(f"💻 Detected languages: {', '.join(primary_languages)}")
-        print(f"� Primary language for search: {main_language}")
-        print(f"�🏷️  Keywords: {', '.join(suspect_info['keywords'][:5])}...")
+    except Exception as e:
+        print(f"Error queueing analysis job: {e}")
+        return jsonify({"error": "Failed to queue analysis"}), 500
 
-        # Step 2: Search for candidate repositories using detected languages
-        print(f"🔎 Step 2: Searching for candidate repositories...")
-        print(f"📝 Search parameters:")
-        print(f"   Keywords: {suspect_info['keywords'][:5]}...")
-        print(f"   Topic: {suspect_info['topic']}")
-        print(f"   Exclude user: {suspect_info['repo_owner']}")
-        print(f"   Primary Language: {main_language}")
-        print(f"   All Languages: {', '.join(primary_languages)}")
-        
-        # Search with primary language first, then fallback to other languages if needed
-        candidate_repos = []
+@plagiarism_bp.route('/jobs/<job_id>', methods=['GET'])
+@auth_required
+def get_job(job_id):
+    """Get status, progress and (once finished) the result of an analysis job"""
+    try:
+        current_user = getattr(request, 'current_user', None)
         
-        # Try primary language first
-        languages_to_try = [main_language] + [lang for lang in primary_languages if lang != main_language]
+        job = result_model.get_result_by_id(job_id)
         
-        for lang in languages_to_try:
-            if len(candidate_repos) >= 15:  # Stop if we have enough candidates
-                break
-                
-            try:
-                print(f"🔍 Searching with language: {lang}")
-                lang_candidates = search_github_repos(
-                    keywords=suspect_info["keywords"],
-                    topic=suspect_info["topic"],
-                    exclude_user=suspect_info["repo_owner"],
-                    language=lang,
-                    min_stars=0,
-                    per_page=20,
-                    max_results=30,
-                )
-                
-                # Add candidates, avoiding duplicates
-                for candidate in lang_candidates:
-                    if not any(existing['html_url'] == candidate['html_url'] for existing in candidate_repos):
-                        candidate_repos.append(candidate)
-                        
-                print(f"📊 Found {len(lang_candidates)} candidates for {lang} (total: {len(candidate_repos)})")
-                
-            except Exception as e:
-                print(f"❌ Search failed for {lang}: {e}")
-                continue
-
-        # Increase limit from 5 to 15 candidates for better analysis
-        candidate_repos = candidate_repos[:15]
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
         
-        if not candidate_repos:
-            return jsonify({
-                "error": "No candidate repositories found for comparison",
-                "repo_url": repo_url,
-                "detected_languages": primary_languages,
-                "candidates_found": 0
-            }), 404
-
-        # Step 3: Compare with each candidate
-        analysis_results = []
-        max_structure_similarity = 0.0
-        max_readme_similarity = 0.0
-        max_code_similarity = 0.0
-        high_similarity_count = 0
-
-        for i, repo in enumerate(candidate_repos, 1):
-            try:
-                print(f"🔍 Step 3.{i}: Analyzing candidate {i}/{len(candidate_repos)}: {repo['html_url']}")
-                
-                # Clone candidate repository to a safe location
-                candidates_base_dir = "/tmp/plaghunt_candidates"
-                os.makedirs(candidates_base_dir, exist_ok=True)
-                candidate_dir = os.path.join(candidates_base_dir, repo["full_name"].replace("/", "_"))
-                print(f"📥 Cloning {repo['full_name']} to {candidate_dir}...")
-                clone_repo(repo["html_url"], candidate_dir)
-
-                # Compare file structure
-                print("📁 Comparing file structures...")
-                structure_ratio, overlap_files = compare_file_structure(
-                    suspect_info["local_path"],
-                    candidate_dir
-                )
-
-                # Compare README files
-                print("📄 Comparing README files...")
-                readme_similarity = 0.0
-                try:
-                    readme_similarity = cosine_similarity_text(
-                        suspect_info.get("readme_content", ""),
-                        get_readme_content(candidate_dir)
-                    )
-                except Exception as e:
-                    print(f"README comparison failed: {e}")
-
-                # Compare code files
-                print("💻 Comparing code files...")
-                code_similarity = 0.0
-                try:
-                    code_similarity = compare_code_files(
-                        suspect_info["local_path"],
-                        candidate_dir
-                    )
-                except Exception as e:
-                    print(f"Code comparison failed: {e}")
-
-                # Calculate enhanced weighted similarity
-                def calculate_weighted_similarity(structure_ratio, readme_similarity, code_similarity):
-                    """Calculate weighted similarity that better reflects plagiarism risk"""
-                    # Weight code similarity highest as it's most indicative of plagiarism
-                    weights = {
-                        'code': 0.5,        # 50% - most important
-                        'structure': 0.3,   # 30% - structural copying
-                        'readme': 0.2       # 20% - documentation copying
-                    }
-                    
-                    # Apply weights
-                    weighted_score = (
-                        code_similarity * weights['code'] +
-                        structure_ratio * weights['structure'] +
-                        readme_similarity * weights['readme']
-                    )
-                    
-                    # Boost score if multiple high similarities (indicates systematic copying)
-                    high_sim_count = sum([
-                        1 for sim in [structure_ratio, readme_similarity, code_similarity] 
-                        if sim > 0.7
-                    ])
-                    
-                    if high_sim_count >= 2:
-                        weighted_score *= 1.2  # 20% boost for multiple high similarities
-                    
-                    return min(weighted_score, 1.0)  # Cap at 1.0
-
-                # Calculate enhanced similarity
-                overall_similarity = calculate_weighted_similarity(
-                    structure_ratio, readme_similarity, code_similarity
-                )
-
-                # Update maximums
-                max_structure_similarity = max(max_structure_similarity, structure_ratio)
-                max_readme_similarity = max(max_readme_similarity, readme_similarity)
-                max_code_similarity = max(max_code_similarity, code_similarity)
-
-                # Enhanced plagiarism detection with multiple criteria
-                high_code_sim = code_similarity > 0.8
-                high_structure_sim = structure_ratio > 0.7
-                high_readme_sim = readme_similarity > 0.8
-                high_overall_sim = overall_similarity > 0.7
-                
-                # More sophisticated plagiarism detection
-                is_high_similarity = (
-                    high_overall_sim or
-                    (high_code_sim and high_structure_sim) or
-                    (code_similarity > 0.9) or  # Very high code similarity alone
-                    (structure_ratio > 0.9)     # Very high structure similarity alone
-                )
-                
-                if is_high_similarity:
-                    high_similarity_count += 1
-
-                # Determine risk level for this specific match
-                if overall_similarity > 0.9:
-                    match_risk = "Critical"
-                elif overall_similarity > 0.8:
-                    match_risk = "High"
-                elif overall_similarity > 0.6:
-                    match_risk = "Medium"
-                else:
-                    match_risk = "Low"
-
-                analysis_results.append({
-                    "candidate_repo": {
-                        "name": repo["full_name"],
-                        "url": repo["html_url"],
-                        "stars": repo["stars"],
-                        "description": repo.get("description", ""),
-                        "language": repo.get("language", "")
-                    },
-                    "similarity_scores": {
-                        "structure_similarity": round(structure_ratio * 100, 1),  # Convert to percentage
-                        "readme_similarity": round(readme_similarity * 100, 1),
-                        "code_similarity": round(code_similarity * 100, 1),
-                        "overall_similarity": round(overall_similarity * 100, 1)
-                    },
-                    "risk_assessment": {
-                        "risk_level": match_risk,
-                        "high_code_similarity": high_code_sim,
-                        "high_structure_similarity": high_structure_sim,
-                        "high_readme_similarity": high_readme_sim
-                    },
-                    "overlap_files": list(overlap_files),
-                    "high_similarity": is_high_similarity
-                })
-
-                print(f"✅ Analysis complete for {repo['full_name']}: {overall_similarity:.1f}% overall similarity ({match_risk} risk)")
-
-            except Exception as e:
-                print(f"❌ Error analyzing {repo['html_url']}: {e}")
-                # Continue with next candidate
-                continue
-
-        # Assess project uniqueness
-        uniqueness_assessment = assess_project_uniqueness(suspect_info, candidate_repos)
+        if job['user_id'] != current_user['_id']:
+            return jsonify({"error": "Access denied"}), 403
         
-        # Calculate enhanced summary statistics
-        if analysis_results:
-            overall_similarities = [r["similarity_scores"]["overall_similarity"] for r in analysis_results]
-            avg_similarity = sum(overall_similarities) / len(overall_similarities)
-            highest_similarity = max(overall_similarities)
-            
-            # Count high-risk matches
-            critical_matches = len([r for r in analysis_results if r["risk_assessment"]["risk_level"] == "Critical"])
-            high_risk_matches = len([r for r in analysis_results if r["risk_assessment"]["risk_level"] in ["Critical", "High"]])
-        else:
-            avg_similarity = 0.0
-            highest_similarity = 0.0
-            critical_matches = 0
-            high_risk_matches = 0
-
-        # Enhanced risk assessment
-        if critical_matches > 0:
-            overall_risk = "Critical"
-        elif highest_similarity > 80 or high_risk_matches > 2:  # Using percentage
-            overall_risk = "High"
-        elif highest_similarity > 60 or high_risk_matches > 0:
-            overall_risk = "Medium"
-        else:
-            overall_risk = "Low"
-
-        # Enhanced plagiarism detection
-        plagiarism_detected = (
-            highest_similarity > 70 or  # Using percentage
-            critical_matches > 0 or
-            high_risk_matches > 1
-        )
-
-        # Prepare response data
-        response_data = {
-            "suspect_repo": {
-                "name": suspect_info['repo_name'],
-                "owner": suspect_info['repo_owner'],
-                "url": repo_url,
-                "topic": suspect_info['topic'],
-                "keywords": suspect_info['keywords'],
-                "primary_languages": primary_languages,  # New field
-                "language_breakdown": suspect_info.get('language_info', [])  # New field
-            },
-            "uniqueness_assessment": uniqueness_assessment,
-            "analysis_results": analysis_results,
-            "plagiarism_detected": plagiarism_detected,
-            "summary": {
-                "total_candidates_checked": len(analysis_results),
-                "high_similarity_count": high_similarity_count,
-                "critical_matches": critical_matches,
-                "high_risk_matches": high_risk_matches,
-                "languages_analyzed": primary_languages,  # New field
-                "primary_language": main_language,  # New field
-                "max_structure_similarity": round(max_structure_similarity * 100, 1),  # Convert to percentage
-                "max_readme_similarity": round(max_readme_similarity * 100, 1),
-                "max_code_similarity": round(max_code_similarity * 100, 1),
-                "highest_similarity": round(highest_similarity, 1),  # Already in percentage
-                "average_similarity": round(avg_similarity, 1),
-                "overall_risk_level": overall_risk,
-                "project_uniqueness": uniqueness_assessment['overall_uniqueness']
-            },
-            "status": "completed"
+        response = {
+            "job_id": job['_id'],
+            "repo_url": job['repo_url'],
+            "status": job.get('status', 'completed'),
+            "progress": job.get('progress'),
+            "created_at": job.get('created_at'),
+            "started_at": job.get('started_at'),
+            "finished_at": job.get('finished_at')
         }
+        if response['status'] == 'attached':
+            # Waiting on an identical job; report that job's progress
+            leader = result_model.get_result_by_id(job['attached_to'], include_details=False)
+            response['attached_to'] = job['attached_to']
+            if leader and leader.get('status') in ('queued', 'running'):
+                response['status'] = leader['status']
+                response['progress'] = leader.get('progress')
+            else:
+                response['status'] = 'queued'
+        if response['status'] == 'completed':
+            response['result'] = job.get('analysis_data')
+        elif response['status'] == 'failed':
+            response['error'] = job.get('error')
+            response['details'] = job.get('error_details')
         
-        # Save to database if user is authenticated
-        current_user = getattr(request, 'current_user', None)
-        if current_user:
-            result_id = result_model.save_result(
-                user_id=current_user['_id'],
-                repo_url=repo_url,
-                analysis_data=response_data
-            )
-            response_data['result_id'] = result_id
-
-        print("Analysis completed successfully")
-        return jsonify(response_data), 200
+        return jsonify(response), 200
         
     except Exception as e:
-        print(f"Error in plagiarism analysis: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
-            "error": "Internal server error during analysis",
-            "details": str(e)
-        }), 500
+        print(f"Error fetching job: {e}")
+        return jsonify({"error": "Failed to fetch job"}), 500
 
 @plagiarism_bp.route('/history', methods=['GET'])
 @auth_required
@@ -471,29 +301,43 @@ def get_history():
     try:
         current_user = getattr(request, 'current_user', None)
         
-        # Get pagination parameters
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
-        skip = (page - 1) * limit
+        # Get pagination parameters; page size is capped by the server
+        max_limit = get_settings().get_int('HISTORY_MAX_PAGE_SIZE', DEFAULT_HISTORY_MAX_PAGE_SIZE)
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), max_limit)
+            page = max(int(request.args.get('page', 1)), 1)
+        except ValueError:
+            return jsonify({"error": "limit and page must be integers"}), 400
+        cursor = request.args.get('cursor')
+        # Prefer the cursor: page numbers cost a skip over every earlier item
+        skip = 0 if cursor else (page - 1) * limit
         
         # Get user history
-        history = result_model.get_user_history(
-            user_id=current_user['_id'],
-            limit=limit,
-            skip=skip
-        )
+        try:
+            history, next_cursor = result_model.get_user_history(
+                user_id=current_user['_id'],
+                limit=limit,
+                cursor=cursor,
+                skip=skip
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Get stats
         stats = result_model.get_stats(current_user['_id'])
         
+        pagination = {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "total": stats['total_analyses']
+        }
+        if not cursor:
+            pagination["page"] = page
+        
         return jsonify({
             "history": history,
             "stats": stats,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total": stats['total_analyses']
-            }
+            "pagination": pagination
         }), 200
         
     except Exception as e:
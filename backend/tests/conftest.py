@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import db
+
+
+@pytest.fixture
+def mongo():
+    """Point the shared database handle at an in-memory mongomock client"""
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    db._client, db._db = client, client["plaghunt_test"]
+    yield db._db
+    db._client, db._db = None, None
@@ -0,0 +1,28 @@
+import os
+import subprocess
+
+from utils.clone_cache import CloneCache
+
+
+def make_repo(path, name):
+    os.makedirs(path)
+    subprocess.run(["git", "init", "-q", path], check=True)
+    with open(os.path.join(path, "README.md"), "w") as f:
+        f.write(f"# {name}\n" + "x" * 4096)
+    subprocess.run(["git", "-C", path, "add", "."], check=True)
+    subprocess.run(["git", "-C", path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init"], check=True)
+    return "file://" + path
+
+
+def test_eviction_removes_lock_files(tmp_path):
+    cache = CloneCache(cache_dir=str(tmp_path / "cache"), max_bytes=1)
+    cache.enabled = True
+    for name in ("one", "two", "three"):
+        url = make_repo(str(tmp_path / "remotes" / name), name)
+        with cache.acquire(url, f"o/{name}", str(tmp_path / "scratch" / name), mode="full") as lease:
+            assert os.path.isfile(os.path.join(lease.path, "README.md"))
+
+    # Every earlier entry went over the 1-byte quota; only the last one was in use
+    cache.evict()
+    assert os.listdir(cache.cache_dir) == []
+    assert cache.stats()["evictions"] == 3
@@ -0,0 +1,13 @@
+from utils.config_loader import Settings
+
+
+def test_malformed_numbers_fall_back_to_default(capsys):
+    settings = Settings({"ANALYSIS_DEDUP_WINDOW": "1h", "GEMINI_TIMEOUT": "soon", "ANALYSIS_WORKERS": "3"}, {})
+
+    assert settings.get_int("ANALYSIS_DEDUP_WINDOW", 3600) == 3600
+    assert settings.get_int("ANALYSIS_DEDUP_WINDOW", 3600) == 3600
+    assert settings.get_float("GEMINI_TIMEOUT", 20) == 20
+    assert settings.get_int("ANALYSIS_WORKERS", 2) == 3
+    # One warning per malformed key, not one per read
+    assert capsys.readouterr().out.count("ANALYSIS_DEDUP_WINDOW") == 1
+    assert any("ANALYSIS_DEDUP_WINDOW" in problem for problem in settings.validate())
@@ -0,0 +1,67 @@
+from models.plagiarism_result import PlagiarismResult
+
+ANALYSIS = {
+    "summary": {"overall_risk_level": "Low"},
+    "analysis_results": [{"repo_name": "someone/app", "overlap_files": ["src/app.py"]}]
+}
+
+
+def test_attached_job_completes_when_leader_finishes_before_insert(mongo, monkeypatch):
+    model = PlagiarismResult()
+    leader_id = model.create_job("alice", "https://github.com/o/r", request_key="k")
+    collection = model.collection
+    find_one = collection.find_one
+    finished = []
+
+    def find_leader_then_finish_it(*args, **kwargs):
+        leader = find_one(*args, **kwargs)
+        if leader and not finished:
+            # The leader completes after the lookup but before the follower is inserted
+            finished.append(leader["_id"])
+            model.complete_job(leader_id, analysis_data=ANALYSIS)
+        return leader
+
+    monkeypatch.setattr(collection, "find_one", find_leader_then_finish_it)
+    job_id = model.create_job("bob", "https://github.com/o/r", request_key="k")
+    monkeypatch.undo()
+
+    job = model.get_result_by_id(job_id)
+    assert finished
+    assert job["status"] == "completed"
+    assert job["shared_from"] == leader_id
+    assert job["analysis_data"]["analysis_results"][0]["overlap_files"] == ["src/app.py"]
+
+
+def test_attached_job_requeued_when_leader_fails_before_insert(mongo, monkeypatch):
+    model = PlagiarismResult()
+    leader_id = model.create_job("alice", "https://github.com/o/r", request_key="k")
+    collection = model.collection
+    find_one = collection.find_one
+    failed = []
+
+    def find_leader_then_fail_it(*args, **kwargs):
+        leader = find_one(*args, **kwargs)
+        if leader and not failed:
+            failed.append(leader["_id"])
+            model.fail_job(leader_id, "clone failed")
+        return leader
+
+    monkeypatch.setattr(collection, "find_one", find_leader_then_fail_it)
+    job_id = model.create_job("bob", "https://github.com/o/r", request_key="k")
+    monkeypatch.undo()
+
+    job = model.get_result_by_id(job_id)
+    assert failed
+    assert job["status"] == "queued"
+    assert "attached_to" not in job
+
+
+def test_completing_a_deleted_job_drops_its_details(mongo):
+    model = PlagiarismResult()
+    job_id = model.create_job("alice", "https://github.com/o/r")
+    assert model.delete_result(job_id, "alice")
+
+    model.complete_job(job_id, analysis_data=ANALYSIS)
+
+    assert model.collection.count_documents({}) == 0
+    assert model.details.collection.count_documents({}) == 0
@@ -0,0 +1,140 @@
+"""
+Deduplication of identical analysis requests across users.
+
+Two keys identify an analysis:
+
+- the request key: normalized repository URL plus the parameters that
+  change the result (language override, topic extractor). Requests with
+  the same request key that are in flight at the same time share one run:
+  in-process through AnalysisCoalescer, across processes by attaching a
+  queued job to the identical active one (see PlagiarismResult.create_job).
+- the result key: request key plus the remote HEAD commit. A completed
+  analysis with the same result key younger than ANALYSIS_DEDUP_WINDOW
+  seconds is served instead of running the pipeline again; the user's
+  history entry points at the stored details of that result.
+
+Requests with bypass_cache set are never deduplicated.
+"""
+import re
+import copy
+import json
+import hashlib
+import threading
+from .clone_cache import remote_head_sha
+from .analyze_repo import get_topic_extractor
+from .config_loader import get_settings
+
+DEFAULT_DEDUP_WINDOW = 3600
+LS_REMOTE_TIMEOUT = 10
+
+_GITHUB_URL_RE = re.compile(r"^(?:https?://|git@)?(?:www\.)?github\.com[/:]([^/\s]+)/([^/\s#?]+)", re.IGNORECASE)
+
+
+def get_dedup_window():
+    """Freshness window in seconds; 0 disables deduplication"""
+    return get_settings().get_int('ANALYSIS_DEDUP_WINDOW', DEFAULT_DEDUP_WINDOW)
+
+def normalize_repo_url(repo_url):
+    """github.com/owner/repo, lowercased, without scheme, .git or trailing parts"""
+    match = _GITHUB_URL_RE.match(repo_url.strip())
+    if not match:
+        return repo_url.strip().lower().rstrip("/")
+    owner, repo = match.group(1), re.sub(r"\.git$", "", match.group(2))
+    return f"github.com/{owner}/{repo}".lower()
+
+def request_key(repo_url, params=None):
+    """Key of an analysis request, or None when it must not be shared"""
+    params = params or {}
+    if params.get('bypass_cache') or get_dedup_window() <= 0:
+        return None
+    canonical = {
+        "repo": normalize_repo_url(repo_url),
+        "language": params.get('language') or None,
+        "topic_extractor": get_topic_extractor(params.get('topic_extractor'))
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+def result_key(repo_url, params=None):
+    """Request key bound to the repository's current HEAD, or None if it can't be resolved"""
+    key = request_key(repo_url, params)
+    if key is None:
+        return None
+    try:
+        sha = remote_head_sha(repo_url, timeout=LS_REMOTE_TIMEOUT)
+    except Exception as e:
+        print(f"Warning: could not resolve HEAD of {repo_url}, not deduplicating: {e}")
+        return None
+    return hashlib.sha256(f"{key}:{sha}".encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class AnalysisCoalescer:
+    """Single-flight execution of identical analyses within this process"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "followers": 0, "recent_hits": 0}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        stats["window"] = get_dedup_window()
+        return stats
+
+    def count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def run(self, key, compute, on_wait=None):
+        """
+        Return (result, shared): compute() run once for all concurrent
+        callers with the same key. Followers get a deep copy and shared=True;
+        compute's exception is raised in every caller. on_wait() is called
+        when this caller becomes a follower, before it blocks.
+        """
+        if key is None:
+            return compute(), False
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["leaders"] += 1
+            else:
+                flight.followers += 1
+                self._stats["followers"] += 1
+
+        if not leader:
+            print("🔗 Identical analysis already running, waiting for its result")
+            if on_wait:
+                on_wait()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result), True
+
+        try:
+            result = compute()
+            # Followers copy from a snapshot the leader's caller can't modify
+            flight.result = copy.deepcopy(result)
+            return result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+analysis_coalescer = AnalysisCoalescer()
@@ -0,0 +1,576 @@
+"""
+Plagiarism analysis pipeline shared by the synchronous /analyze endpoint
+and the background job workers.
+"""
+import os
+from .analyze_repo import analyze_suspect_repo
+from .github_search import search_github_repos_by_language
+from .clone_cache import clone_cache, local_head_sha
+from .fingerprint import fingerprint_repository
+from .fingerprint_store import fingerprint_store, repository_hashes
+from .workspace import Workspace
+from .candidate_executor import compare_candidates
+from .config_loader import get_settings
+
+MAX_CANDIDATES = 15
+DEFAULT_FINGERPRINT_DB_CANDIDATES = 5
+DEFAULT_FINGERPRINT_DB_MIN_CONTAINMENT = 0.05
+
+
+class NoCandidatesError(Exception):
+    """Raised when the GitHub search returns nothing to compare against"""
+
+    def __init__(self, repo_url, detected_languages):
+        super().__init__("No candidate repositories found for comparison")
+        self.payload = {
+            "error": str(self),
+            "repo_url": repo_url,
+            "detected_languages": detected_languages,
+            "candidates_found": 0
+        }
+
+
+def get_readme_content(repo_path):
+    """Extract README content from a repository"""
+    readme_files = ['README.md', 'README.txt', 'README.rst', 'README']
+    for readme_file in readme_files:
+        readme_path = os.path.join(repo_path, readme_file)
+        if os.path.exists(readme_path):
+            try:
+                with open(readme_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except Exception:
+                continue
+    return ""
+
+def assess_project_uniqueness(suspect_info, candidate_repos):
+    """Assess how unique the project is based on topic and functionality"""
+
+    suspect_topic = suspect_info.get('topic', '').lower()
+    suspect_keywords = [k.lower() for k in suspect_info.get('keywords', [])]
+
+    # Common project types (less unique)
+    common_topics = [
+        'todo app', 'calculator', 'weather app', 'blog', 'portfolio',
+        'chat app', 'ecommerce', 'crud app', 'login system', 'basic website',
+        'simple game', 'contact form', 'image gallery', 'basic api'
+    ]
+
+    # Advanced project types (more unique)
+    advanced_topics = [
+        'machine learning', 'blockchain', 'compiler', 'database engine',
+        'operating system', 'game engine', 'ai model', 'distributed system',
+        'neural network', 'cryptocurrency', 'computer vision', 'nlp',
+        'deep learning', 'microservices', 'kubernetes', 'docker', 'solidity',
+        'smart contract', 'defi', 'nft', 'web3', 'ethereum', 'dapp'
+    ]
+
+    # Calculate topic uniqueness
+    is_common = any(common in suspect_topic for common in common_topics)
+    is_advanced = any(advanced in suspect_topic for advanced in advanced_topics)
+
+    if is_advanced:
+        topic_uniqueness = 0.8
+    elif is_common:
+        topic_uniqueness = 0.3
+    else:
+        topic_uniqueness = 0.6
+
+    # Calculate keyword overlap with candidates - FIX THE ERROR HERE
+    total_overlap = 0
+    valid_candidates = 0
+
+    for repo in candidate_repos:
+        try:
+            # Safe handling of None values
+            repo_desc = repo.get('description') or ''
+            repo_name = repo.get('name') or ''
+
+            # Convert to lowercase safely
+            repo_desc = repo_desc.lower() if repo_desc else ''
+            repo_name = repo_name.lower() if repo_name else ''
+
+            keyword_matches = sum(1 for keyword in suspect_keywords
+                                if keyword and (keyword in repo_desc or keyword in repo_name))
+
+            if len(suspect_keywords) > 0:
+                overlap_ratio = keyword_matches / len(suspect_keywords)
+                total_overlap += overlap_ratio
+                valid_candidates += 1
+
+        except (AttributeError, TypeError) as e:
+            print(f"Warning: Error processing repository {repo.get('name', 'unknown')}: {e}")
+            continue
+
+    # Calculate average overlap only from valid candidates
+    if valid_candidates > 0:
+        avg_keyword_overlap = total_overlap / valid_candidates
+    else:
+        avg_keyword_overlap = 0.0
+
+    # Higher overlap = less unique
+    keyword_uniqueness = 1.0 - min(avg_keyword_overlap, 0.8)
+
+    # Combined uniqueness score
+    overall_uniqueness = (topic_uniqueness + keyword_uniqueness) / 2
+
+    return {
+        'overall_uniqueness': round(overall_uniqueness * 100, 1),  # Convert to percentage
+        'topic_uniqueness': round(topic_uniqueness * 100, 1),
+        'keyword_uniqueness': round(keyword_uniqueness * 100, 1),
+        'is_common_project_type': is_common,
+        'is_advanced_project_type': is_advanced,
+        'avg_keyword_overlap': round(avg_keyword_overlap * 100, 1)
+    }
+
+def calculate_weighted_similarity(structure_ratio, readme_similarity, code_similarity,
+                                  fingerprint_similarity=0.0):
+    """Calculate weighted similarity that better reflects plagiarism risk"""
+    # Code evidence weighs most: code_similarity compares files at the same
+    # path, fingerprint_similarity finds code copied into renamed or moved files
+    weights = {
+        'code': 0.3,         # 30% - same-path file contents
+        'fingerprint': 0.3,  # 30% - copied code wherever it lives
+        'structure': 0.25,   # 25% - structural copying
+        'readme': 0.15       # 15% - documentation copying
+    }
+
+    # Apply weights
+    weighted_score = (
+        code_similarity * weights['code'] +
+        fingerprint_similarity * weights['fingerprint'] +
+        structure_ratio * weights['structure'] +
+        readme_similarity * weights['readme']
+    )
+
+    # Boost score if multiple high similarities (indicates systematic copying)
+    high_sim_count = sum([
+        1 for sim in [structure_ratio, readme_similarity, code_similarity, fingerprint_similarity]
+        if sim > 0.7
+    ])
+
+    if high_sim_count >= 2:
+        weighted_score *= 1.2  # 20% boost for multiple high similarities
+
+    return min(weighted_score, 1.0)  # Cap at 1.0
+
+def score_candidate(repo, scores):
+    """Turn compare_repositories scores for one candidate into its analysis_results entry"""
+    structure_ratio = scores["structure_ratio"]
+    overlap_files = scores["overlap_files"]
+    readme_similarity = scores["readme_similarity"]
+    code_similarity = scores["code_similarity"]
+    fingerprint_similarity = scores.get("fingerprint_similarity", 0.0)
+
+    # Calculate enhanced similarity
+    overall_similarity = calculate_weighted_similarity(
+        structure_ratio, readme_similarity, code_similarity, fingerprint_similarity
+    )
+
+    # Enhanced plagiarism detection with multiple criteria
+    high_code_sim = code_similarity > 0.8
+    high_fingerprint_sim = fingerprint_similarity > 0.8
+    high_structure_sim = structure_ratio > 0.7
+    high_readme_sim = readme_similarity > 0.8
+    high_overall_sim = overall_similarity > 0.7
+
+    # More sophisticated plagiarism detection
+    is_high_similarity = (
+        high_overall_sim or
+        (high_code_sim and high_structure_sim) or
+        (code_similarity > 0.9) or  # Very high code similarity alone
+        (fingerprint_similarity > 0.9) or  # Copied code, even in renamed files
+        (structure_ratio > 0.9)     # Very high structure similarity alone
+    )
+
+    # Determine risk level for this specific match
+    if overall_similarity > 0.9:
+        match_risk = "Critical"
+    elif overall_similarity > 0.8:
+        match_risk = "High"
+    elif overall_similarity > 0.6:
+        match_risk = "Medium"
+    else:
+        match_risk = "Low"
+    # A renamed copy scores low overall but its fingerprints still match
+    if fingerprint_similarity > 0.9 and match_risk in ("Low", "Medium"):
+        match_risk = "High"
+    elif fingerprint_similarity > 0.7 and match_risk == "Low":
+        match_risk = "Medium"
+
+    return {
+        "candidate_repo": {
+            "name": repo["full_name"],
+            "url": repo["html_url"],
+            "stars": repo["stars"],
+            "description": repo.get("description", ""),
+            "language": repo.get("language", "")
+        },
+        "similarity_scores": {
+            "structure_similarity": round(structure_ratio * 100, 1),  # Convert to percentage
+            "readme_similarity": round(readme_similarity * 100, 1),
+            "code_similarity": round(code_similarity * 100, 1),
+            "fingerprint_similarity": round(fingerprint_similarity * 100, 1),
+            "overall_similarity": round(overall_similarity * 100, 1)
+        },
+        "risk_assessment": {
+            "risk_level": match_risk,
+            "high_code_similarity": high_code_sim,
+            "high_fingerprint_similarity": high_fingerprint_sim,
+            "high_structure_similarity": high_structure_sim,
+            "high_readme_similarity": high_readme_sim
+        },
+        "overlap_files": list(overlap_files),
+        "code_matches": scores.get("code_matches", []),
+        "prefiltered": scores.get("prefiltered", False),
+        "high_similarity": is_high_similarity
+    }
+
+def progress_preview(result):
+    """A candidate result for progress events: per-file lists replaced by their counts"""
+    preview = {k: v for k, v in result.items() if k not in ("overlap_files", "code_matches")}
+    preview["overlap_files_count"] = len(result.get("overlap_files") or [])
+    preview["code_matches_count"] = len(result.get("code_matches") or [])
+    return preview
+
+def find_known_matches(suspect_info):
+    """
+    Look the suspect up in the fingerprint store before any network search,
+    then index it so later analyses can find it. Returns candidate dicts in
+    the same shape as search_github_repos.
+    """
+    if not fingerprint_store.enabled:
+        return []
+    settings = get_settings()
+    try:
+        hashes = repository_hashes(fingerprint_repository(suspect_info["local_path"]))
+        matches = fingerprint_store.query(
+            hashes,
+            top_n=settings.get_int('FINGERPRINT_DB_CANDIDATES', DEFAULT_FINGERPRINT_DB_CANDIDATES),
+            exclude_names=[f"{suspect_info['repo_owner']}/{suspect_info['repo_name']}"],
+            exclude_owner=suspect_info["repo_owner"]
+        )
+        try:
+            commit_sha = local_head_sha(suspect_info["local_path"])
+        except Exception:
+            commit_sha = None
+        fingerprint_store.index_repository(
+            f"{suspect_info['repo_owner']}/{suspect_info['repo_name']}",
+            suspect_info["repo_url"],
+            commit_sha=commit_sha,
+            hashes=hashes
+        )
+    except Exception as e:
+        print(f"Warning: fingerprint store lookup failed: {e}")
+        return []
+
+    min_containment = settings.get_float('FINGERPRINT_DB_MIN_CONTAINMENT', DEFAULT_FINGERPRINT_DB_MIN_CONTAINMENT)
+    known = []
+    for match in matches:
+        if match["containment"] < min_containment:
+            continue
+        metadata = match["metadata"]
+        known.append({
+            "full_name": match["full_name"],
+            "html_url": match["url"],
+            "stars": metadata.get("stars", 0),
+            "description": metadata.get("description"),
+            "owner": match["full_name"].split("/")[0],
+            "language": metadata.get("language"),
+            "source": "fingerprint_db"
+        })
+    return known
+
+def run_plagiarism_analysis(repo_url, manual_language=None, progress=None, bypass_cache=False,
+                            topic_extractor=None):
+    """
+    Run the full clone -> search -> compare pipeline for a repository.
+
+    Args:
+        repo_url: GitHub URL of the suspect repository
+        manual_language: Optional language override for the candidate search
+        progress: Optional callable ``progress(step, message, **details)``
+            invoked as the analysis moves through its stages
+        bypass_cache: Re-run the Gemini topic analysis even if a cached
+            result exists for the same project text
+        topic_extractor: "auto", "gemini" or "local"; defaults to
+            TOPIC_EXTRACTOR
+
+    Returns:
+        dict: The analysis response payload
+
+    Raises:
+        NoCandidatesError: If no candidate repositories could be found
+    """
+    def report(step, message, **details):
+        if progress:
+            try:
+                progress(step, message, **details)
+            except Exception as e:
+                print(f"Warning: progress callback failed: {e}")
+
+    # Every run gets its own scratch space so concurrent analyses never collide
+    workspace = Workspace.create(label="analysis")
+    try:
+        return _analyze(repo_url, manual_language, report, workspace, bypass_cache, topic_extractor)
+    finally:
+        workspace.cleanup()
+
+def _analyze(repo_url, manual_language, report, workspace, bypass_cache=False, topic_extractor=None):
+    # Step 1: Analyze the suspect repository (now includes language detection)
+    print(f"🔍 Step 1: Analyzing suspect repo: {repo_url}")
+    report("analyzing_suspect", "Analyzing suspect repository")
+    suspect_info = analyze_suspect_repo(
+        repo_url,
+        clone_dir=workspace.subdir("suspect"),
+        bypass_cache=bypass_cache,
+        topic_extractor=topic_extractor
+    )
+
+    # Extract primary languages from the repository
+    primary_languages = suspect_info.get('primary_languages', ['Python'])
+    main_language = manual_language or primary_languages[0] if primary_languages else 'Python'
+
+    print(f"✅ Suspect repo analyzed: {suspect_info['repo_name']} by {suspect_info['repo_owner']}")
+    print(f"📝 Topic: {suspect_info['topic']}")
+    print(f"💻 Detected languages: {', '.join(primary_languages)}")
+    print(f"🔤 Primary language for search: {main_language}")
+    print(f"🏷️  Keywords: {', '.join(suspect_info['keywords'][:5])}...")
+    report("suspect_analyzed", "Suspect repository analyzed",
+           suspect_repo={
+               "name": suspect_info['repo_name'],
+               "owner": suspect_info['repo_owner'],
+               "url": repo_url,
+               "topic": suspect_info['topic'],
+               "keywords": suspect_info['keywords'],
+               "topic_source": suspect_info.get('topic_source', 'gemini')
+           })
+    report("languages_detected", f"Detected {', '.join(primary_languages)}",
+           primary_languages=primary_languages,
+           primary_language=main_language,
+           language_breakdown=suspect_info.get('language_info', []))
+
+    # Repositories we have already seen that share code with the suspect
+    known_matches = find_known_matches(suspect_info)
+    if known_matches:
+        print(f"🗂️  Fingerprint store matched {len(known_matches)} known repositories")
+        report("known_matches", "Matched previously analyzed repositories",
+               known_matches=[m["full_name"] for m in known_matches])
+
+    # Step 2: Search for candidate repositories using detected languages
+    print(f"🔎 Step 2: Searching for candidate repositories...")
+    print(f"📝 Search parameters:")
+    print(f"   Keywords: {suspect_info['keywords'][:5]}...")
+    print(f"   Topic: {suspect_info['topic']}")
+    print(f"   Exclude user: {suspect_info['repo_owner']}")
+    print(f"   Primary Language: {main_language}")
+    print(f"   All Languages: {', '.join(primary_languages)}")
+    report("searching", "Searching GitHub for candidate repositories",
+           languages=primary_languages, primary_language=main_language)
+
+    # Search with primary language first, then fallback to other languages if needed
+    candidate_repos = list(known_matches)
+
+    # Try primary language first
+    languages_to_try = [main_language] + [lang for lang in primary_languages if lang != main_language]
+
+    # Every language's queries run concurrently; merge in language order
+    try:
+        results_by_language = search_github_repos_by_language(
+            keywords=suspect_info["keywords"],
+            languages=languages_to_try,
+            topic=suspect_info["topic"],
+            exclude_user=suspect_info["repo_owner"],
+            per_page=20,
+            max_results=30,
+            max_total=MAX_CANDIDATES - len(candidate_repos),
+        )
+    except Exception as e:
+        print(f"❌ Search failed: {e}")
+        results_by_language = {}
+
+    for lang in languages_to_try:
+        if len(candidate_repos) >= MAX_CANDIDATES:  # Stop if we have enough candidates
+            break
+
+        lang_candidates = results_by_language.get(lang, [])
+
+        # Add candidates, avoiding duplicates
+        for candidate in lang_candidates:
+            if not any(existing['html_url'] == candidate['html_url'] for existing in candidate_repos):
+                candidate_repos.append(candidate)
+
+        print(f"📊 Found {len(lang_candidates)} candidates for {lang} (total: {len(candidate_repos)})")
+
+    # Increase limit from 5 to 15 candidates for better analysis
+    candidate_repos = candidate_repos[:MAX_CANDIDATES]
+
+    if not candidate_repos:
+        raise NoCandidatesError(repo_url, primary_languages)
+
+    report("search_complete", f"Found {len(candidate_repos)} candidate repositories",
+           candidate_total=len(candidate_repos),
+           candidates=[{
+               "name": repo["full_name"],
+               "url": repo["html_url"],
+               "stars": repo.get("stars", 0),
+               "source": repo.get("source", "search")
+           } for repo in candidate_repos])
+
+    # Step 3: Compare with each candidate
+    analysis_results = []
+    max_structure_similarity = 0.0
+    max_readme_similarity = 0.0
+    max_code_similarity = 0.0
+    max_fingerprint_similarity = 0.0
+    high_similarity_count = 0
+
+    leases = []
+
+    def prepare_candidate(repo):
+        # Reuse a cached checkout of the candidate's current HEAD when possible
+        candidate_dir = workspace.subdir("candidates", repo["full_name"])
+        print(f"📥 Fetching {repo['full_name']}...")
+        lease = clone_cache.acquire(repo["html_url"], repo["full_name"], candidate_dir)
+        leases.append(lease)
+        index_as = {
+            "full_name": repo["full_name"],
+            "url": repo["html_url"],
+            "commit_sha": lease.sha,
+            "metadata": {
+                "stars": repo.get("stars", 0),
+                "description": repo.get("description"),
+                "language": repo.get("language")
+            }
+        } if fingerprint_store.enabled else None
+        return lease.path, get_readme_content(lease.path), index_as
+
+    def on_candidate_event(event, index, repo, scores=None, error=None):
+        details = {
+            "candidate": repo["full_name"],
+            "candidate_index": index + 1,
+            "candidate_total": len(candidate_repos)
+        }
+        if event == "cloned":
+            report("candidate_cloned", f"Cloned {repo['full_name']}", **details)
+        elif event == "compared":
+            try:
+                # Scores of a finished candidate, so clients can show partial results
+                details["result"] = progress_preview(score_candidate(repo, scores))
+            except Exception as e:
+                print(f"Warning: could not score {repo['full_name']} for progress: {e}")
+            report("candidate_compared", f"Compared {repo['full_name']}", **details)
+        else:
+            report("candidate_failed", f"Could not analyze {repo['full_name']}", error=error, **details)
+
+    print(f"🔍 Step 3: Cloning and comparing {len(candidate_repos)} candidates...")
+    report("comparing", f"Cloning and comparing {len(candidate_repos)} candidates",
+           candidate_total=len(candidate_repos))
+    try:
+        candidate_scores = compare_candidates(
+            suspect_info["local_path"],
+            suspect_info.get("readme_content", ""),
+            candidate_repos,
+            prepare_candidate,
+            on_event=on_candidate_event
+        )
+    finally:
+        for lease in leases:
+            lease.release()
+
+    # Score candidates in search order so the output is deterministic
+    for repo, scores in zip(candidate_repos, candidate_scores):
+        if scores is None:
+            # Clone or comparison failed; continue with next candidate
+            continue
+        try:
+            result = score_candidate(repo, scores)
+        except Exception as e:
+            print(f"❌ Error scoring {repo['html_url']}: {e}")
+            # Continue with next candidate
+            continue
+
+        # Update maximums
+        max_structure_similarity = max(max_structure_similarity, scores["structure_ratio"])
+        max_readme_similarity = max(max_readme_similarity, scores["readme_similarity"])
+        max_code_similarity = max(max_code_similarity, scores["code_similarity"])
+        max_fingerprint_similarity = max(max_fingerprint_similarity, scores.get("fingerprint_similarity", 0.0))
+        if result["high_similarity"]:
+            high_similarity_count += 1
+        analysis_results.append(result)
+
+        overall_similarity = result["similarity_scores"]["overall_similarity"]
+        match_risk = result["risk_assessment"]["risk_level"]
+        print(f"✅ Analysis complete for {repo['full_name']}: {overall_similarity:.1f}% overall similarity ({match_risk} risk)")
+
+    # Assess project uniqueness
+    uniqueness_assessment = assess_project_uniqueness(suspect_info, candidate_repos)
+
+    # Calculate enhanced summary statistics
+    if analysis_results:
+        overall_similarities = [r["similarity_scores"]["overall_similarity"] for r in analysis_results]
+        avg_similarity = sum(overall_similarities) / len(overall_similarities)
+        highest_similarity = max(overall_similarities)
+
+        # Count high-risk matches
+        critical_matches = len([r for r in analysis_results if r["risk_assessment"]["risk_level"] == "Critical"])
+        high_risk_matches = len([r for r in analysis_results if r["risk_assessment"]["risk_level"] in ["Critical", "High"]])
+    else:
+        avg_similarity = 0.0
+        highest_similarity = 0.0
+        critical_matches = 0
+        high_risk_matches = 0
+
+    # Enhanced risk assessment
+    if critical_matches > 0:
+        overall_risk = "Critical"
+    elif highest_similarity > 80 or high_risk_matches > 2:  # Using percentage
+        overall_risk = "High"
+    elif highest_similarity > 60 or high_risk_matches > 0:
+        overall_risk = "Medium"
+    else:
+        overall_risk = "Low"
+
+    # Enhanced plagiarism detection
+    plagiarism_detected = (
+        highest_similarity > 70 or  # Using percentage
+        critical_matches > 0 or
+        high_risk_matches > 1
+    )
+
+    report("finalizing", "Summarizing analysis results",
+           candidates_checked=len(analysis_results))
+
+    # Prepare response data
+    return {
+        "suspect_repo": {
+            "name": suspect_info['repo_name'],
+            "owner": suspect_info['repo_owner'],
+            "url": repo_url,
+            "topic": suspect_info['topic'],
+            "keywords": suspect_info['keywords'],
+            "topic_source": suspect_info.get('topic_source', 'gemini'),
+            "primary_languages": primary_languages,  # New field
+            "language_breakdown": suspect_info.get('language_info', [])  # New field
+        },
+        "uniqueness_assessment": uniqueness_assessment,
+        "analysis_results": analysis_results,
+        "plagiarism_detected": plagiarism_detected,
+        "summary": {
+            "total_candidates_checked": len(analysis_results),
+            "high_similarity_count": high_similarity_count,
+            "critical_matches": critical_matches,
+            "high_risk_matches": high_risk_matches,
+            "languages_analyzed": primary_languages,  # New field
+            "primary_language": main_language,  # New field
+            "max_structure_similarity": round(max_structure_similarity * 100, 1),  # Convert to percentage
+            "max_readme_similarity": round(max_readme_similarity * 100, 1),
+            "max_code_similarity": round(max_code_similarity * 100, 1),
+            "max_fingerprint_similarity": round(max_fingerprint_similarity * 100, 1),
+            "highest_similarity": round(highest_similarity, 1),  # Already in percentage
+            "average_similarity": round(avg_similarity, 1),
+            "overall_risk_level": overall_risk,
+            "project_uniqueness": uniqueness_assessment['overall_uniqueness']
+        },
+        "status": "completed"
+    }
@@ -1,81 +1,68 @@
-import os
 import json
 import re
-import shutil
-from git import Repo
+import threading
 from collections import Counter
-import google.generativeai as genai
-from .config_loader import get_gemini_api_key, get_github_token
+from .config_loader import get_gemini_api_key, get_settings, on_reload
+from .languages import LANGUAGE_MAP
+from .repo_utils import clone_repo as clone_into
+from .repo_snapshot import get_snapshot
+from .github_client import get_github_client
+from .gemini_cache import gemini_cache
+from .project_text import collect_text, estimate_tokens
+from .topic_extractor import extract_topic
 
-# Setup Gemini client
-genai.configure(api_key=get_gemini_api_key())
+GEMINI_MODEL = 'gemini-2.5-flash'
+# Bump when the prompt changes so cached results are not reused
+PROMPT_VERSION = "1"
+
+DEFAULT_GEMINI_TIMEOUT = 20
+# "gemini": LLM only, "local": offline extractor only,
+# "auto": Gemini, falling back to the offline extractor when it fails
+TOPIC_EXTRACTORS = ("auto", "gemini", "local")
+
+_genai = None
+_gemini_lock = threading.Lock()
+
+def _get_genai():
+    """Import and configure the Gemini SDK on first use rather than at import"""
+    global _genai
+    with _gemini_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=get_gemini_api_key())
+            _genai = genai
+        return _genai
+
+@on_reload
+def _reconfigure_gemini(settings):
+    with _gemini_lock:
+        if _genai is not None and settings.gemini_api_key:
+            _genai.configure(api_key=settings.gemini_api_key)
+
+def get_topic_extractor(requested=None):
+    """The extractor to use: the requested one, else TOPIC_EXTRACTOR (default auto)"""
+    extractor = (requested or get_settings().get('TOPIC_EXTRACTOR', 'auto')).lower()
+    if extractor not in TOPIC_EXTRACTORS:
+        raise ValueError(f"topic_extractor must be one of {', '.join(TOPIC_EXTRACTORS)}")
+    return extractor
 
 def get_repo_languages(repo_path):
     """Extract the primary languages used in the repository"""
     languages = Counter()
     
-    # File extension to language mapping (including Solidity)
-    language_map = {
-        '.py': 'Python',
-        '.js': 'JavaScript',
-        '.ts': 'TypeScript',
-        '.java': 'Java',
-        '.cpp': 'C++',
-        '.c': 'C',
-        '.cs': 'C#',
-        '.go': 'Go',
-        '.rs': 'Rust',
-        '.php': 'PHP',
-        '.rb': 'Ruby',
-        '.swift': 'Swift',
-        '.kt': 'Kotlin',
-        '.scala': 'Scala',
-        '.r': 'R',
-        '.m': 'Objective-C',
-        '.dart': 'Dart',
-        '.lua': 'Lua',
-        '.pl': 'Perl',
-        '.sh': 'Shell',
-        '.sql': 'SQL',
-        '.html': 'HTML',
-        '.css': 'CSS',
-        '.jsx': 'JavaScript',
-        '.tsx': 'TypeScript',
-        '.vue': 'Vue',
-        '.svelte': 'Svelte',
-        '.sol': 'Solidity',  # Added Solidity support
-        '.cairo': 'Cairo',   # StarkNet
-        '.move': 'Move',     # Aptos/Sui
-        '.vy': 'Vyper',      # Ethereum Vyper
-        '.fe': 'Fe',         # Ethereum Fe
-        '.yul': 'Yul'        # Ethereum assembly
-    }
-    
     # Count files by extension and weight by file size
     total_size = 0
-    for root, dirs, files in os.walk(repo_path):
-        # Skip hidden directories and common build/dependency directories
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in 
-                  ['node_modules', '__pycache__', 'venv', 'env', 'build', 'dist', 'target', 
-                   'artifacts', 'cache', 'typechain-types', 'contracts/build']]
-        
-        for file in files:
-            if file.startswith('.'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            try:
-                # Get file size to weight languages by code volume
-                file_size = os.path.getsize(file_path)
-                if file_size > 1024 * 1024:  # Skip files larger than 1MB
-                    continue
-                    
-                _, ext = os.path.splitext(file.lower())
-                if ext in language_map:
-                    languages[language_map[ext]] += file_size
-                    total_size += file_size
-            except (OSError, IOError):
-                continue
+    entries = get_snapshot(repo_path).iter_files(
+        # Skip hidden files and common build/dependency directories
+        skip_dirs={'node_modules', '__pycache__', 'venv', 'env', 'build', 'dist', 'target',
+                   'artifacts', 'cache', 'typechain-types'},
+        skip_hidden=True,
+        extensions=LANGUAGE_MAP,
+        max_size=1024 * 1024  # Skip files larger than 1MB
+    )
+    for entry in entries:
+        languages[entry.language] += entry.size
+        total_size += entry.size
     
     if not languages:
         return ['Python']  # Default fallback
@@ -102,17 +89,14 @@ def get_detailed_language_info(repo_path):
         '.sol': 'Solidity', '.cairo': 'Cairo', '.move': 'Move', '.vy': 'Vyper'
     }
     
-    for root, dirs, files in os.walk(repo_path):
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in 
-                  ['node_modules', '__pycache__', 'venv', 'env', 'build', 'dist', 
-                   'artifacts', 'cache', 'typechain-types']]
-        
-        for file in files:
-            if file.startswith('.'):
-                continue
-            _, ext = os.path.splitext(file.lower())
-            if ext in language_map:
-                languages[language_map[ext]] += 1
+    entries = get_snapshot(repo_path).iter_files(
+        skip_dirs={'node_modules', '__pycache__', 'venv', 'env', 'build', 'dist',
+                   'artifacts', 'cache', 'typechain-types'},
+        skip_hidden=True,
+        extensions=language_map
+    )
+    for entry in entries:
+        languages[language_map[entry.ext]] += 1
     
     total_files = sum(languages.values())
     if total_files == 0:
@@ -130,15 +114,12 @@ def get_detailed_language_info(repo_path):
 
 def get_readme_content(repo_path):
     """Extract README content from a repository"""
+    snapshot = get_snapshot(repo_path)
     readme_files = ['README.md', 'README.txt', 'README.rst', 'README']
     for readme_file in readme_files:
-        readme_path = os.path.join(repo_path, readme_file)
-        if os.path.exists(readme_path):
-            try:
-                with open(readme_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            except Exception:
-                continue
+        entry = snapshot.get(readme_file)
+        if entry is not None and entry.text is not None:
+            return entry.text
     return ""
 
 def parse_github_url(url):
@@ -154,55 +135,22 @@ def parse_github_url(url):
     owner, repo = m.group(1), m.group(2).replace(".git", "")
     return owner, repo
 
-def clone_repo(url, clone_dir="/tmp/plaghunt_cloned_repo"):
-    # Remove existing clone
-    if os.path.exists(clone_dir):
-        shutil.rmtree(clone_dir)
-    Repo.clone_from(url, clone_dir)
-    return clone_dir
+def clone_repo(url, clone_dir, mode=None):
+    """Clone into clone_dir, normally a subdirectory of the caller's Workspace"""
+    return clone_into(url, clone_dir, mode=mode)
 
-def collect_project_text(project_path):
+def collect_project_text(project_path, token_budget=None):
     """
-    Reads README + package.json + small files for analysis.
+    Reads README + manifests + entry points + representative small files
+    for analysis, up to token_budget (PROJECT_TEXT_TOKEN_BUDGET) tokens.
     """
-    combined_text = ""
-    
-    # README
-    readme_path = os.path.join(project_path, "README.md")
-    if os.path.exists(readme_path):
-        with open(readme_path, "r", encoding="utf-8") as f:
-            combined_text += f.read() + "\n"
-
-    # package.json
-    package_path = os.path.join(project_path, "package.json")
-    if os.path.exists(package_path):
-        with open(package_path, "r", encoding="utf-8") as f:
-            combined_text += f.read() + "\n"
-
-    # Small code files
-    for root, dirs, files in os.walk(project_path):
-        # Skip node_modules and other common directories that might contain binaries
-        dirs[:] = [d for d in dirs if d not in ['node_modules', '.git', '__pycache__', '.venv', 'venv', 'artifacts', 'cache']]
-        
-        for name in files:
-            file_path = os.path.join(root, name)
-            try:
-                # Check if file exists and is a regular file (not a symlink or binary)
-                if (os.path.isfile(file_path) and 
-                    not os.path.islink(file_path) and 
-                    os.path.getsize(file_path) < 5000 and 
-                    name.endswith((".js", ".ts", ".py", ".html", ".jsx", ".sol", ".vy", ".cairo"))):
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        combined_text += f.read() + "\n"
-            except (OSError, IOError, UnicodeDecodeError) as e:
-                # Skip files that can't be read (binaries, permission issues, etc.)
-                print(f"Skipping file {file_path}: {e}")
-                continue
-
-    return combined_text
+    text, files = collect_text(project_path, token_budget)
+    print(f"📝 Collected {len(files)} files (~{estimate_tokens(text)} tokens) for topic analysis")
+    return text
 
 def analyze_with_gemini(text):
     import re
+    from google.api_core import retry as api_retry
 
     prompt = f"""
 You are an AI that analyzes software projects.
@@ -222,7 +170,12 @@ Project Text:
 {text}
     """
 
-    response = genai.GenerativeModel('gemini-2.5-flash').generate_content(prompt)
+    genai = _get_genai()
+    timeout = get_settings().get_float('GEMINI_TIMEOUT', DEFAULT_GEMINI_TIMEOUT)
+    # The client retries transient errors; bound the whole call, not just one attempt
+    response = genai.GenerativeModel(GEMINI_MODEL).generate_content(
+        prompt, request_options={"timeout": timeout, "retry": api_retry.Retry(timeout=timeout)}
+    )
     text_response = response.text.strip()
 
     # Remove ```json fences if present
@@ -240,14 +193,52 @@ Project Text:
         }
     return result
 
-def analyze_suspect_repo(repo_url):
-    import requests
+def analyze_project_text(text, bypass_cache=False):
+    """
+    analyze_with_gemini with a result cache keyed by the project text.
+    Set bypass_cache to force a fresh LLM call (the result is still stored).
+    """
+    key = gemini_cache.key(GEMINI_MODEL, PROMPT_VERSION, text)
+    return gemini_cache.get_or_compute(
+        key,
+        lambda: analyze_with_gemini(text),
+        bypass=bypass_cache,
+        # Don't remember failed parses
+        cacheable=lambda result: result.get("topic", "unknown") != "unknown" or result.get("keywords")
+    )
+
+def _is_unknown(result):
+    return result.get("topic", "unknown") == "unknown" and not result.get("keywords")
+
+def analyze_topic(project_path, text, extractor=None, bypass_cache=False):
+    """
+    Return ({"topic", "keywords"}, source) using the chosen extractor.
+    source is "gemini" or "local".
+    """
+    extractor = get_topic_extractor(extractor)
+    if extractor == "auto" and not get_settings().gemini_api_key:
+        extractor = "local"
+
+    if extractor != "local":
+        try:
+            result = analyze_project_text(text, bypass_cache=bypass_cache)
+            if extractor == "gemini" or not _is_unknown(result):
+                return result, "gemini"
+            print("⚠️  Gemini returned no topic, using the offline extractor")
+        except Exception as e:
+            if extractor == "gemini":
+                raise
+            print(f"⚠️  Gemini analysis failed ({e}), using the offline extractor")
+
+    return extract_topic(project_path, text), "local"
+
+def analyze_suspect_repo(repo_url, clone_dir, bypass_cache=False, topic_extractor=None):
     from datetime import datetime
     
     owner, repo_name = parse_github_url(repo_url)
-    local_path = clone_repo(repo_url)
+    local_path = clone_repo(repo_url, clone_dir)
     project_text = collect_project_text(local_path)
-    analysis = analyze_with_gemini(project_text)
+    analysis, topic_source = analyze_topic(local_path, project_text, topic_extractor, bypass_cache)
     
     # Extract languages from the repository
     primary_languages = get_repo_languages(local_path)
@@ -259,18 +250,7 @@ def analyze_suspect_repo(repo_url):
     # Get repository creation date from GitHub API
     created_at = None
     try:
-        github_api_url = f"https://api.github.com/repos/{owner}/{repo_name}"
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {get_github_token()}"
-        }
-        response = requests.get(github_api_url, headers=headers)
-        
-        # If authentication fails, try without token
-        if response.status_code == 401:
-            print(f"Warning: GitHub token invalid, trying without authentication...")
-            response = requests.get(github_api_url)
-            
+        response = get_github_client().get(f"/repos/{owner}/{repo_name}")
         if response.status_code == 200:
             repo_data = response.json()
             created_at = repo_data.get("created_at")
@@ -290,6 +270,7 @@ def analyze_suspect_repo(repo_url):
         "repo_url": repo_url,
         "topic": analysis.get("topic", "unknown"),
         "keywords": analysis.get("keywords", []),
+        "topic_source": topic_source,
         "local_path": local_path,
         "readme_content": readme_content,
         "primary_languages": primary_languages,  # New field
@@ -300,5 +281,7 @@ def analyze_suspect_repo(repo_url):
 
 if __name__ == "__main__":
     repo_url = input("Enter suspect GitHub repo URL: ").strip()
-    info = analyze_suspect_repo(repo_url)
+    from .workspace import Workspace
+    with Workspace.create(label="analyze-repo") as workspace:
+        info = analyze_suspect_repo(repo_url, workspace.subdir("suspect"))
     print(json.dumps(info, indent=2))
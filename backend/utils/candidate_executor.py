@@ -0,0 +1,160 @@
+"""
+Pipelined clone -> compare executor for candidate repositories.
+
+Clones are network-bound and run on a thread pool; comparisons are
+CPU-bound and run on a shared process pool. A candidate's comparison
+starts as soon as its own clone finishes, so total latency tracks the
+slowest candidate instead of the sum of all of them.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from .compare_utils import compare_repositories
+from .config_loader import get_settings
+
+DEFAULT_CLONE_CONCURRENCY = 4
+
+_compare_pool = None
+_compare_pool_lock = threading.Lock()
+
+
+def get_clone_concurrency():
+    return max(1, get_settings().get_int('ANALYSIS_CLONE_CONCURRENCY', DEFAULT_CLONE_CONCURRENCY))
+
+def get_compare_processes():
+    """Number of comparison processes; 0 runs comparisons in the clone threads"""
+    return max(0, get_settings().get_int('ANALYSIS_COMPARE_PROCESSES', os.cpu_count() or 1))
+
+def get_compare_pool():
+    """Return the process pool shared by all analyses, creating it on first use"""
+    global _compare_pool
+    processes = get_compare_processes()
+    if processes == 0:
+        return None
+    with _compare_pool_lock:
+        if _compare_pool is None:
+            # spawn avoids forking a process that already runs worker threads
+            _compare_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _compare_pool
+
+def reset_compare_pool(pool):
+    """Drop a pool whose worker died so the next analysis starts a fresh one"""
+    global _compare_pool
+    with _compare_pool_lock:
+        # Another analysis may already have replaced it
+        if _compare_pool is pool:
+            print("⚠️  Comparison process pool broke (a worker died); starting a new one")
+            pool.shutdown(wait=False, cancel_futures=True)
+            _compare_pool = None
+
+def shutdown_compare_pool():
+    global _compare_pool
+    with _compare_pool_lock:
+        if _compare_pool is not None:
+            _compare_pool.shutdown(wait=False, cancel_futures=True)
+            _compare_pool = None
+
+
+def compare_candidates(suspect_path, suspect_readme, candidate_repos, prepare_candidate, on_event=None):
+    """
+    Clone and compare every candidate concurrently.
+
+    Args:
+        suspect_path: Local checkout of the suspect repository
+        suspect_readme: README text of the suspect repository
+        candidate_repos: Candidate dicts as returned by search_github_repos
+        prepare_candidate: Callable ``prepare_candidate(repo) -> (path, readme_text, index_as)``
+            that clones a candidate; runs on the clone thread pool. index_as is
+            passed through to compare_repositories
+        on_event: Optional callable ``on_event(event, index, repo, scores=None, error=None)``
+            with event one of "cloned", "compared", "failed"
+
+    Returns:
+        list: One entry per candidate, in the same order as candidate_repos.
+        Each entry is the dict returned by compare_repositories, or None if
+        the candidate could not be cloned or compared.
+    """
+    results = [None] * len(candidate_repos)
+    if not candidate_repos:
+        return results
+
+    def emit(event, index, **details):
+        if on_event:
+            try:
+                on_event(event, index, candidate_repos[index], **details)
+            except Exception as e:
+                print(f"Warning: candidate event callback failed: {e}")
+
+    compare_pool = get_compare_pool()
+    clone_workers = min(get_clone_concurrency(), len(candidate_repos))
+
+    def report(index, future):
+        # Progress only; results are collected after wait() so ordering stays fixed
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            return  # retried in a thread below
+        if error is not None:
+            print(f"❌ Error comparing {candidate_repos[index].get('html_url')}: {error}")
+            emit("failed", index, error=str(error))
+        else:
+            emit("compared", index, scores=future.result())
+
+    with ThreadPoolExecutor(max_workers=clone_workers, thread_name_prefix="candidate-clone") as clone_pool:
+        clone_futures = {
+            clone_pool.submit(prepare_candidate, repo): index
+            for index, repo in enumerate(candidate_repos)
+        }
+        compare_futures = {}
+        compare_args = {}
+
+        # Hand each candidate to the comparison stage as soon as its clone lands
+        for future in as_completed(clone_futures):
+            index = clone_futures[future]
+            try:
+                candidate_path, candidate_readme, index_as = future.result()
+            except Exception as e:
+                print(f"❌ Error cloning {candidate_repos[index].get('html_url')}: {e}")
+                emit("failed", index, error=str(e))
+                continue
+            emit("cloned", index)
+
+            args = (suspect_path, candidate_path, suspect_readme, candidate_readme, index_as)
+            compare_args[index] = args
+            compare_future = None
+            if compare_pool is not None:
+                try:
+                    compare_future = compare_pool.submit(compare_repositories, *args)
+                except BrokenProcessPool:
+                    # Compare the rest of this analysis in threads
+                    reset_compare_pool(compare_pool)
+                    compare_pool = None
+            if compare_future is None:
+                compare_future = clone_pool.submit(compare_repositories, *args)
+            compare_future.add_done_callback(lambda f, index=index: report(index, f))
+            compare_futures[compare_future] = index
+
+        wait(compare_futures)
+
+        # Comparisons lost with a dead pool worker get one more try in a thread
+        broken = [(future, index) for future, index in compare_futures.items()
+                  if isinstance(future.exception(), BrokenProcessPool)]
+        if broken:
+            if compare_pool is not None:
+                reset_compare_pool(compare_pool)
+            for future, index in broken:
+                del compare_futures[future]
+                retry = clone_pool.submit(compare_repositories, *compare_args[index])
+                retry.add_done_callback(lambda f, index=index: report(index, f))
+                compare_futures[retry] = index
+            wait(compare_futures)
+
+    for future, index in compare_futures.items():
+        if future.exception() is None:
+            results[index] = future.result()
+
+    return results
@@ -0,0 +1,248 @@
+"""
+Persistent on-disk cache of cloned repositories.
+
+Entries are keyed by repository full name, HEAD commit SHA and clone mode,
+so a hit only costs a `git ls-remote`. Each entry has a lock file: readers
+hold a shared lock for as long as they use the checkout, writers and the
+evictor take an exclusive one. Least recently used entries are evicted
+once the cache grows past its disk quota, together with their lock file.
+"""
+import os
+import re
+import time
+import uuid
+import fcntl
+import shutil
+import subprocess
+import threading
+from .repo_utils import clone_repo, directory_size, get_clone_mode
+from .config_loader import get_settings
+
+DEFAULT_CACHE_DIR = "/tmp/plaghunt_clone_cache"
+DEFAULT_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024
+LS_REMOTE_TIMEOUT = 30
+
+SIZE_FILE = ".plaghunt_size"
+
+
+def remote_head_sha(url, timeout=LS_REMOTE_TIMEOUT):
+    """Resolve the remote HEAD commit without cloning"""
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    output = subprocess.run(
+        ["git", "ls-remote", url, "HEAD"],
+        capture_output=True, text=True, timeout=timeout, check=True, env=env
+    ).stdout
+    for line in output.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref == "HEAD" and re.fullmatch(r"[0-9a-f]{40,64}", sha):
+            return sha
+    raise RuntimeError(f"Could not resolve HEAD for {url}")
+
+def lock_entry(entry, operation):
+    """
+    Open entry's lock file and flock it. Eviction unlinks lock files while
+    holding them, so retry until the locked file is the one at the path.
+    """
+    lock_path = entry + ".lock"
+    while True:
+        lock_file = open(lock_path, "a+")
+        try:
+            fcntl.flock(lock_file, operation)
+            if is_current_lock(lock_file, lock_path):
+                return lock_file
+        except BaseException:
+            lock_file.close()
+            raise
+        lock_file.close()
+
+def is_current_lock(lock_file, lock_path):
+    try:
+        on_disk = os.stat(lock_path)
+    except FileNotFoundError:
+        return False
+    held = os.fstat(lock_file.fileno())
+    return (held.st_dev, held.st_ino) == (on_disk.st_dev, on_disk.st_ino)
+
+def local_head_sha(path):
+    return subprocess.run(
+        ["git", "-C", path, "rev-parse", "HEAD"],
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class CacheLease:
+    """A checkout handed out by the cache; call release() when done reading it"""
+
+    def __init__(self, path, lock_file=None, cleanup=False, sha=None):
+        self.path = path
+        self.sha = sha
+        self._lock_file = lock_file
+        self._cleanup = cleanup
+
+    def release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        if self._cleanup:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._cleanup = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CloneCache:
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or get_settings().get('CLONE_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes or get_settings().get_int('CLONE_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)
+        self.enabled = get_settings().get_bool('CLONE_CACHE_ENABLED', True)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["enabled"] = self.enabled
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _entry_name(self, full_name, sha, mode):
+        safe_name = re.sub(r"[^\w.\-]", "_", full_name.replace("/", "__"))
+        return f"{safe_name}@{sha}.{mode}"
+
+    def acquire(self, url, full_name, scratch_dir, mode=None):
+        """
+        Return a CacheLease for a checkout of url at its current HEAD.
+
+        Falls back to an uncached clone into scratch_dir when the cache is
+        disabled or the remote HEAD cannot be resolved.
+        """
+        mode = mode or get_clone_mode()
+        if not self.enabled:
+            return CacheLease(clone_repo(url, scratch_dir, mode=mode), cleanup=True)
+
+        try:
+            sha = remote_head_sha(url)
+        except Exception as e:
+            print(f"Warning: ls-remote failed for {full_name}, cloning without cache: {e}")
+            self._count("errors")
+            return CacheLease(clone_repo(url, scratch_dir, mode=mode), cleanup=True)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = os.path.join(self.cache_dir, self._entry_name(full_name, sha, mode))
+        populated = False
+        while True:
+            lock_file = lock_entry(entry, fcntl.LOCK_SH)
+            try:
+                if not os.path.isdir(entry):
+                    # Upgrade to an exclusive lock and re-check: another worker may have filled it
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    if is_current_lock(lock_file, entry + ".lock") and not os.path.isdir(entry):
+                        self._count("misses")
+                        self._populate(url, entry, mode)
+                        populated = True
+                    fcntl.flock(lock_file, fcntl.LOCK_SH)
+                    # Lock conversions are not atomic: the evictor may have run in between
+                    if not (is_current_lock(lock_file, entry + ".lock") and os.path.isdir(entry)):
+                        lock_file.close()
+                        continue
+                if not populated:
+                    self._count("hits")
+                os.utime(entry + ".lock")
+            except BaseException:
+                lock_file.close()
+                raise
+            break
+
+        if populated:
+            self.evict()
+        return CacheLease(entry, lock_file, sha=sha)
+
+    def _populate(self, url, entry, mode):
+        tmp_dir = f"{entry}.tmp-{uuid.uuid4().hex}"
+        try:
+            clone_repo(url, tmp_dir, mode=mode)
+            with open(os.path.join(tmp_dir, ".git", SIZE_FILE), "w") as f:
+                f.write(str(directory_size(tmp_dir)))
+            os.rename(tmp_dir, entry)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _entry_size(self, entry):
+        try:
+            with open(os.path.join(entry, ".git", SIZE_FILE)) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return directory_size(entry)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its quota"""
+        if not self._evict_lock.acquire(blocking=False):
+            return  # another thread is already evicting
+        try:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if name.endswith(".lock") or ".tmp-" in name or not os.path.isdir(path):
+                    continue
+                try:
+                    last_used = os.path.getmtime(path + ".lock")
+                except OSError:
+                    last_used = 0
+                entries.append((last_used, path, self._entry_size(path)))
+
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    lock_file = lock_entry(path, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # in use by an analysis
+                with lock_file:
+                    shutil.rmtree(path, ignore_errors=True)
+                    # Unlinked while held: waiters on this file see it is stale and retry
+                    os.unlink(path + ".lock")
+                total -= size
+                self._count("evictions")
+                print(f"🧹 Evicted {os.path.basename(path)} from clone cache")
+        except OSError as e:
+            print(f"Warning: clone cache eviction failed: {e}")
+        finally:
+            self._evict_lock.release()
+
+    def sweep_stale_tmp(self, older_than=3600):
+        """Remove half-written entries left behind by crashed clones, and lock files without an entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        cutoff = time.time() - older_than
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if ".tmp-" in name:
+                    shutil.rmtree(path, ignore_errors=True)
+                elif name.endswith(".lock"):
+                    entry = path[:-len(".lock")]
+                    with lock_entry(entry, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                        if not os.path.isdir(entry):
+                            os.unlink(path)
+            except BlockingIOError:
+                pass  # a clone of this entry is in progress
+            except OSError as e:
+                print(f"Warning: could not sweep {name} from clone cache: {e}")
+
+
+clone_cache = CloneCache()
@@ -1,13 +1,13 @@
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
+from functools import lru_cache
+from .similarity_engine import SimilarityEngine, load_global_idf
+from .fingerprint import fingerprint_repository, compare_fingerprints
+from .fingerprint_store import fingerprint_store, repository_hashes
+from .repo_snapshot import get_snapshot
+from .minhash import MinHash, prefilter_enabled, get_min_jaccard
 
 def list_files(root):
-    paths = []
-    for dirpath, _, filenames in os.walk(root):
-        for f in filenames:
-            relative_path = os.path.relpath(os.path.join(dirpath, f), root)
-            paths.append(relative_path)
-    return set(paths)
+    return get_snapshot(root).paths()
 
 def compare_file_structure(path1, path2):
     files1 = list_files(path1)
@@ -21,47 +21,141 @@ def compare_file_structure(path1, path2):
 def cosine_similarity_text(text1, text2):
     if not text1 or not text2:
         return 0.0
-    
+
     try:
-        vectorizer = TfidfVectorizer()
-        tfidf = vectorizer.fit_transform([text1, text2])
-        similarity_matrix = (tfidf * tfidf.T)
-        
-        # Handle both sparse and dense matrices
-        if hasattr(similarity_matrix, 'A'):
-            similarity = similarity_matrix.A[0, 1]
-        else:
-            similarity = similarity_matrix[0, 1]
-            
-        return float(similarity)
+        engine = SimilarityEngine()
+        engine.add("a", text1)
+        engine.add("b", text2)
+        return engine.similarity("a", "b")
     except Exception as e:
         print(f"Cosine similarity error: {e}")
         return 0.0
+
+def read_common_files(path1, path2, common_files=None):
+    """Yield (relative_path, text1, text2) for files present in both trees"""
+    snapshot1, snapshot2 = get_snapshot(path1), get_snapshot(path2)
+    if common_files is None:
+        common_files = snapshot1.paths().intersection(snapshot2.paths())
+
+    for f in sorted(common_files):
+        entry1, entry2 = snapshot1.get(f), snapshot2.get(f)
+        if entry1 is None or entry2 is None:
+            continue
+        text1, text2 = entry1.text, entry2.text
+        if text1 is None or text2 is None:
+            continue
+        yield f, text1, text2
+
+def add_code_pairs(engine, path1, path2, common_files=None):
+    """Add every readable common file pair to engine; return the key pairs"""
+    pairs = []
+    for f, text1, text2 in read_common_files(path1, path2, common_files):
+        if not text1 or not text2:
+            # Matches the old per-pair behaviour: empty files score 0
+            pairs.append(None)
+            continue
+        pairs.append((engine.add(("suspect", f), text1), engine.add(("candidate", f), text2)))
+    return pairs
+
+def average_pair_similarity(engine, pairs):
+    keyed = [p for p in pairs if p is not None]
+    if not pairs:
+        return 0.0
+    similarities = engine.pairwise([a for a, _ in keyed], [b for _, b in keyed]) if keyed else []
+    return float(sum(similarities)) / len(pairs)
+
 def compare_code_files(path1, path2):
-    files1 = list_files(path1)
-    files2 = list_files(path2)
+    engine = SimilarityEngine(load_global_idf())
+    pairs = add_code_pairs(engine, path1, path2)
+    return average_pair_similarity(engine, pairs)
+
+@lru_cache(maxsize=4)
+def _cached_fingerprints(path, mtime):
+    # The suspect is fingerprinted once per worker process, not once per candidate
+    return fingerprint_repository(path)
+
+def repository_fingerprints(path):
+    return _cached_fingerprints(path, os.path.getmtime(path))
+
+@lru_cache(maxsize=4)
+def _cached_signature(path, mtime):
+    return MinHash.from_repository(list_files(path), repository_fingerprints(path))
 
-    common_files = files1.intersection(files2)
+def repository_signature(path):
+    return _cached_signature(path, os.path.getmtime(path))
 
-    similarities = []
-    for f in common_files:
-        file1 = os.path.join(path1, f)
-        file2 = os.path.join(path2, f)
+def compare_repositories(suspect_path, candidate_path, suspect_readme="", candidate_readme="", index_as=None):
+    """
+    Run every comparison for one suspect/candidate pair.
+    Kept at module level so it can be shipped to a worker process.
 
+    index_as: optional dict with full_name, url, commit_sha and metadata; when
+    given, the candidate's fingerprints are also added to the fingerprint store.
+    """
+    structure_ratio, overlap_files = compare_file_structure(suspect_path, candidate_path)
+
+    candidate_fps = {}
+    try:
+        candidate_fps = fingerprint_repository(candidate_path)
+    except Exception as e:
+        print(f"Fingerprinting failed: {e}")
+
+    # Candidates that share almost no paths or shingles with the suspect skip
+    # the per-file code comparisons
+    estimated_jaccard = None
+    prefiltered = False
+    if prefilter_enabled():
         try:
-            with open(file1, "r", encoding="utf-8") as f1:
-                text1 = f1.read()
-            with open(file2, "r", encoding="utf-8") as f2:
-                text2 = f2.read()
-
-            sim = cosine_similarity_text(text1, text2)
-            similarities.append(sim)
-        except:
-            continue
+            candidate_signature = MinHash.from_repository(list_files(candidate_path), candidate_fps)
+            estimated_jaccard = repository_signature(suspect_path).jaccard(candidate_signature)
+            prefiltered = estimated_jaccard < get_min_jaccard()
+        except Exception as e:
+            print(f"MinHash prefilter failed: {e}")
+
+    # README and every common code file go through one vectorization pass
+    engine = SimilarityEngine(load_global_idf())
+    readme_keys = None
+    if suspect_readme and candidate_readme:
+        readme_keys = (engine.add("suspect_readme", suspect_readme),
+                       engine.add("candidate_readme", candidate_readme))
+    pairs = [] if prefiltered else add_code_pairs(engine, suspect_path, candidate_path, overlap_files)
+
+    readme_similarity = 0.0
+    try:
+        if readme_keys:
+            readme_similarity = engine.similarity(*readme_keys)
+    except Exception as e:
+        print(f"README comparison failed: {e}")
 
-    if similarities:
-        avg_sim = sum(similarities) / len(similarities)
-    else:
-        avg_sim = 0.0
+    code_similarity = 0.0
+    try:
+        code_similarity = average_pair_similarity(engine, pairs)
+    except Exception as e:
+        print(f"Code comparison failed: {e}")
+
+    # Winnowing catches code that was copied into renamed or moved files
+    fingerprint_similarity = 0.0
+    code_matches = []
+    try:
+        if not prefiltered:
+            fingerprint_similarity, code_matches = compare_fingerprints(
+                repository_fingerprints(suspect_path),
+                candidate_fps
+            )
+        if index_as and candidate_fps:
+            fingerprint_store.index_repository(hashes=repository_hashes(candidate_fps), **index_as)
+    except Exception as e:
+        print(f"Fingerprint comparison failed: {e}")
 
-    return avg_sim
+    return {
+        "structure_ratio": structure_ratio,
+        "overlap_files": sorted(overlap_files),
+        "readme_similarity": readme_similarity,
+        # Same-path TF-IDF only; renamed copies show up in fingerprint_similarity,
+        # which the risk score weighs separately
+        "code_similarity": code_similarity,
+        "fingerprint_similarity": fingerprint_similarity,
+        "code_matches": code_matches,
+        "estimated_jaccard": estimated_jaccard,
+        "prefiltered": prefiltered
+    }
@@ -1,51 +1,255 @@
 """
 Configuration loader for API tokens and settings
+
+Settings are read once per process from config.env, .env and the
+environment (later sources win) and then served from memory. Reload them
+explicitly with reload_settings(), by sending the process SIGHUP, or by
+enabling the config.env mtime watcher (CONFIG_WATCH_INTERVAL seconds).
 """
 import os
+import signal
+import threading
 from typing import Optional
+from dotenv import dotenv_values
 
-def load_config() -> dict:
-    """
-    Load configuration from config.env file and environment variables.
-    Environment variables take precedence over config file.
-    
-    Returns:
-        dict: Configuration dictionary with API keys
-    """
+BACKEND_DIR = os.path.dirname(os.path.dirname(__file__))  # Go up two levels to backend/
+CONFIG_FILE = os.path.join(BACKEND_DIR, 'config.env')
+DOTENV_FILE = os.path.join(BACKEND_DIR, '.env')
+
+DEFAULT_JWT_SECRET = 'your-secret-key-change-in-production'
+
+# Typed settings checked by Settings.validate(); see the README env block
+INT_SETTINGS = (
+    'ANALYSIS_WORKERS', 'ANALYSIS_STALE_AFTER', 'ANALYSIS_CLONE_CONCURRENCY', 'ANALYSIS_COMPARE_PROCESSES',
+    'ANALYSIS_DEDUP_WINDOW', 'CLONE_MAX_BYTES', 'CLONE_CACHE_MAX_BYTES', 'CONFIG_WATCH_INTERVAL',
+    'GEMINI_CACHE_TTL', 'GITHUB_CACHE_TTL', 'GITHUB_CACHE_MAX_BYTES', 'GITHUB_MAX_RETRIES',
+    'GITHUB_POOL_SIZE', 'GITHUB_SEARCH_CONCURRENCY', 'GITHUB_SEARCH_PER_MINUTE', 'GITHUB_CORE_PER_MINUTE',
+    'FINGERPRINT_DB_CANDIDATES', 'SIMILARITY_IDF_MAX_TERMS', 'AUTH_USER_CACHE_SIZE',
+    'WORKSPACE_ORPHAN_MAX_AGE', 'PROJECT_TEXT_TOKEN_BUDGET', 'HISTORY_MAX_PAGE_SIZE'
+)
+FLOAT_SETTINGS = (
+    'CLONE_TIMEOUT', 'ANALYSIS_POLL_INTERVAL', 'ANALYSIS_STREAM_KEEPALIVE', 'AUTH_USER_CACHE_TTL',
+    'FINGERPRINT_DB_MIN_CONTAINMENT', 'MINHASH_MIN_JACCARD', 'GEMINI_TIMEOUT', 'GITHUB_MAX_WAIT'
+)
+BOOL_SETTINGS = (
+    'ANALYSIS_WORKERS_AUTOSTART', 'AUTH_TRUST_TOKEN_CLAIMS', 'AUTH_USER_CACHE_ENABLED', 'CLONE_CACHE_ENABLED',
+    'FINGERPRINT_DB_ENABLED', 'GEMINI_CACHE_ENABLED', 'GITHUB_CACHE_ENABLED', 'METRICS_ENABLED',
+    'MINHASH_PREFILTER', 'MONGODB_ENSURE_INDEXES', 'SIMILARITY_GLOBAL_IDF'
+)
+CHOICE_SETTINGS = {
+    'CLONE_MODE': ('full', 'shallow', 'blobless', 'sparse'),
+    'TOPIC_EXTRACTOR': ('auto', 'gemini', 'local')
+}
+
+
+def _read_config_file(path) -> dict:
     config = {}
-    
-    # Try to load from config.env file first (in backend directory)
-    backend_dir = os.path.dirname(os.path.dirname(__file__))  # Go up two levels to backend/
-    config_file = os.path.join(backend_dir, 'config.env')
-    if os.path.exists(config_file):
+    if os.path.exists(path):
         try:
-            with open(config_file, 'r') as f:
+            with open(path, 'r') as f:
                 for line in f:
                     line = line.strip()
                     if line and not line.startswith('#') and '=' in line:
                         key, value = line.split('=', 1)
                         config[key.strip()] = value.strip()
         except Exception as e:
-            print(f"Warning: Could not read config.env: {e}")
-    
-    # Override with environment variables (these take precedence)
-    config['GITHUB_TOKEN'] = os.environ.get('GITHUB_TOKEN', config.get('GITHUB_TOKEN'))
-    config['GEMINI_API_KEY'] = os.environ.get('GEMINI_API_KEY', config.get('GEMINI_API_KEY'))
-    
+            print(f"Warning: Could not read {os.path.basename(path)}: {e}")
     return config
 
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class Settings:
+    """Immutable snapshot of the process configuration"""
+
+    def __init__(self, values: dict, mtimes: dict):
+        self._values = values
+        self.mtimes = mtimes
+        self._warned = set()
+
+    @classmethod
+    def load(cls) -> "Settings":
+        values = _read_config_file(CONFIG_FILE)
+        if os.path.exists(DOTENV_FILE):
+            values.update({k: v for k, v in dotenv_values(DOTENV_FILE).items() if v is not None})
+        # Environment variables take precedence over both files
+        values.update(os.environ)
+        return cls(values, {path: _mtime(path) for path in (CONFIG_FILE, DOTENV_FILE)})
+
+    def get(self, key, default=None):
+        value = self._values.get(key)
+        return default if value in (None, '') else value
+
+    def get_bool(self, key, default=False) -> bool:
+        value = self.get(key)
+        return default if value is None else value.lower() == 'true'
+
+    def get_int(self, key, default=0) -> int:
+        return self._get_number(key, default, int)
+
+    def get_float(self, key, default=0.0) -> float:
+        return self._get_number(key, default, float)
+
+    def _get_number(self, key, default, kind):
+        """A malformed value falls back to default, with one warning per snapshot"""
+        value = self.get(key)
+        if value is None:
+            return default
+        try:
+            return kind(value)
+        except ValueError:
+            if key not in self._warned:
+                self._warned.add(key)
+                print(f"⚠️  Config: {key}={value!r} is not a valid {kind.__name__}; using {default!r}")
+            return default
+
+    def as_dict(self) -> dict:
+        return dict(self._values)
+
+    # Named settings used across the app
+    @property
+    def github_token(self) -> Optional[str]:
+        return self.get('GITHUB_TOKEN')
+
+    @property
+    def github_tokens(self) -> list:
+        tokens = [t.strip() for t in (self.get('GITHUB_TOKENS') or '').split(',') if t.strip()]
+        if self.github_token and self.github_token not in tokens:
+            tokens.append(self.github_token)
+        return tokens
+
+    @property
+    def gemini_api_key(self) -> Optional[str]:
+        return self.get('GEMINI_API_KEY')
+
+    @property
+    def mongodb_uri(self) -> str:
+        return self.get('MONGODB_URI', 'mongodb://localhost:27017/')
+
+    @property
+    def db_name(self) -> str:
+        return self.get('DB_NAME', 'plagiarism_detector')
+
+    @property
+    def jwt_secret_key(self) -> str:
+        return self.get('JWT_SECRET_KEY', DEFAULT_JWT_SECRET)
+
+    def validate(self) -> list:
+        """Return a list of configuration problems (empty when everything is set)"""
+        problems = []
+        if not self.github_tokens:
+            problems.append("GITHUB_TOKEN is not set; GitHub search will run unauthenticated")
+        if not self.gemini_api_key:
+            problems.append("GEMINI_API_KEY is not set; topics will come from the offline extractor")
+        if self.jwt_secret_key == DEFAULT_JWT_SECRET:
+            problems.append("JWT_SECRET_KEY is the built-in default; set a real secret in production")
+        # get_int/get_float fall back to their defaults for these
+        for keys, kind, expected in ((INT_SETTINGS, int, "an integer"), (FLOAT_SETTINGS, float, "a number")):
+            for key in keys:
+                value = self.get(key)
+                try:
+                    value is None or kind(value)
+                except ValueError:
+                    problems.append(f"{key} must be {expected}, got {value!r}; using the default")
+        for key in BOOL_SETTINGS:
+            value = self.get(key)
+            if value is not None and value.lower() not in ('true', 'false'):
+                problems.append(f"{key} must be true or false, got {value!r}")
+        for key, choices in CHOICE_SETTINGS.items():
+            value = self.get(key)
+            if value is not None and value.lower() not in choices:
+                problems.append(f"{key} must be one of {', '.join(choices)}, got {value!r}")
+        return problems
+
+
+_settings = None
+_settings_lock = threading.RLock()  # reentrant: SIGHUP may arrive while it is held
+_reload_callbacks = []
+
+def get_settings() -> Settings:
+    """The process-wide settings, loaded on first use"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings.load()
+    return _settings
+
+def reload_settings() -> Settings:
+    """Re-read every source and notify listeners registered with on_reload()"""
+    global _settings
+    with _settings_lock:
+        _settings = Settings.load()
+        callbacks = list(_reload_callbacks)
+    for callback in callbacks:
+        try:
+            callback(_settings)
+        except Exception as e:
+            print(f"Warning: settings reload callback failed: {e}")
+    print("🔄 Configuration reloaded")
+    return _settings
+
+def on_reload(callback):
+    """Call callback(settings) after every reload"""
+    with _settings_lock:
+        _reload_callbacks.append(callback)
+    return callback
+
+def reload_if_changed() -> bool:
+    """Reload when config.env or .env changed on disk since the last load"""
+    settings = get_settings()
+    if any(_mtime(path) != mtime for path, mtime in settings.mtimes.items()):
+        reload_settings()
+        return True
+    return False
+
+def install_reload_handlers():
+    """Reload on SIGHUP and, if CONFIG_WATCH_INTERVAL > 0, when the files change"""
+    if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_settings())
+
+    interval = get_settings().get_int('CONFIG_WATCH_INTERVAL', 0)
+    if interval > 0:
+        def watch():
+            stop = threading.Event()
+            while not stop.wait(interval):
+                try:
+                    reload_if_changed()
+                except Exception as e:
+                    print(f"Warning: config watcher failed: {e}")
+        threading.Thread(target=watch, name="config-watcher", daemon=True).start()
+
+def load_config() -> dict:
+    """
+    Return the configuration as a dict.
+    Environment variables take precedence over config file.
+
+    Returns:
+        dict: Configuration dictionary with API keys
+    """
+    return get_settings().as_dict()
+
 def get_github_token() -> Optional[str]:
     """Get GitHub token from config"""
-    config = load_config()
-    token = config.get('GITHUB_TOKEN')
+    token = get_settings().github_token
     if not token:
         raise ValueError("GitHub token not found. Please set GITHUB_TOKEN in config.env or environment variable.")
     return token
 
+def get_github_tokens() -> list:
+    """
+    Get every configured GitHub token: GITHUB_TOKENS (comma-separated) plus
+    GITHUB_TOKEN. Returns an empty list when none are set.
+    """
+    return get_settings().github_tokens
+
 def get_gemini_api_key() -> Optional[str]:
     """Get Gemini API key from config"""
-    config = load_config()
-    api_key = config.get('GEMINI_API_KEY')
+    api_key = get_settings().gemini_api_key
     if not api_key:
         raise ValueError("Gemini API key not found. Please set GEMINI_API_KEY in config.env or environment variable.")
     return api_key
@@ -53,9 +257,11 @@ def get_gemini_api_key() -> Optional[str]:
 if __name__ == "__main__":
     # Test the configuration loading
     try:
-        config = load_config()
+        settings = get_settings()
         print("✅ Configuration loaded successfully")
-        print(f"GitHub token: {'✅ Found' if config.get('GITHUB_TOKEN') else '❌ Missing'}")
-        print(f"Gemini API key: {'✅ Found' if config.get('GEMINI_API_KEY') else '❌ Missing'}")
+        print(f"GitHub token: {'✅ Found' if settings.github_token else '❌ Missing'}")
+        print(f"Gemini API key: {'✅ Found' if settings.gemini_api_key else '❌ Missing'}")
+        for problem in settings.validate():
+            print(f"⚠️  {problem}")
     except Exception as e:
         print(f"❌ Configuration error: {e}")
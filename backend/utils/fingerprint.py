@@ -0,0 +1,220 @@
+"""
+MOSS-style winnowing fingerprints for cross-file code similarity.
+
+Source is tokenized with identifiers, numbers and strings normalized (so
+renaming variables does not hide copying), token k-grams are hashed and
+a winnowing window keeps the minimum hash of every window. Fingerprints
+of candidate files go into an inverted index, so every suspect file is
+matched against every candidate file in roughly linear time, regardless
+of where the files live in the tree.
+"""
+import re
+import hashlib
+from collections import defaultdict, namedtuple
+from .languages import LANGUAGE_MAP
+from .repo_snapshot import get_snapshot
+
+DEFAULT_K = 12         # tokens per k-gram (noise threshold)
+DEFAULT_WINDOW = 8     # k-grams per winnowing window (guarantee = k + w - 1 tokens)
+MAX_FILE_BYTES = 1024 * 1024
+MAX_MATCHES = 25
+# Fingerprints found in more candidate files than this are boilerplate and
+# ignored, like MOSS's -m option
+MAX_POSTING_FILES = 32
+
+SKIP_DIRS = {'node_modules', '__pycache__', 'venv', 'env', 'build', 'dist', 'target',
+             'artifacts', 'cache', 'typechain-types'}
+
+# Keywords shared by the languages we analyze are kept verbatim; every other
+# identifier collapses to one token
+KEYWORDS = {
+    'if', 'else', 'elif', 'for', 'while', 'do', 'return', 'break', 'continue', 'switch',
+    'case', 'default', 'try', 'catch', 'except', 'finally', 'throw', 'raise', 'class',
+    'def', 'function', 'fn', 'func', 'struct', 'interface', 'enum', 'import', 'from',
+    'export', 'package', 'public', 'private', 'protected', 'static', 'const', 'let', 'var',
+    'new', 'this', 'self', 'super', 'with', 'as', 'in', 'is', 'not', 'and', 'or', 'lambda',
+    'yield', 'async', 'await', 'true', 'false', 'null', 'none', 'nil', 'void', 'int',
+    'string', 'bool', 'float', 'contract', 'mapping', 'modifier', 'require', 'emit',
+    'event', 'pragma', 'returns', 'memory', 'storage', 'external', 'internal', 'view',
+    'pure', 'payable'
+}
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*|(?<![\w'\"])#[^\n]*", re.DOTALL)
+_TOKEN_RE = re.compile(
+    r"(?P<str>\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`[^`]*`)"
+    r"|(?P<num>\b\d[\w.]*)"
+    r"|(?P<id>[A-Za-z_$][\w$]*)"
+    r"|(?P<op>[^\s\w])"
+)
+
+Fingerprint = namedtuple("Fingerprint", ["hash", "start_line", "end_line"])
+
+
+def _strip_comments(text):
+    # Keep newlines so line numbers survive
+    return _COMMENT_RE.sub(lambda m: "\n" * m.group(0).count("\n"), text)
+
+def tokenize(text):
+    """Return a list of (normalized_token, line_number) pairs"""
+    text = _strip_comments(text)
+    tokens = []
+    line = 1
+    last_end = 0
+    for m in _TOKEN_RE.finditer(text):
+        line += text.count("\n", last_end, m.start())
+        last_end = m.start()
+        kind = m.lastgroup
+        if kind == "id":
+            word = m.group(0).lower()
+            token = word if word in KEYWORDS else "V"
+        elif kind == "num":
+            token = "N"
+        elif kind == "str":
+            token = "S"
+        else:
+            token = m.group(0)
+        tokens.append((token, line))
+    return tokens
+
+def _hash(kgram):
+    digest = hashlib.blake2b("\x1f".join(kgram).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def fingerprint_text(text, k=DEFAULT_K, window=DEFAULT_WINDOW):
+    """Winnow the k-gram hashes of text into a list of Fingerprints"""
+    tokens = tokenize(text)
+    if len(tokens) < k:
+        return []
+
+    hashes = []
+    for i in range(len(tokens) - k + 1):
+        kgram = [t for t, _ in tokens[i:i + k]]
+        hashes.append((_hash(kgram), tokens[i][1], tokens[i + k - 1][1]))
+
+    if len(hashes) <= window:
+        h = min(hashes, key=lambda x: x[0])
+        return [Fingerprint(*h)]
+
+    fingerprints = []
+    last_pos = -1
+    for start in range(len(hashes) - window + 1):
+        # Rightmost minimum, as in robust winnowing
+        pos = start
+        for j in range(start + 1, start + window):
+            if hashes[j][0] <= hashes[pos][0]:
+                pos = j
+        if pos != last_pos:
+            fingerprints.append(Fingerprint(*hashes[pos]))
+            last_pos = pos
+    return fingerprints
+
+def iter_source_files(root):
+    """Yield FileEntry objects for analyzable source files"""
+    return get_snapshot(root).iter_files(skip_dirs=SKIP_DIRS, skip_hidden=True, extensions=LANGUAGE_MAP)
+
+def fingerprint_repository(root, k=DEFAULT_K, window=DEFAULT_WINDOW):
+    """Return {relative_path: [Fingerprint, ...]} for every source file under root"""
+    result = {}
+    for entry in iter_source_files(root):
+        if entry.size > MAX_FILE_BYTES or entry.text is None:
+            continue
+        fingerprints = fingerprint_text(entry.text, k, window)
+        if fingerprints:
+            result[entry.path] = fingerprints
+    return result
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class FingerprintIndex:
+    """Inverted index from fingerprint hash to the files that contain it"""
+
+    def __init__(self, max_posting_files=MAX_POSTING_FILES):
+        self.max_posting_files = max_posting_files
+        self._postings = defaultdict(lambda: defaultdict(list))
+
+    def add_file(self, file_id, fingerprints):
+        for fp in fingerprints:
+            self._postings[fp.hash][file_id].append((fp.start_line, fp.end_line))
+
+    def add_repository(self, file_fingerprints):
+        for file_id, fingerprints in file_fingerprints.items():
+            self.add_file(file_id, fingerprints)
+        return self
+
+    def is_common(self, fp_hash):
+        files = self._postings.get(fp_hash)
+        return files is not None and len(files) > self.max_posting_files
+
+    def query(self, fingerprints):
+        """
+        Match one file's fingerprints against the index.
+
+        Returns {file_id: (shared_hashes, query_ranges, indexed_ranges)}
+        """
+        query_ranges_by_hash = defaultdict(list)
+        for fp in fingerprints:
+            query_ranges_by_hash[fp.hash].append((fp.start_line, fp.end_line))
+
+        hits = defaultdict(lambda: (set(), [], []))
+        for fp_hash, query_ranges in query_ranges_by_hash.items():
+            files = self._postings.get(fp_hash)
+            if not files or len(files) > self.max_posting_files:
+                continue
+            for file_id, indexed_ranges in files.items():
+                shared, hit_query_ranges, hit_indexed_ranges = hits[file_id]
+                shared.add(fp_hash)
+                hit_query_ranges.extend(query_ranges)
+                hit_indexed_ranges.extend(indexed_ranges)
+        return hits
+
+
+def compare_fingerprints(suspect_fps, candidate_fps, max_matches=MAX_MATCHES):
+    """
+    Match every suspect file against every candidate file.
+
+    Args:
+        suspect_fps / candidate_fps: {relative_path: [Fingerprint, ...]}
+
+    Returns:
+        (similarity, matches): similarity is the share of suspect fingerprints
+        found anywhere in the candidate; matches lists the best file pairs
+        with their matched line ranges.
+    """
+    index = FingerprintIndex().add_repository(candidate_fps)
+
+    total = 0
+    matched = 0
+    matches = []
+    for suspect_file, fingerprints in suspect_fps.items():
+        unique_hashes = {fp.hash for fp in fingerprints if not index.is_common(fp.hash)}
+        if not unique_hashes:
+            continue
+        total += len(unique_hashes)
+        hits = index.query(fingerprints)
+        if not hits:
+            continue
+
+        matched_hashes = set()
+        for candidate_file, (shared, suspect_ranges, candidate_ranges) in hits.items():
+            matched_hashes |= shared
+            matches.append({
+                "suspect_file": suspect_file,
+                "candidate_file": candidate_file,
+                "similarity": round(len(shared) / len(unique_hashes), 3),
+                "shared_fingerprints": len(shared),
+                "suspect_lines": _merge_ranges(suspect_ranges),
+                "candidate_lines": _merge_ranges(candidate_ranges)
+            })
+        matched += len(matched_hashes)
+
+    matches.sort(key=lambda m: (-m["shared_fingerprints"], m["suspect_file"], m["candidate_file"]))
+    similarity = matched / total if total else 0.0
+    return similarity, matches[:max_matches]
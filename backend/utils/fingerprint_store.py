@@ -0,0 +1,229 @@
+"""
+Persistent fingerprint database of every repository the service has cloned.
+
+Each repository's winnowing fingerprints (see utils/fingerprint.py) are
+stored as a set of 64-bit hashes in SQLite, indexed by hash. A new suspect
+can be matched against everything seen before with one indexed join,
+before any GitHub search happens.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from .fingerprint import fingerprint_repository
+from .config_loader import get_settings
+
+DEFAULT_DB_PATH = "/tmp/plaghunt_fingerprints.db"
+INSERT_BATCH = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL UNIQUE,
+    url TEXT,
+    commit_sha TEXT,
+    metadata TEXT,
+    fingerprint_count INTEGER NOT NULL DEFAULT 0,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    hash INTEGER NOT NULL,
+    repo_id INTEGER NOT NULL,
+    PRIMARY KEY (hash, repo_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fingerprints_repo ON fingerprints (repo_id);
+"""
+
+
+def _signed(h):
+    # SQLite integers are signed 64-bit
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def repository_hashes(file_fingerprints):
+    """Collapse {path: [Fingerprint, ...]} into a set of signed hashes"""
+    return {_signed(fp.hash) for fps in file_fingerprints.values() for fp in fps}
+
+
+class FingerprintStore:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or get_settings().get('FINGERPRINT_DB_PATH', DEFAULT_DB_PATH)
+        self.enabled = get_settings().get_bool('FINGERPRINT_DB_ENABLED', True)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def get_repository(self, full_name):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT full_name, url, commit_sha, metadata, fingerprint_count, indexed_at "
+                "FROM repos WHERE full_name = ?", (full_name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return {
+            "full_name": row[0],
+            "url": row[1],
+            "commit_sha": row[2],
+            "metadata": json.loads(row[3] or "{}"),
+            "fingerprint_count": row[4],
+            "indexed_at": row[5]
+        }
+
+    def index_repository(self, full_name, url, path=None, commit_sha=None, metadata=None, hashes=None):
+        """
+        Insert or replace a repository's fingerprints.
+
+        Pass either a checkout path or precomputed hashes. Re-indexing the
+        same commit is a no-op.
+        """
+        if not self.enabled:
+            return False
+        existing = self.get_repository(full_name)
+        if existing and commit_sha and existing["commit_sha"] == commit_sha:
+            return False
+
+        if hashes is None:
+            hashes = repository_hashes(fingerprint_repository(path))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM fingerprints WHERE repo_id IN (SELECT id FROM repos WHERE full_name = ?)", (full_name,))
+                conn.execute(
+                    "INSERT INTO repos (full_name, url, commit_sha, metadata, fingerprint_count, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(full_name) DO UPDATE SET url = excluded.url, commit_sha = excluded.commit_sha, "
+                    "metadata = excluded.metadata, fingerprint_count = excluded.fingerprint_count, "
+                    "indexed_at = excluded.indexed_at",
+                    (full_name, url, commit_sha, json.dumps(metadata or {}), len(hashes), time.time())
+                )
+                repo_id = conn.execute("SELECT id FROM repos WHERE full_name = ?", (full_name,)).fetchone()[0]
+                batch = []
+                for h in hashes:
+                    batch.append((h, repo_id))
+                    if len(batch) >= INSERT_BATCH:
+                        conn.executemany("INSERT OR IGNORE INTO fingerprints (hash, repo_id) VALUES (?, ?)", batch)
+                        batch = []
+                if batch:
+                    conn.executemany("INSERT OR IGNORE INTO fingerprints (hash, repo_id) VALUES (?, ?)", batch)
+        finally:
+            conn.close()
+        return True
+
+    def delete_repository(self, full_name):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM fingerprints WHERE repo_id IN (SELECT id FROM repos WHERE full_name = ?)", (full_name,))
+                deleted = conn.execute("DELETE FROM repos WHERE full_name = ?", (full_name,)).rowcount
+        finally:
+            conn.close()
+        return deleted > 0
+
+    def compact(self):
+        """Drop orphaned fingerprints and reclaim disk space"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM fingerprints WHERE repo_id NOT IN (SELECT id FROM repos)")
+            conn.execute("ANALYZE")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+
+    def query(self, hashes, top_n=10, exclude_names=None, exclude_owner=None, min_shared=1):
+        """
+        Return the top_n stored repositories sharing the most fingerprints with hashes.
+
+        Each result has full_name, url, metadata, shared (fingerprints in common),
+        containment (shared / len(hashes)) and fingerprint_count.
+        """
+        if not self.enabled or not hashes:
+            return []
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_hashes (hash INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM query_hashes")
+            conn.executemany("INSERT OR IGNORE INTO query_hashes (hash) VALUES (?)", ((h,) for h in hashes))
+
+            excluded = list(exclude_names or [])
+            sql = (
+                "SELECT r.full_name, r.url, r.metadata, r.fingerprint_count, COUNT(*) AS shared "
+                "FROM query_hashes q JOIN fingerprints f ON f.hash = q.hash "
+                "JOIN repos r ON r.id = f.repo_id "
+            )
+            conditions, params = [], []
+            if excluded:
+                conditions.append(f"r.full_name NOT IN ({','.join('?' * len(excluded))})")
+                params.extend(excluded)
+            if exclude_owner:
+                conditions.append("r.full_name NOT LIKE ?")
+                params.append(f"{exclude_owner}/%")
+            if conditions:
+                sql += "WHERE " + " AND ".join(conditions) + " "
+            sql += "GROUP BY r.id HAVING shared >= ? ORDER BY shared DESC, r.full_name LIMIT ?"
+            params.extend([min_shared, top_n])
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            {
+                "full_name": full_name,
+                "url": url,
+                "metadata": json.loads(metadata or "{}"),
+                "fingerprint_count": fingerprint_count,
+                "shared": shared,
+                "containment": shared / len(hashes)
+            }
+            for full_name, url, metadata, fingerprint_count, shared in rows
+        ]
+
+    def stats(self):
+        if not self.enabled or not os.path.exists(self.db_path):
+            return {"enabled": self.enabled, "repositories": 0, "fingerprints": 0}
+        conn = self._connect()
+        try:
+            repositories = conn.execute("SELECT COUNT(*) FROM repos").fetchone()[0]
+            fingerprints = conn.execute("SELECT COALESCE(SUM(fingerprint_count), 0) FROM repos").fetchone()[0]
+        finally:
+            conn.close()
+        return {
+            "enabled": self.enabled,
+            "repositories": repositories,
+            "fingerprints": fingerprints,
+            "db_bytes": os.path.getsize(self.db_path)
+        }
+
+
+fingerprint_store = FingerprintStore()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1:2]
+    if command == ["compact"]:
+        fingerprint_store.compact()
+        print(f"✅ Compacted {fingerprint_store.db_path}: {fingerprint_store.stats()}")
+    elif command == ["delete"] and len(sys.argv) == 3:
+        if fingerprint_store.delete_repository(sys.argv[2]):
+            print(f"🗑️ Removed {sys.argv[2]} from the fingerprint database")
+        else:
+            sys.exit(f"{sys.argv[2]} is not in the fingerprint database")
+    else:
+        sys.exit("usage: python -m utils.fingerprint_store compact | delete <owner/repo>")
@@ -0,0 +1,104 @@
+"""
+On-disk cache of Gemini topic/keyword analyses.
+
+Results are keyed by a hash of the model, the prompt version and the
+project text sent to the model, so re-analyzing an unchanged repository
+skips the LLM round-trip. Entries expire after GEMINI_CACHE_TTL seconds.
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from .config_loader import get_settings
+
+DEFAULT_CACHE_DIR = "/tmp/plaghunt_gemini_cache"
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+
+
+class GeminiCache:
+    def __init__(self, cache_dir=None, ttl=None):
+        self.cache_dir = cache_dir or get_settings().get('GEMINI_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.ttl = ttl if ttl is not None else get_settings().get_int('GEMINI_CACHE_TTL', DEFAULT_CACHE_TTL)
+        self.enabled = get_settings().get_bool('GEMINI_CACHE_ENABLED', True)
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["enabled"] = self.enabled
+        stats["ttl"] = self.ttl
+        return stats
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def key(model, prompt_version, text):
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        if time.time() - entry.get("stored_at", 0) >= self.ttl:
+            self._count("misses")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        self._count("hits")
+        return entry["result"]
+
+    def set(self, key, result):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": time.time(), "result": result}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write Gemini cache entry: {e}")
+            self._count("errors")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def get_or_compute(self, key, compute, bypass=False, cacheable=lambda result: True):
+        """Return the cached result for key, or compute() and store it"""
+        if bypass:
+            self._count("bypassed")
+        else:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+        result = compute()
+        if cacheable(result):
+            self.set(key, result)
+        return result
+
+
+gemini_cache = GeminiCache()
@@ -0,0 +1,207 @@
+"""
+On-disk cache for GitHub API GET requests.
+
+Similar projects produce the same search queries again and again. Responses
+are stored per normalized request with their ETag: within the TTL they are
+served without touching the network, after it they are revalidated with
+If-None-Match, and a 304 (which GitHub does not count against the rate
+limit) refreshes the entry. Least recently used entries are evicted once
+the cache grows past its size limit.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import threading
+from .config_loader import get_settings
+
+DEFAULT_CACHE_DIR = "/tmp/plaghunt_github_cache"
+DEFAULT_CACHE_TTL = 6 * 3600
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+class CachedResponse:
+    """The parts of a requests.Response the GitHub helpers use"""
+
+    def __init__(self, status_code, data, from_cache=False, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.from_cache = from_cache
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"GitHub API returned {self.status_code}")
+
+
+def normalize_params(params):
+    normalized = {}
+    for key, value in sorted((params or {}).items()):
+        value = str(value)
+        if key == "q":
+            # GitHub search is case-insensitive and ignores extra whitespace
+            value = re.sub(r"\s+", " ", value.strip().lower())
+        normalized[key] = value
+    return normalized
+
+
+class GitHubCache:
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None):
+        self.cache_dir = cache_dir or get_settings().get('GITHUB_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.ttl = ttl if ttl is not None else get_settings().get_int('GITHUB_CACHE_TTL', DEFAULT_CACHE_TTL)
+        self.max_bytes = max_bytes or get_settings().get_int('GITHUB_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)
+        self.enabled = get_settings().get_bool('GITHUB_CACHE_ENABLED', True)
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._written_since_sweep = None
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["revalidated"]) / lookups, 3) if lookups else 0.0
+        # Fresh hits skip the request entirely; 304s are free under GitHub's rate limit
+        stats["api_calls_saved"] = stats["hits"] + stats["revalidated"]
+        stats["enabled"] = self.enabled
+        stats["ttl"] = self.ttl
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _key(self, url, params, authenticated):
+        raw = json.dumps([url, normalize_params(params), authenticated], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _load(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, path, entry):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write GitHub cache entry: {e}")
+            self._count("errors")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._after_write(size)
+
+    def get(self, session, url, params=None, headers=None, timeout=None):
+        """
+        GET url through the cache. Returns a CachedResponse for cache hits
+        and a requests.Response otherwise; only 200 responses are stored.
+        """
+        if not self.enabled:
+            return session.get(url, params=params, headers=headers, timeout=timeout)
+
+        headers = dict(headers or {})
+        path = self._path(self._key(url, params, "Authorization" in headers))
+        entry = self._load(path)
+
+        if entry and time.time() - entry["stored_at"] < self.ttl:
+            self._count("hits")
+            try:
+                os.utime(path)  # recency for eviction only
+            except OSError:
+                pass  # evicted or removed since _load; the entry is still good
+            return CachedResponse(200, entry["data"], from_cache=True)
+
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            self._count("revalidated")
+            entry["stored_at"] = time.time()
+            self._store(path, entry)
+            return CachedResponse(200, entry["data"], from_cache=True, headers=response.headers)
+
+        self._count("misses")
+        if response.status_code == 200:
+            try:
+                data = response.json()
+            except ValueError:
+                return response
+            self._store(path, {
+                "url": url,
+                "params": normalize_params(params),
+                "etag": response.headers.get("ETag"),
+                "stored_at": time.time(),
+                "data": data
+            })
+        return response
+
+    def _after_write(self, size):
+        with self._stats_lock:
+            if self._written_since_sweep is None:
+                due = True  # first write in this process: check what is on disk
+            else:
+                self._written_since_sweep += size
+                due = self._written_since_sweep > self.max_bytes // 10
+            if due:
+                self._written_since_sweep = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size limit"""
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            for dirpath, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path, stat.st_size))
+
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self._count("evictions")
+        finally:
+            self._evict_lock.release()
+
+    def clear(self):
+        for dirpath, _, files in os.walk(self.cache_dir):
+            for name in files:
+                try:
+                    os.remove(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+
+
+github_cache = GitHubCache()
@@ -0,0 +1,299 @@
+"""
+Shared, rate-limit-aware GitHub API client.
+
+Every GitHub request goes through one keep-alive session and one pool of
+tokens (GITHUB_TOKENS plus GITHUB_TOKEN). For each token the client tracks
+the primary budget per resource from the X-RateLimit-* headers and a
+sliding one-minute window, and always sends with the token that has the
+most budget left. Requests wait for a free slot instead of being refused;
+403/429 answers put the token on cooldown (honouring Retry-After and
+X-RateLimit-Reset) and are retried on another token with jittered
+exponential backoff. Responses go through the on-disk cache in
+utils/github_cache.py, so cache hits never touch the budget.
+"""
+import time
+import random
+import threading
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from .config_loader import get_github_tokens, get_settings, on_reload
+from .github_cache import github_cache, CachedResponse
+
+API_ROOT = "https://api.github.com"
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_MAX_WAIT = 60
+DEFAULT_POOL_SIZE = 16
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# Requests per minute per token; GitHub allows 30 searches (10 without a
+# token) and far more core requests, minus headroom for secondary limits
+DEFAULT_PER_MINUTE = {
+    ("search", True): 30,
+    ("search", False): 10,
+    ("core", True): 600,
+    ("core", False): 60,
+}
+
+
+class RateLimitExceeded(Exception):
+    """No token can send a request within the allowed wait"""
+
+
+class TokenBudget:
+    """Rate-limit state of one token for one resource (search or core)"""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.remaining = None  # unknown until the first response
+        self.reset_at = 0.0
+        self.cooldown_until = 0.0
+        self.sent = deque()
+
+    def wait_time(self, now):
+        """Seconds until this token may send again (0 = now)"""
+        while self.sent and now - self.sent[0] >= 60:
+            self.sent.popleft()
+        waits = [self.cooldown_until - now]
+        if self.remaining is not None and self.remaining <= 0:
+            waits.append(self.reset_at - now)
+        if len(self.sent) >= self.per_minute:
+            waits.append(self.sent[0] + 60 - now)
+        return max(0.0, *waits)
+
+    def headroom(self):
+        window_left = self.per_minute - len(self.sent)
+        return window_left if self.remaining is None else min(window_left, self.remaining)
+
+
+class _Transport:
+    """Session-like adapter so the response cache sends through the client"""
+
+    def __init__(self, client, resource):
+        self.client = client
+        self.resource = resource
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.client._send(url, params, headers or {}, timeout, self.resource)
+
+
+class GitHubClient:
+    def __init__(self, tokens=None, max_retries=None, max_wait=None):
+        self.tokens = list(tokens) if tokens is not None else get_github_tokens()
+        self.max_retries = max_retries if max_retries is not None else get_settings().get_int('GITHUB_MAX_RETRIES', DEFAULT_MAX_RETRIES)
+        self.max_wait = max_wait if max_wait is not None else get_settings().get_float('GITHUB_MAX_WAIT', DEFAULT_MAX_WAIT)
+        self._budgets = {}
+        self._invalid = set()
+        self._lock = threading.Condition()
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "waited_seconds": 0.0, "rate_limited": 0}
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                pool_size = get_settings().get_int('GITHUB_POOL_SIZE', DEFAULT_POOL_SIZE)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _budget(self, token, resource):
+        key = (token, resource)
+        if key not in self._budgets:
+            per_minute = get_settings().get_int(
+                f"GITHUB_{resource.upper()}_PER_MINUTE",
+                DEFAULT_PER_MINUTE.get((resource, token is not None), 60)
+            )
+            self._budgets[key] = TokenBudget(per_minute)
+        return self._budgets[key]
+
+    def _candidates(self):
+        valid = [t for t in self.tokens if t not in self._invalid]
+        # Without a working token, fall back to unauthenticated requests
+        return valid or [None]
+
+    def _acquire(self, resource):
+        """Block until some token has budget; return it and record the send"""
+        deadline = time.time() + self.max_wait
+        with self._lock:
+            while True:
+                now = time.time()
+                best, best_wait = None, None
+                for token in self._candidates():
+                    budget = self._budget(token, resource)
+                    wait = budget.wait_time(now)
+                    if best is None or (wait, -budget.headroom()) < (best_wait, -self._budget(best, resource).headroom()):
+                        best, best_wait = token, wait
+                if best_wait == 0:
+                    budget = self._budget(best, resource)
+                    budget.sent.append(now)
+                    if budget.remaining is not None:
+                        budget.remaining -= 1
+                    return best
+                if now + best_wait > deadline:
+                    self._stats["rate_limited"] += 1
+                    raise RateLimitExceeded(f"GitHub {resource} budget exhausted for {best_wait:.0f}s")
+                self._stats["throttled"] += 1
+                self._stats["waited_seconds"] += best_wait
+                self._lock.wait(timeout=best_wait)
+
+    def _update(self, token, resource, response):
+        headers = response.headers
+        with self._lock:
+            budget = self._budget(token, resource)
+            try:
+                if "X-RateLimit-Remaining" in headers:
+                    budget.remaining = int(headers["X-RateLimit-Remaining"])
+                if "X-RateLimit-Reset" in headers:
+                    budget.reset_at = float(headers["X-RateLimit-Reset"])
+            except ValueError:
+                pass
+
+            retry_after = None
+            if self._is_throttled(response, budget):
+                if headers.get("Retry-After"):
+                    try:
+                        retry_after = float(headers["Retry-After"])
+                    except ValueError:
+                        retry_after = None
+                if retry_after is None and budget.remaining == 0 and budget.reset_at:
+                    retry_after = max(0.0, budget.reset_at - time.time())
+                if retry_after is None:
+                    # Secondary limit without a hint: back off for a minute
+                    retry_after = 60.0
+                budget.cooldown_until = max(budget.cooldown_until, time.time() + retry_after)
+            elif response.status_code == 401 and token is not None:
+                print(f"Warning: GitHub token ...{token[-4:]} is invalid, removing it from the pool")
+                self._invalid.add(token)
+            self._lock.notify_all()
+        return retry_after
+
+    @staticmethod
+    def _is_throttled(response, budget):
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        if response.headers.get("Retry-After") or budget.remaining == 0:
+            return True
+        try:
+            return "rate limit" in response.text.lower()
+        except Exception:
+            return False
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.5)
+        if retry_after is not None and retry_after <= self.max_wait:
+            # Another token may be free right away; _acquire waits for the rest
+            delay = min(delay, retry_after) if len(self._candidates()) > 1 else retry_after
+        if delay > 0:
+            with self._lock:
+                self._stats["waited_seconds"] += delay
+            time.sleep(delay)
+
+    def _send(self, url, params, headers, timeout, resource):
+        """One logical request: pick a token, send, retry on throttling and server errors"""
+        response = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                token = self._acquire(resource)
+            except RateLimitExceeded as e:
+                print(f"Warning: {e}")
+                return response if response is not None else CachedResponse(403, {"message": str(e)})
+
+            request_headers = {k: v for k, v in headers.items() if k != "Authorization"}
+            if token is not None and "Authorization" in headers:
+                request_headers["Authorization"] = f"Bearer {token}"
+
+            with self._lock:
+                self._stats["requests"] += 1
+                if attempt:
+                    self._stats["retries"] += 1
+            try:
+                response = self.session.get(url, params=params, headers=request_headers, timeout=timeout)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"Warning: GitHub request failed ({e}), retrying...")
+                self._backoff(attempt)
+                continue
+
+            retry_after = self._update(token, resource, response)
+            if retry_after is not None:
+                if attempt < self.max_retries:
+                    self._backoff(attempt, retry_after)
+                    continue
+                with self._lock:
+                    self._stats["rate_limited"] += 1
+            elif response.status_code == 401 and token is not None:
+                continue  # retried with another token, or without one
+            elif response.status_code >= 500 and attempt < self.max_retries:
+                self._backoff(attempt)
+                continue
+            return response
+        return response
+
+    def get(self, url, params=None, resource="core", timeout=DEFAULT_TIMEOUT, use_cache=True):
+        """
+        GET a GitHub API URL (absolute, or a path under API_ROOT).
+
+        resource is the rate-limit bucket: "search" for /search endpoints,
+        "core" for everything else.
+        """
+        if not url.startswith("http"):
+            url = API_ROOT + url
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.tokens:
+            # Placeholder; _send fills in the token it picks. Also keeps
+            # authenticated and anonymous responses apart in the cache
+            headers["Authorization"] = "pool"
+
+        if use_cache:
+            return github_cache.get(_Transport(self, resource), url, params=params, headers=headers, timeout=timeout)
+        return self._send(url, params, headers, timeout, resource)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            stats = dict(self._stats)
+            stats["waited_seconds"] = round(stats["waited_seconds"], 2)
+            stats["tokens"] = len(self.tokens)
+            stats["invalid_tokens"] = len(self._invalid)
+            stats["budgets"] = [
+                {
+                    "token": f"...{token[-4:]}" if token else "anonymous",
+                    "resource": resource,
+                    "remaining": budget.remaining,
+                    "reset_in": max(0, round(budget.reset_at - now)) if budget.reset_at else None,
+                    "sent_last_minute": len(budget.sent)
+                }
+                for (token, resource), budget in self._budgets.items()
+            ]
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_github_client():
+    """The process-wide client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
+
+@on_reload
+def _reload_tokens(settings):
+    # Keep budgets of tokens that are still configured
+    with _client_lock:
+        if _client is not None:
+            with _client._lock:
+                _client.tokens = settings.github_tokens
+                _client._invalid &= set(_client.tokens)
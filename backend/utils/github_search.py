@@ -1,9 +1,14 @@
-import requests
-import os
 from itertools import islice
-from .config_loader import get_github_token
+from concurrent.futures import ThreadPoolExecutor
+from .github_client import get_github_client
+from .config_loader import get_settings
 
 GITHUB_API_URL = "https://api.github.com/search/repositories"
+DEFAULT_SEARCH_CONCURRENCY = 6
+SEARCH_TIMEOUT = 30
+
+# Returned by run_search_query when GitHub keeps answering 403/429
+RATE_LIMITED = object()
 
 def chunk_keywords(keywords, chunk_size=5):
     """
@@ -16,40 +21,21 @@ def chunk_keywords(keywords, chunk_size=5):
             break
         yield chunk
 
-def search_github_repos(
-    keywords,
-    topic=None,
-    language=None,
-    exclude_user=None,
-    min_stars=0,
-    per_page=30,  # Increased from 10 to 30
-    created_before=None,
-    max_results=100  # Maximum total results to fetch
-):
-    """
-    Search GitHub repositories with date filtering support.
-    
-    Args:
-        created_before: ISO date string (YYYY-MM-DD) to exclude repos created after this date
-        max_results: Maximum number of total results to return
-    """
-    all_results = []
-    seen_repos = set()
+def clean_topic_for_search(topic_str):
+    """Split a topic into searchable terms"""
+    if not topic_str or topic_str.lower() == "unknown":
+        return []
+    # Split on common separators and clean up
+    parts = topic_str.replace("/", " ").replace("-", " ").replace("_", " ").split()
+    # Remove common words that don't help with search
+    stop_words = {"a", "an", "the", "and", "or", "but", "for", "of", "to", "in", "on", "at", "by"}
+    cleaned = [part.strip() for part in parts if part.strip() and part.lower() not in stop_words]
+    return cleaned
 
-    # Try multiple search strategies to maximize results
+def build_search_strategies(keywords, topic=None):
+    """Return the ordered list of search strategies for a topic and keywords"""
     search_strategies = []
-    
-    # Helper function to clean topic for search
-    def clean_topic_for_search(topic_str):
-        if not topic_str or topic_str.lower() == "unknown":
-            return []
-        # Split on common separators and clean up
-        parts = topic_str.replace("/", " ").replace("-", " ").replace("_", " ").split()
-        # Remove common words that don't help with search
-        stop_words = {"a", "an", "the", "and", "or", "but", "for", "of", "to", "in", "on", "at", "by"}
-        cleaned = [part.strip() for part in parts if part.strip() and part.lower() not in stop_words]
-        return cleaned
-    
+
     # Clean topic into searchable terms
     topic_terms = clean_topic_for_search(topic) if topic else []
     
@@ -95,106 +81,209 @@ def search_github_repos(
             "name": "fallback"
         })
 
+    # Try different star thresholds
     for strategy in search_strategies:
+        strategy["star_thresholds"] = [0, 1, 5] if strategy["name"] != "fallback" else [0]
+    return search_strategies
+
+def build_query(query_terms, language=None, exclude_user=None, min_star_threshold=0, created_before=None):
+    # Create proper search query - use quotes for multi-word terms
+    formatted_terms = []
+    for term in query_terms:
+        if " " in term:
+            formatted_terms.append(f'"{term}"')  # Quote multi-word terms
+        else:
+            formatted_terms.append(term)
+    
+    query = " ".join(formatted_terms)
+
+    if exclude_user:
+        query += f" -user:{exclude_user}"
+
+    if language:
+        query += f" language:{language}"
+
+    if min_star_threshold > 0:
+        query += f" stars:>={min_star_threshold}"
+
+    if created_before:
+        query += f" created:<{created_before}"
+
+    # truncate if still too long
+    return query[:250]
+
+
+def get_search_concurrency():
+    return max(1, get_settings().get_int('GITHUB_SEARCH_CONCURRENCY', DEFAULT_SEARCH_CONCURRENCY))
+
+def run_search_query(query, per_page):
+    """
+    Run one search request. Returns the result items, or RATE_LIMITED when
+    GitHub still refuses the request after the client's retries.
+    """
+    params = {
+        "q": query,
+        "per_page": min(per_page, 30),  # GitHub max is 100, but 30 is reasonable
+        "sort": "stars",
+        "order": "desc"
+    }
+
+    response = get_github_client().get(GITHUB_API_URL, params=params, resource="search", timeout=SEARCH_TIMEOUT)
+    
+    if response.status_code in (403, 429):
+        return RATE_LIMITED
+        
+    response.raise_for_status()
+    return response.json().get("items", [])
+
+# A strategy that finds this many new repos at one threshold skips the lower ones
+ENOUGH_NEW_RESULTS = 10
+
+def merge_query_results(items, all_results, seen_repos, max_results):
+    """Append the repos of one query not seen yet; returns how many were new"""
+    found_in_this_search = 0
+    for item in items:
         if len(all_results) >= max_results:
             break
-            
-        print(f"🔍 Trying search strategy: {strategy['name']}")
-        
-        # Try different star thresholds
-        star_thresholds = [0, 1, 5] if strategy['name'] != 'fallback' else [0]
-        
-        for min_star_threshold in star_thresholds:
-            if len(all_results) >= max_results:
-                break
-            # Compose a safe query
-            query_terms = strategy["query_terms"].copy()
-            
-            # Create proper search query - use quotes for multi-word terms
-            formatted_terms = []
-            for term in query_terms:
-                if " " in term:
-                    formatted_terms.append(f'"{term}"')  # Quote multi-word terms
-                else:
-                    formatted_terms.append(term)
-            
-            query = " ".join(formatted_terms)
-
-            if exclude_user:
-                query += f" -user:{exclude_user}"
-
-            if language:
-                query += f" language:{language}"
-
-            if min_star_threshold > 0:
-                query += f" stars:>={min_star_threshold}"
-
-            if created_before:
-                query += f" created:<{created_before}"
-
-            # truncate if still too long
-            query = query[:250]
-
-            params = {
-                "q": query,
-                "per_page": min(per_page, 30),  # GitHub max is 100, but 30 is reasonable
-                "sort": "stars",
-                "order": "desc"
-            }
-
-            headers = {
-                "Accept": "application/vnd.github+json",
-                "Authorization": f"Bearer {get_github_token()}"
-            }
+        repo_full_name = item["full_name"]
+        if repo_full_name in seen_repos:
+            continue
 
+        seen_repos.add(repo_full_name)
+        all_results.append({
+            "full_name": repo_full_name,
+            "html_url": item["html_url"],
+            "stars": item["stargazers_count"],
+            "description": item["description"],
+            "owner": item["owner"]["login"],
+            "language": item["language"]
+        })
+        found_in_this_search += 1
+    return found_in_this_search
+
+def search_language(executor, strategies, language, exclude_user, per_page, created_before, max_results):
+    """
+    Search one language in waves: wave N runs the N-th star threshold of
+    every strategy that is still under ENOUGH_NEW_RESULTS, concurrently.
+    Results merge in strategy order after each wave, so a strategy only
+    reaches its next threshold when the previous one came up short.
+
+    Returns:
+        tuple: (results, rate_limited)
+    """
+    all_results = []
+    seen_repos = set()
+    active = list(strategies)
+    wave = 0
+
+    while active and len(all_results) < max_results:
+        submitted = []
+        for strategy in active:
+            min_star_threshold = strategy["star_thresholds"][wave]
+            query = build_query(strategy["query_terms"], language, exclude_user,
+                                min_star_threshold, created_before)
+            submitted.append((strategy, min_star_threshold, executor.submit(run_search_query, query, per_page)))
+
+        rate_limited = False
+        still_short = []
+        for strategy, min_star_threshold, future in submitted:
             try:
-                response = requests.get(GITHUB_API_URL, params=params, headers=headers)
-                
-                # If authentication fails, try without token (with rate limits)
-                if response.status_code == 401:
-                    print(f"Warning: GitHub token invalid, trying without authentication (limited rate)...")
-                    headers = {"Accept": "application/vnd.github+json"}
-                    response = requests.get(GITHUB_API_URL, params=params, headers=headers)
-                
-                if response.status_code == 403:
-                    print(f"Warning: Rate limit reached. Continuing with existing results...")
-                    break
-                    
-                response.raise_for_status()
-                results = response.json()
-                
-                found_in_this_search = 0
-                for item in results.get("items", []):
-                    repo_full_name = item["full_name"]
-                    if repo_full_name in seen_repos:
-                        continue
-
-                    seen_repos.add(repo_full_name)
-                    all_results.append({
-                        "full_name": repo_full_name,
-                        "html_url": item["html_url"],
-                        "stars": item["stargazers_count"],
-                        "description": item["description"],
-                        "owner": item["owner"]["login"],
-                        "language": item["language"]
-                    })
-                    found_in_this_search += 1
-                    
-                    if len(all_results) >= max_results:
-                        break
-                
-                print(f"  ✅ Found {found_in_this_search} new repos with {min_star_threshold}+ stars")
-                
-                # If we found good results with higher stars, no need to try lower thresholds
-                if found_in_this_search >= 10:
-                    break
-                    
+                items = future.result()
             except Exception as e:
-                print(f"  ❌ Search failed: {e}")
+                print(f"  ❌ Search failed ({strategy['name']}): {e}")
                 continue
+            if items is RATE_LIMITED:
+                rate_limited = True
+                continue
+            if len(all_results) >= max_results:
+                continue
+
+            found_in_this_search = merge_query_results(items, all_results, seen_repos, max_results)
+            print(f"  ✅ {strategy['name']}: {found_in_this_search} new repos with {min_star_threshold}+ stars")
+
+            # If we found good results at this threshold, no need to try the others
+            if found_in_this_search < ENOUGH_NEW_RESULTS and wave + 1 < len(strategy["star_thresholds"]):
+                still_short.append(strategy)
+
+        if rate_limited:
+            print(f"Warning: Rate limit reached. Continuing with existing results...")
+            return all_results, True
+        active = still_short
+        wave += 1
+
+    return all_results, False
+
+def search_github_repos_by_language(
+    keywords,
+    languages,
+    topic=None,
+    exclude_user=None,
+    per_page=30,
+    created_before=None,
+    max_results=100,
+    max_total=None
+):
+    """
+    Search each language in turn over one pooled session, running the
+    strategies of a language concurrently (see search_language).
+
+    Args:
+        max_results: Maximum number of repos per language
+        max_total: Don't start another language once this many unique
+            repos have been found across languages
+
+    Returns:
+        dict: language -> list of repos, as search_github_repos would
+        return; languages never searched are missing
+    """
+    strategies = build_search_strategies(keywords, topic)
+    results = {}
+    found = set()
+
+    with ThreadPoolExecutor(max_workers=get_search_concurrency(), thread_name_prefix="github-search") as executor:
+        for language in languages:
+            if max_total is not None and len(found) >= max_total:
+                print(f"🛑 Found {len(found)} repositories, skipping remaining languages")
+                break
+
+            print(f"🔍 Searching with language: {language}")
+            results[language], rate_limited = search_language(
+                executor, strategies, language, exclude_user, per_page, created_before, max_results
+            )
+            found.update(repo["html_url"] for repo in results[language])
+            print(f"🎯 Total unique repositories found for {language}: {len(results[language])}")
+
+            if rate_limited:
+                # Further queries would only be refused as well
+                break
+    return results
 
-    print(f"🎯 Total unique repositories found: {len(all_results)}")
-    return all_results
+def search_github_repos(
+    keywords,
+    topic=None,
+    language=None,
+    exclude_user=None,
+    min_stars=0,
+    per_page=30,  # Increased from 10 to 30
+    created_before=None,
+    max_results=100  # Maximum total results to fetch
+):
+    """
+    Search GitHub repositories with date filtering support.
+    
+    Args:
+        created_before: ISO date string (YYYY-MM-DD) to exclude repos created after this date
+        max_results: Maximum number of total results to return
+    """
+    return search_github_repos_by_language(
+        keywords,
+        [language],
+        topic=topic,
+        exclude_user=exclude_user,
+        per_page=per_page,
+        created_before=created_before,
+        max_results=max_results
+    ).get(language, [])
 
 if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,119 @@
+"""
+Background job queue for plagiarism analyses.
+
+Jobs are stored in the plagiarism_results collection, so queued work
+survives a restart. Every process runs a small pool of worker threads
+that atomically claim queued jobs and run the analysis pipeline.
+"""
+import os
+import socket
+import threading
+import traceback
+from .analysis_pipeline import run_plagiarism_analysis, NoCandidatesError
+from .analysis_coalescer import analysis_coalescer, request_key, result_key, get_dedup_window
+from .config_loader import get_settings
+
+DEFAULT_WORKERS = 2
+DEFAULT_POLL_INTERVAL = 5       # seconds between polls when the queue is idle
+DEFAULT_STALE_AFTER = 15 * 60   # seconds without progress before a job is requeued
+
+
+class JobQueue:
+    def __init__(self, result_model, workers=None, poll_interval=None, stale_after=None):
+        self.result_model = result_model
+        self.workers = workers or get_settings().get_int('ANALYSIS_WORKERS', DEFAULT_WORKERS)
+        self.poll_interval = poll_interval or get_settings().get_float('ANALYSIS_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+        self.stale_after = stale_after or get_settings().get_int('ANALYSIS_STALE_AFTER', DEFAULT_STALE_AFTER)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    args=(f"{socket.gethostname()}:{os.getpid()}:{i}", i == 0),
+                    name=f"analysis-worker-{i}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            print(f"🧵 Started {self.workers} analysis workers")
+
+    def stop(self, timeout=None):
+        """Ask workers to exit after their current job"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, user_id, repo_url, params=None):
+        """Queue an analysis and return its job id"""
+        # Identical requests already queued or running absorb this one
+        job_id = self.result_model.create_job(user_id, repo_url, params, request_key(repo_url, params))
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def _worker_loop(self, worker_id, recover=False):
+        if recover:
+            # Done by a worker rather than in start() so startup never waits on the database
+            requeued = self.result_model.requeue_stale_jobs(self.stale_after)
+            if requeued:
+                print(f"♻️  Requeued {requeued} interrupted analysis jobs")
+        while not self._stop.is_set():
+            try:
+                job = self.result_model.claim_next_job(worker_id)
+            except Exception as e:
+                print(f"Error claiming analysis job: {e}")
+                job = None
+
+            if not job:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                self.result_model.requeue_stale_jobs(self.stale_after)
+                continue
+
+            self._run_job(job)
+
+    def _run_job(self, job):
+        job_id = job['_id']
+        params = job.get('params') or {}
+        print(f"🚀 Running analysis job {job_id} for {job['repo_url']}")
+
+        def progress(step, message, **details):
+            self.result_model.update_job_progress(job_id, dict(details, step=step, message=message))
+
+        try:
+            # Serve a recent identical analysis of the same commit if there is one
+            dedup_key = result_key(job['repo_url'], params)
+            source = self.result_model.find_recent_result(dedup_key, get_dedup_window())
+            if source:
+                analysis_coalescer.count("recent_hits")
+                self.result_model.complete_job(job_id, source=source)
+                print(f"♻️  Analysis job {job_id} served from recent result {source['_id']}")
+                return
+
+            analysis_data = run_plagiarism_analysis(
+                job['repo_url'],
+                manual_language=params.get('language'),
+                progress=progress,
+                bypass_cache=params.get('bypass_cache', False),
+                topic_extractor=params.get('topic_extractor')
+            )
+            analysis_data['result_id'] = job_id
+            self.result_model.complete_job(job_id, analysis_data, dedup_key=dedup_key)
+            print(f"✅ Analysis job {job_id} completed")
+        except NoCandidatesError as e:
+            self.result_model.fail_job(job_id, str(e), e.payload)
+        except Exception as e:
+            print(f"❌ Analysis job {job_id} failed: {e}")
+            traceback.print_exc()
+            self.result_model.fail_job(job_id, "Internal server error during analysis", str(e))
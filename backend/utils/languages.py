@@ -0,0 +1,48 @@
+"""
+Source file extensions known to the analyzer, shared by language
+detection and sparse cloning.
+"""
+
+# File extension to language mapping (including Solidity)
+LANGUAGE_MAP = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.cs': 'C#',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.php': 'PHP',
+    '.rb': 'Ruby',
+    '.swift': 'Swift',
+    '.kt': 'Kotlin',
+    '.scala': 'Scala',
+    '.r': 'R',
+    '.m': 'Objective-C',
+    '.dart': 'Dart',
+    '.lua': 'Lua',
+    '.pl': 'Perl',
+    '.sh': 'Shell',
+    '.sql': 'SQL',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.jsx': 'JavaScript',
+    '.tsx': 'TypeScript',
+    '.vue': 'Vue',
+    '.svelte': 'Svelte',
+    '.sol': 'Solidity',  # Added Solidity support
+    '.cairo': 'Cairo',   # StarkNet
+    '.move': 'Move',     # Aptos/Sui
+    '.vy': 'Vyper',      # Ethereum Vyper
+    '.fe': 'Fe',         # Ethereum Fe
+    '.yul': 'Yul'        # Ethereum assembly
+}
+
+# Non-source files the analysis still reads
+PROJECT_FILES = [
+    'README*', 'readme*', 'package.json', 'requirements.txt', 'pyproject.toml',
+    'setup.py', 'Cargo.toml', 'go.mod', 'pom.xml', 'build.gradle', 'composer.json',
+    'Gemfile'
+]
@@ -0,0 +1,94 @@
+"""
+MinHash signatures for a cheap suspect/candidate similarity estimate.
+
+A repository is summarized as the set of its relative file paths plus its
+winnowed code shingles (see utils/fingerprint.py). MinHash compresses that
+set into a fixed-size signature whose agreement rate estimates Jaccard
+similarity. compare_repositories uses the estimate as a pairwise shortcut:
+a candidate that is already cloned and fingerprinted but shares almost
+nothing with the suspect skips the per-file TF-IDF and fingerprint
+comparisons.
+"""
+import hashlib
+import numpy as np
+from .config_loader import get_settings
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_MIN_JACCARD = 0.01
+SEED = 1
+
+# Universal hashing (a * x + b) mod p over 32-bit element hashes; a < 2^31
+# keeps a * x + b inside uint64
+_PRIME = np.uint64((1 << 32) + 15)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_CHUNK = 8192
+
+
+def _permutations(num_perm, seed=SEED):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+    b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+    return a, b
+
+def _path_hash(path):
+    digest = hashlib.blake2b(path.encode("utf-8"), digest_size=4, person=b"path").digest()
+    return int.from_bytes(digest, "big")
+
+
+class MinHash:
+    """A MinHash signature; build it with from_hashes() or from_repository()"""
+
+    _perm_cache = {}
+
+    def __init__(self, signature):
+        self.signature = signature
+
+    @classmethod
+    def _perms(cls, num_perm):
+        if num_perm not in cls._perm_cache:
+            cls._perm_cache[num_perm] = _permutations(num_perm)
+        return cls._perm_cache[num_perm]
+
+    @classmethod
+    def from_hashes(cls, hashes, num_perm=DEFAULT_NUM_PERM):
+        """Signature of a set of non-negative integer element hashes"""
+        a, b = cls._perms(num_perm)
+        signature = np.full(num_perm, _MAX_HASH, dtype=np.uint64)
+        values = np.fromiter((h & 0xFFFFFFFF for h in hashes), dtype=np.uint64)
+        for start in range(0, len(values), _CHUNK):
+            chunk = values[start:start + _CHUNK]
+            permuted = (np.outer(a, chunk) + b[:, None]) % _PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return cls(signature)
+
+    @classmethod
+    def from_repository(cls, paths, file_fingerprints, num_perm=DEFAULT_NUM_PERM):
+        """
+        Signature of a repository's file-path set plus its code shingles.
+
+        Args:
+            paths: relative file paths, as returned by compare_utils.list_files
+            file_fingerprints: {relative_path: [Fingerprint, ...]}
+        """
+        elements = {_path_hash(p) for p in paths}
+        elements.update(fp.hash for fps in file_fingerprints.values() for fp in fps)
+        return cls.from_hashes(elements, num_perm)
+
+    @property
+    def is_empty(self):
+        return bool((self.signature == _MAX_HASH).all())
+
+    def jaccard(self, other):
+        """Estimated Jaccard similarity with another signature of the same size"""
+        if len(self.signature) != len(other.signature):
+            raise ValueError("MinHash signatures have different sizes")
+        if self.is_empty or other.is_empty:
+            return 0.0
+        return float(np.mean(self.signature == other.signature))
+
+
+def prefilter_enabled():
+    return get_settings().get_bool('MINHASH_PREFILTER', True)
+
+def get_min_jaccard():
+    return get_settings().get_float('MINHASH_MIN_JACCARD', DEFAULT_MIN_JACCARD)
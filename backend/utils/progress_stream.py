@@ -0,0 +1,61 @@
+"""
+Server-Sent Events framing for analysis progress.
+
+The analysis runs on its own thread and reports through
+ProgressStream.progress (the pipeline's ``progress(step, message, **details)``
+callback); events() is the response generator that drains those reports as
+SSE messages, sending a comment line as keepalive while nothing happens.
+"""
+import json
+import time
+import queue
+from .config_loader import get_settings
+
+DEFAULT_KEEPALIVE = 15  # seconds between keepalives on an idle stream
+
+_DONE = object()
+
+
+def format_event(event, data, event_id=None):
+    """One SSE message; data is sent as a single line of JSON"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class ProgressStream:
+    def __init__(self, keepalive=None):
+        self.keepalive = keepalive or get_settings().get_float('ANALYSIS_STREAM_KEEPALIVE', DEFAULT_KEEPALIVE)
+        self.started = time.monotonic()
+        self._queue = queue.Queue()
+
+    def progress(self, step, message, **details):
+        """Pipeline progress callback; safe to call from any thread"""
+        data = dict(details, step=step, message=message,
+                    elapsed=round(time.monotonic() - self.started, 2))
+        self._queue.put((step, data))
+
+    def finish(self, event, data):
+        """Send the final event and end the stream"""
+        self._queue.put((event, data))
+        self._queue.put(_DONE)
+
+    def events(self):
+        """Generator of SSE messages until finish() has been called"""
+        event_id = 0
+        # Padding comment so buffering proxies start forwarding right away
+        yield ": stream opened\n\n"
+        while True:
+            try:
+                item = self._queue.get(timeout=self.keepalive)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if item is _DONE:
+                return
+            event_id += 1
+            event, data = item
+            yield format_event(event, data, event_id)
@@ -0,0 +1,134 @@
+"""
+Token-budgeted project text for the topic/keyword prompt.
+
+Files are taken in priority order: README and manifests, then entry
+points, then the remaining small source files round-robin across
+directories so no single folder dominates. Near-identical files are
+skipped and collection stops once the token budget is spent.
+"""
+import os
+import re
+from collections import defaultdict, deque
+from .repo_snapshot import get_snapshot
+from .config_loader import get_settings
+
+DEFAULT_TOKEN_BUDGET = 8000
+CHARS_PER_TOKEN = 4  # rough estimate for code and English prose
+MAX_SOURCE_BYTES = 5000
+DUPLICATE_JACCARD = 0.9
+MIN_USEFUL_TOKENS = 64
+
+README_NAMES = ['README.md', 'README.rst', 'README.txt', 'README']
+MANIFEST_NAMES = ['package.json', 'requirements.txt', 'pyproject.toml', 'setup.py', 'Cargo.toml',
+                  'go.mod', 'pom.xml', 'build.gradle', 'composer.json', 'Gemfile', 'foundry.toml',
+                  'hardhat.config.js', 'hardhat.config.ts', 'Scarb.toml', 'Move.toml']
+ENTRY_POINT_STEMS = {'main', 'index', 'app', 'server', '__main__', 'cli', 'manage', 'App'}
+SOURCE_EXTENSIONS = {".js", ".ts", ".py", ".html", ".jsx", ".tsx", ".sol", ".vy", ".cairo", ".move"}
+SKIP_DIRS = {'node_modules', '__pycache__', '.venv', 'venv', 'artifacts', 'cache', 'dist', 'build',
+             'coverage', 'typechain-types'}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def get_token_budget():
+    return get_settings().get_int('PROJECT_TEXT_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET)
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _line_set(text):
+    return {_WHITESPACE_RE.sub(" ", line).strip() for line in text.splitlines() if line.strip()}
+
+
+class ProjectTextCollector:
+    """Accumulates file texts into a list buffer until the token budget is spent"""
+
+    def __init__(self, token_budget):
+        self.remaining = token_budget
+        self.parts = []
+        self.files = []
+        self._seen_lines = []
+
+    @property
+    def exhausted(self):
+        return self.remaining < MIN_USEFUL_TOKENS
+
+    def _is_duplicate(self, lines):
+        for seen in self._seen_lines:
+            union = len(lines | seen)
+            if union and len(lines & seen) / union >= DUPLICATE_JACCARD:
+                return True
+        return False
+
+    def add(self, path, text, truncate=False):
+        """Add one file; returns False if it was skipped"""
+        if not text or not text.strip() or self.exhausted:
+            return False
+        tokens = estimate_tokens(text)
+        if tokens > self.remaining:
+            if not truncate:
+                return False
+            text = text[:self.remaining * CHARS_PER_TOKEN]
+            tokens = estimate_tokens(text)
+        lines = _line_set(text)
+        if self._is_duplicate(lines):
+            return False
+        self.parts.append(text)
+        self.parts.append("\n")
+        self.files.append(path)
+        self._seen_lines.append(lines)
+        self.remaining -= tokens
+        return True
+
+    def text(self):
+        return "".join(self.parts)
+
+
+def prioritized_entries(snapshot):
+    """Yield (FileEntry, truncate) in prompt priority order"""
+    project_files = README_NAMES[:1] + MANIFEST_NAMES + README_NAMES[1:]
+    for name in project_files:
+        entry = snapshot.get(name)
+        if entry is not None:
+            yield entry, True
+
+    sources = [
+        entry for entry in snapshot.iter_files(skip_dirs=SKIP_DIRS, extensions=SOURCE_EXTENSIONS)
+        if not entry.is_link and entry.size < MAX_SOURCE_BYTES and entry.path not in project_files
+    ]
+
+    # Entry points, shallowest first
+    entry_points = [e for e in sources if os.path.splitext(e.name)[0] in ENTRY_POINT_STEMS]
+    entry_points.sort(key=lambda e: (len(e.dirs), e.path))
+    for entry in entry_points:
+        yield entry, False
+
+    # Everything else, one file per directory per round; shallow directories
+    # and bigger (more substantial) files first
+    chosen = {e.path for e in entry_points}
+    by_dir = defaultdict(list)
+    for entry in sources:
+        if entry.path not in chosen:
+            by_dir[entry.dirs].append(entry)
+    queues = deque(
+        deque(sorted(entries, key=lambda e: (-e.size, e.path)))
+        for _, entries in sorted(by_dir.items(), key=lambda item: (len(item[0]), item[0]))
+    )
+    while queues:
+        queue = queues.popleft()
+        yield queue.popleft(), False
+        if queue:
+            queues.append(queue)
+
+
+def collect_text(project_path, token_budget=None):
+    """Return (text, included_paths) for project_path within token_budget"""
+    collector = ProjectTextCollector(token_budget or get_token_budget())
+    for entry, truncate in prioritized_entries(get_snapshot(project_path)):
+        if collector.exhausted:
+            break
+        if entry.text is None:
+            # Skip files that can't be read (binaries, permission issues, etc.)
+            continue
+        collector.add(entry.path, entry.text, truncate=truncate)
+    return collector.text(), collector.files
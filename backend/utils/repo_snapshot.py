@@ -0,0 +1,114 @@
+"""
+One-pass snapshot of a repository checkout.
+
+Language detection, project-text collection, structure comparison, code
+comparison and fingerprinting all used to walk the tree on their own. A
+RepoSnapshot scans it once with os.scandir, records each file's path,
+size, extension and language, and loads contents lazily on first access,
+so every stage shares one listing and the suspect is only read once per
+process.
+"""
+import os
+from functools import lru_cache
+from .languages import LANGUAGE_MAP
+
+
+class FileEntry:
+    __slots__ = ("path", "abs_path", "size", "ext", "language", "is_link", "dirs", "_text", "_loaded")
+
+    def __init__(self, path, abs_path, size, is_link):
+        self.path = path
+        self.abs_path = abs_path
+        self.size = size
+        self.is_link = is_link
+        _, self.ext = os.path.splitext(os.path.basename(path).lower())
+        self.language = LANGUAGE_MAP.get(self.ext)
+        self.dirs = tuple(path.split(os.sep)[:-1])
+        self._text = None
+        self._loaded = False
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def text(self):
+        """File content decoded as UTF-8, or None when it cannot be read"""
+        if not self._loaded:
+            try:
+                with open(self.abs_path, "r", encoding="utf-8") as f:
+                    self._text = f.read()
+            except (OSError, UnicodeDecodeError):
+                self._text = None
+            self._loaded = True
+        return self._text
+
+    def under(self, dir_names):
+        """True if any parent directory is in dir_names"""
+        return any(d in dir_names for d in self.dirs)
+
+    def under_hidden(self):
+        return any(d.startswith('.') for d in self.dirs)
+
+
+class RepoSnapshot:
+    """Every file of a checkout (except .git internals), keyed by relative path"""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+        self._scan(root, "")
+
+    def _scan(self, directory, prefix):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            rel_path = prefix + entry.name
+            try:
+                is_link = entry.is_symlink()
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not followed
+                    if not is_link and entry.name != ".git":
+                        self._scan(entry.path, rel_path + os.sep)
+                    continue
+                try:
+                    size = entry.stat().st_size
+                except OSError:
+                    size = 0  # broken symlink
+            except OSError:
+                continue
+            self.files[rel_path] = FileEntry(rel_path, entry.path, size, is_link)
+
+    def paths(self):
+        return set(self.files)
+
+    def get(self, path):
+        return self.files.get(path)
+
+    def iter_files(self, skip_dirs=(), skip_hidden=False, extensions=None, max_size=None):
+        """Yield FileEntry objects in path order, filtered like the old os.walk loops"""
+        for path in sorted(self.files):
+            entry = self.files[path]
+            if skip_hidden and (entry.name.startswith('.') or entry.under_hidden()):
+                continue
+            if skip_dirs and entry.under(skip_dirs):
+                continue
+            if extensions is not None and entry.ext not in extensions:
+                continue
+            if max_size is not None and entry.size > max_size:
+                continue
+            yield entry
+
+
+@lru_cache(maxsize=4)
+def _cached_snapshot(root, mtime):
+    return RepoSnapshot(root)
+
+def get_snapshot(root):
+    """
+    Shared snapshot of root. Checkouts are not modified during an analysis,
+    so the snapshot is reused until the directory itself changes.
+    """
+    return _cached_snapshot(os.path.abspath(root), os.path.getmtime(root))
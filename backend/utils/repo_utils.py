@@ -1,12 +1,125 @@
 import os
 import shutil
-from git import Repo
+import subprocess
+import time
+from .languages import LANGUAGE_MAP, PROJECT_FILES
+from .config_loader import get_settings
 
-def clone_repo(url, target_dir):
+# full     - complete history (the original behaviour)
+# shallow  - depth-1 clone of the default branch
+# blobless - full commit history, file contents fetched only for the checkout
+# sparse   - depth-1, blobless, and only source/manifest files checked out
+CLONE_MODES = ("full", "shallow", "blobless", "sparse")
+DEFAULT_CLONE_MODE = "shallow"
+
+DEFAULT_MAX_CLONE_BYTES = 200 * 1024 * 1024   # per repository, on disk
+DEFAULT_CLONE_TIMEOUT = 120                    # seconds per repository
+
+BUDGET_POLL_INTERVAL = 0.25
+
+
+class CloneBudgetExceeded(Exception):
+    """Raised when a clone goes over its byte or time budget"""
+
+
+def get_clone_mode():
+    mode = get_settings().get('CLONE_MODE', DEFAULT_CLONE_MODE)
+    return mode if mode in CLONE_MODES else DEFAULT_CLONE_MODE
+
+def get_clone_budget():
+    """Return (max_bytes, timeout); a value of 0 disables that limit"""
+    max_bytes = get_settings().get_int('CLONE_MAX_BYTES', DEFAULT_MAX_CLONE_BYTES)
+    timeout = get_settings().get_float('CLONE_TIMEOUT', DEFAULT_CLONE_TIMEOUT)
+    return max_bytes or None, timeout or None
+
+def sparse_patterns():
+    """Non-cone sparse-checkout patterns: known source extensions plus manifests"""
+    return sorted(f"*{ext}" for ext in LANGUAGE_MAP) + PROJECT_FILES
+
+def clone_args(mode):
+    """Extra `git clone` arguments for a clone mode"""
+    if mode == "full":
+        return []
+    if mode == "shallow":
+        return ["--depth", "1", "--no-tags"]
+    if mode == "blobless":
+        return ["--filter=blob:none", "--no-tags"]
+    if mode == "sparse":
+        return ["--depth", "1", "--filter=blob:none", "--no-checkout", "--no-tags"]
+    raise ValueError(f"Unknown clone mode: {mode}")
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+def _run_git(args, watch_dir=None, max_bytes=None, deadline=None):
+    """Run a git command, killing it if watch_dir outgrows max_bytes or the deadline passes"""
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    process = subprocess.Popen(
+        ["git", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env
+    )
+    try:
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=BUDGET_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if deadline and time.monotonic() > deadline:
+                raise CloneBudgetExceeded(f"git {args[0]} exceeded its time budget")
+            if max_bytes and watch_dir and directory_size(watch_dir) > max_bytes:
+                raise CloneBudgetExceeded(f"git {args[0]} exceeded its size budget of {max_bytes} bytes")
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+
+    if process.returncode != 0:
+        message = stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"git {args[0]} failed: {message}")
+    # Fast clones can finish between polls
+    if max_bytes and watch_dir and directory_size(watch_dir) > max_bytes:
+        raise CloneBudgetExceeded(f"git {args[0]} exceeded its size budget of {max_bytes} bytes")
+
+def clone_repo(url, target_dir, mode=None, max_bytes=None, timeout=None):
     """
-    Clones a repo from url into target_dir
+    Clones a repo from url into target_dir.
+
+    Args:
+        mode: One of CLONE_MODES; defaults to the CLONE_MODE setting
+        max_bytes: Abort once the checkout grows past this many bytes
+        timeout: Abort once the clone runs longer than this many seconds
     """
+    mode = mode or get_clone_mode()
+    default_bytes, default_timeout = get_clone_budget()
+    max_bytes = max_bytes if max_bytes is not None else default_bytes
+    timeout = timeout if timeout is not None else default_timeout
+    deadline = time.monotonic() + timeout if timeout else None
+
     if os.path.exists(target_dir):
         shutil.rmtree(target_dir)
-    Repo.clone_from(url, target_dir)
+
+    try:
+        _run_git(["clone", *clone_args(mode), "--", url, target_dir],
+                 watch_dir=target_dir, max_bytes=max_bytes, deadline=deadline)
+
+        if mode == "sparse":
+            _run_git(["-C", target_dir, "sparse-checkout", "set", "--no-cone", *sparse_patterns()],
+                     deadline=deadline)
+            # Blobs for the selected paths are fetched lazily by the checkout
+            _run_git(["-C", target_dir, "checkout"],
+                     watch_dir=target_dir, max_bytes=max_bytes, deadline=deadline)
+    except Exception:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        raise
+
     return target_dir
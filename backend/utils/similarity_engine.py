@@ -0,0 +1,202 @@
+"""
+Batch TF-IDF similarity engine.
+
+Instead of fitting a TfidfVectorizer on every pair of documents, all
+documents of a comparison are tokenized once, weighted with IDF computed
+over the whole batch (optionally blended with a persisted global
+document-frequency table) and compared with a single sparse matrix
+multiply.
+
+Build the global IDF table from the clone cache with:
+
+    python -m utils.similarity_engine build-idf [output_path]
+"""
+import os
+import sys
+import gzip
+import json
+import threading
+import numpy as np
+from collections import Counter
+from .config_loader import get_settings
+# scikit-learn is imported where it is used; it dominates startup time
+
+DEFAULT_IDF_PATH = "/tmp/plaghunt_global_idf.json.gz"
+DEFAULT_IDF_MAX_TERMS = 200000
+DEFAULT_IDF_MAX_FILE_BYTES = 200 * 1024
+
+_global_idf = None
+_global_idf_mtime = None
+_global_idf_lock = threading.Lock()
+
+
+class GlobalIdf:
+    """Document frequencies collected over previously analyzed repositories"""
+
+    def __init__(self, n_docs=0, df=None):
+        self.n_docs = n_docs
+        self.df = df or {}
+
+    def observe(self, documents, tokenizer):
+        for text in documents:
+            self.n_docs += 1
+            for term in set(tokenizer(text)):
+                self.df[term] = self.df.get(term, 0) + 1
+
+    def prune(self, max_terms):
+        """Keep only the max_terms most common terms"""
+        if len(self.df) > max_terms:
+            self.df = dict(Counter(self.df).most_common(max_terms))
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"n_docs": self.n_docs, "df": self.df}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("n_docs", 0), data.get("df", {}))
+
+
+def get_idf_path():
+    return get_settings().get('SIMILARITY_IDF_PATH', DEFAULT_IDF_PATH)
+
+def load_global_idf():
+    """Return the persisted global IDF table, reloading it when the file changes"""
+    global _global_idf, _global_idf_mtime
+    if not get_settings().get_bool('SIMILARITY_GLOBAL_IDF', False):
+        return None
+    path = get_idf_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _global_idf_lock:
+        if _global_idf is None or mtime != _global_idf_mtime:
+            try:
+                _global_idf = GlobalIdf.load(path)
+                _global_idf_mtime = mtime
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not load global IDF from {path}: {e}")
+                return None
+        return _global_idf
+
+
+class SimilarityEngine:
+    """
+    Collects documents under keys, vectorizes them in one pass and answers
+    cosine-similarity queries between keys.
+    """
+
+    def __init__(self, global_idf=None):
+        self.global_idf = global_idf
+        self._keys = {}
+        self._texts = []
+        self._matrix = None
+        self._fitted = False
+
+    def add(self, key, text):
+        if key in self._keys:
+            raise KeyError(f"Duplicate document key: {key}")
+        self._keys[key] = len(self._texts)
+        self._texts.append(text or "")
+        self._fitted = False
+        return key
+
+    def fit(self):
+        """Vectorize every document added so far"""
+        from sklearn.feature_extraction.text import CountVectorizer
+        from sklearn.preprocessing import normalize
+
+        vectorizer = CountVectorizer()
+        self._fitted = True
+        try:
+            counts = vectorizer.fit_transform(self._texts).tocsc()
+        except ValueError:
+            # No tokens in any document: every similarity is 0
+            self._matrix = None
+            return self
+
+        n_docs = counts.shape[0]
+        batch_df = np.diff(counts.indptr)  # non-zero rows per column
+
+        if self.global_idf is not None and self.global_idf.n_docs:
+            terms = vectorizer.get_feature_names_out()
+            global_df = np.fromiter((self.global_idf.df.get(t, 0) for t in terms), dtype=np.float64, count=len(terms))
+            df = batch_df + global_df
+            n_docs += self.global_idf.n_docs
+        else:
+            df = batch_df
+
+        # Same smoothing as TfidfVectorizer(smooth_idf=True)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+        self._matrix = normalize(counts.tocsr().multiply(idf).tocsr(), norm="l2", copy=False)
+        return self
+
+    def _rows(self, keys):
+        if not self._fitted:
+            self.fit()
+        return [self._keys[k] for k in keys]
+
+    def matrix(self, keys_a, keys_b):
+        """Dense |keys_a| x |keys_b| cosine-similarity matrix from one sparse multiply"""
+        rows_a, rows_b = self._rows(keys_a), self._rows(keys_b)
+        if self._matrix is None:
+            return np.zeros((len(rows_a), len(rows_b)))
+        product = self._matrix[rows_a] @ self._matrix[rows_b].T
+        return product.toarray()
+
+    def pairwise(self, keys_a, keys_b):
+        """Similarity of keys_a[i] with keys_b[i] for every i"""
+        rows_a, rows_b = self._rows(keys_a), self._rows(keys_b)
+        if self._matrix is None or not rows_a:
+            return np.zeros(len(rows_a))
+        return np.asarray(
+            self._matrix[rows_a].multiply(self._matrix[rows_b]).sum(axis=1)
+        ).ravel()
+
+    def similarity(self, key_a, key_b):
+        return float(self.pairwise([key_a], [key_b])[0])
+
+
+def build_global_idf(repo_dirs, max_terms=None, max_file_bytes=DEFAULT_IDF_MAX_FILE_BYTES):
+    """Build a GlobalIdf from the source files of the given checkouts"""
+    from .languages import LANGUAGE_MAP
+    from .repo_snapshot import RepoSnapshot
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    tokenizer = CountVectorizer().build_analyzer()
+    global_idf = GlobalIdf()
+    for repo_dir in repo_dirs:
+        documents = []
+        for entry in RepoSnapshot(repo_dir).iter_files(skip_dirs={'node_modules'}, skip_hidden=True, max_size=max_file_bytes):
+            if entry.ext not in LANGUAGE_MAP and not entry.name.lower().startswith('readme'):
+                continue
+            if entry.text is not None:
+                documents.append(entry.text)
+        global_idf.observe(documents, tokenizer)
+    global_idf.prune(max_terms or get_settings().get_int('SIMILARITY_IDF_MAX_TERMS', DEFAULT_IDF_MAX_TERMS))
+    return global_idf
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build-idf":
+        print("Usage: python -m utils.similarity_engine build-idf [output_path]")
+        sys.exit(1)
+
+    from .clone_cache import clone_cache
+
+    output_path = sys.argv[2] if len(sys.argv) > 2 else get_idf_path()
+    cache_dir = clone_cache.cache_dir
+    repo_dirs = [
+        os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+        if os.path.isdir(os.path.join(cache_dir, name)) and ".tmp-" not in name
+    ] if os.path.isdir(cache_dir) else []
+
+    global_idf = build_global_idf(repo_dirs)
+    global_idf.save(output_path)
+    print(f"✅ Global IDF built from {len(repo_dirs)} repositories "
+          f"({global_idf.n_docs} documents, {len(global_idf.df)} terms) -> {output_path}")
@@ -0,0 +1,231 @@
+"""
+Offline topic/keyword extractor.
+
+Produces the same {"topic": ..., "keywords": [...]} shape as the Gemini
+analysis without any network call, from three local signals:
+
+- dependencies declared in manifests (package.json, requirements.txt,
+  pyproject.toml, Cargo.toml, go.mod)
+- modules imported by the source files
+- the most frequent terms and phrases of the README (or of the project
+  text when there is no README)
+
+The topic is the best-scoring entry of TOPIC_RULES, falling back to the
+README title.
+"""
+import os
+import re
+import sys
+import json
+from collections import Counter
+from .repo_snapshot import get_snapshot
+
+MAX_KEYWORDS = 10
+MAX_IMPORT_FILES = 300
+
+# topic -> terms that suggest it (dependencies, imports or README words)
+TOPIC_RULES = {
+    "ecommerce app": {"cart", "checkout", "product", "products", "shop", "store", "stripe", "order", "orders", "payment"},
+    "portfolio website": {"portfolio", "resume", "projects", "about", "contact", "personal", "framer-motion"},
+    "blog": {"blog", "post", "posts", "markdown", "article", "articles", "gatsby", "mdx", "comments"},
+    "chat app": {"chat", "message", "messages", "socket.io", "socket.io-client", "websocket", "ws", "room", "rooms"},
+    "social media app": {"feed", "follow", "followers", "like", "likes", "profile", "friends"},
+    "todo app": {"todo", "todos", "task", "tasks", "reminder"},
+    "admin dashboard": {"dashboard", "admin", "chart.js", "recharts", "analytics", "charts", "metrics"},
+    "rest api": {"express", "fastapi", "flask", "django", "api", "endpoint", "endpoints", "rest", "gin"},
+    "machine learning project": {"torch", "tensorflow", "keras", "sklearn", "scikit-learn", "model", "training", "dataset", "numpy", "pandas"},
+    "defi protocol": {"swap", "liquidity", "uniswap", "erc20", "staking", "vault", "lending", "defi", "token"},
+    "nft marketplace": {"nft", "erc721", "erc1155", "mint", "marketplace", "opensea", "collection"},
+    "smart contract": {"solidity", "hardhat", "foundry", "openzeppelin", "@openzeppelin/contracts", "contract", "ethers", "web3"},
+    "cli tool": {"cli", "argparse", "click", "commander", "yargs", "command", "terminal"},
+    "game": {"game", "player", "score", "phaser", "pygame", "unity", "level"},
+    "weather app": {"weather", "forecast", "temperature", "openweathermap"},
+    "authentication service": {"auth", "jwt", "jsonwebtoken", "oauth", "login", "passport", "bcrypt"},
+}
+
+# Dependencies that say nothing about the project's domain
+GENERIC_DEPENDENCIES = {
+    "react-dom", "typescript", "eslint", "prettier", "jest", "vite", "webpack", "babel", "nodemon",
+    "dotenv", "pytest", "setuptools", "wheel", "@types/node", "@types/react", "@types/react-dom",
+    "postcss", "autoprefixer", "ts-node", "mocha", "chai", "black", "flake8", "requests", "os", "sys",
+    "re", "json", "typing", "time", "datetime", "collections", "path", "fs", "util", "react-scripts"
+} | set(getattr(sys, "stdlib_module_names", ()))
+
+_PY_IMPORT_RE = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))", re.MULTILINE)
+_JS_IMPORT_RE = re.compile(r"(?:import\s+(?:[\w{}\s,*]+\s+from\s+)?|require\()\s*['\"]([^'\"]+)['\"]")
+_SOL_IMPORT_RE = re.compile(r"^\s*import\s+[^'\"]*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_REQUIREMENT_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._\-]*)", re.MULTILINE)
+_TOML_DEP_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9_\-]*)\s*=", re.MULTILINE)
+_GO_REQUIRE_RE = re.compile(r"^\s*([\w.\-]+/[\w.\-/]+)\s+v", re.MULTILINE)
+_HEADING_RE = re.compile(r"^\s*#\s+(.+)$", re.MULTILINE)
+
+
+def _normalize_package(name):
+    name = name.strip().lower()
+    if name.startswith("@types/"):
+        return None
+    return name or None
+
+def manifest_dependencies(snapshot):
+    """Return dependency names declared in the project's manifests"""
+    deps = []
+
+    entry = snapshot.get("package.json")
+    if entry is not None and entry.text:
+        try:
+            package = json.loads(entry.text)
+            for section in ("dependencies", "devDependencies", "peerDependencies"):
+                deps.extend((package.get(section) or {}).keys())
+            deps.extend(package.get("keywords") or [])
+        except (ValueError, AttributeError):
+            pass
+
+    entry = snapshot.get("requirements.txt")
+    if entry is not None and entry.text:
+        deps.extend(m.group(1) for m in _REQUIREMENT_RE.finditer(entry.text)
+                    if not m.group(0).lstrip().startswith(("#", "-")))
+
+    for name, section in (("pyproject.toml", "dependencies"), ("Cargo.toml", "[dependencies]")):
+        entry = snapshot.get(name)
+        if entry is not None and entry.text and section in entry.text:
+            block = entry.text.split(section, 1)[1].split("\n[", 1)[0]
+            if name == "pyproject.toml":
+                deps.extend(re.findall(r"['\"]([A-Za-z0-9][A-Za-z0-9._\-]*)", block))
+            else:
+                deps.extend(m.group(1) for m in _TOML_DEP_RE.finditer(block))
+
+    entry = snapshot.get("go.mod")
+    if entry is not None and entry.text:
+        deps.extend(m.group(1).rsplit("/", 1)[-1] for m in _GO_REQUIRE_RE.finditer(entry.text))
+
+    normalized = (_normalize_package(d) for d in deps if isinstance(d, str))
+    return [d for d in normalized if d]
+
+def _local_module_names(snapshot):
+    names = set()
+    for path in snapshot.paths():
+        for part in path.split("/"):
+            names.add(os.path.splitext(part)[0].lower())
+    return names
+
+def imported_modules(snapshot):
+    """Count third-party modules imported by source files"""
+    imports = Counter()
+    files = 0
+    for entry in snapshot.iter_files(skip_dirs={"node_modules", "venv", ".venv", "dist", "build"},
+                                     skip_hidden=True,
+                                     extensions={".py", ".js", ".jsx", ".ts", ".tsx", ".sol"}):
+        if files >= MAX_IMPORT_FILES or entry.size > 200 * 1024:
+            continue
+        text = entry.text
+        if not text:
+            continue
+        files += 1
+        if entry.ext == ".py":
+            names = [m.group(1) or m.group(2) for m in _PY_IMPORT_RE.finditer(text)]
+            names = [n.split(".")[0] for n in names if not n.startswith(".")]
+        elif entry.ext == ".sol":
+            names = [m.group(1) for m in _SOL_IMPORT_RE.finditer(text)]
+            names = ["/".join(n.split("/")[:2]) if n.startswith("@") else n.split("/")[0] for n in names
+                     if not n.startswith(".")]
+        else:
+            names = [m.group(1) for m in _JS_IMPORT_RE.finditer(text) if not m.group(1).startswith(".")]
+            names = ["/".join(n.split("/")[:2]) if n.startswith("@") else n.split("/")[0] for n in names]
+        imports.update(n.lower() for n in set(names) if n)
+    # Imports of the project's own packages say nothing about its domain
+    for name in _local_module_names(snapshot) & set(imports):
+        del imports[name]
+    return imports
+
+def keyphrases(text, top_n=MAX_KEYWORDS):
+    """Highest-weighted unigrams and bigrams of text (term frequency, stop words removed)"""
+    if not text or not text.strip():
+        return []
+    from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+
+    vectorizer = CountVectorizer(
+        stop_words=list(ENGLISH_STOP_WORDS | {"use", "using", "run", "npm", "install", "yarn", "git",
+                                              "clone", "http", "https", "com", "github", "localhost",
+                                              "file", "src", "js", "md", "readme", "license", "true",
+                                              "false", "return", "const", "import", "function", "def",
+                                              "self", "class", "none", "null", "var", "let"}),
+        ngram_range=(1, 2),
+        token_pattern=r"(?u)\b[a-zA-Z][a-zA-Z\-]{2,}\b",
+        max_features=5000
+    )
+    try:
+        counts = vectorizer.fit_transform([text])
+    except ValueError:
+        return []
+    terms = vectorizer.get_feature_names_out()
+    weights = counts.toarray()[0].astype(float)
+    # Bigrams are more specific than their parts
+    for i, term in enumerate(terms):
+        if " " in term:
+            weights[i] *= 1.5
+    ranked = sorted(range(len(terms)), key=lambda i: (-weights[i], terms[i]))
+    phrases = []
+    for i in ranked:
+        term = terms[i]
+        if any(term in p or p in term for p in phrases):
+            continue
+        phrases.append(term)
+        if len(phrases) >= top_n:
+            break
+    return phrases
+
+def readme_title(snapshot):
+    for name in ("README.md", "README.rst", "README.txt", "README"):
+        entry = snapshot.get(name)
+        if entry is not None and entry.text:
+            match = _HEADING_RE.search(entry.text)
+            if match:
+                title = re.sub(r"[^\w\s\-]", " ", match.group(1)).strip()
+                title = re.sub(r"\s+", " ", title)
+                if title:
+                    return title.lower()
+    return None
+
+def extract_topic(project_path, project_text=None):
+    """
+    Return {"topic": ..., "keywords": [...]} for a checkout using only local
+    signals; the same shape as analyze_with_gemini.
+    """
+    snapshot = get_snapshot(project_path)
+    dependencies = [d for d in manifest_dependencies(snapshot) if d not in GENERIC_DEPENDENCIES]
+    imports = imported_modules(snapshot)
+    readme = ""
+    for name in ("README.md", "README.rst", "README.txt", "README"):
+        entry = snapshot.get(name)
+        if entry is not None and entry.text:
+            readme = entry.text
+            break
+    # Source code makes for noisy phrases; only use it without a README
+    phrases = keyphrases(readme or project_text)
+
+    signals = Counter()
+    for dep in dependencies:
+        signals[dep] += 3
+    for module, count in imports.items():
+        if module not in GENERIC_DEPENDENCIES:
+            signals[module] += min(count, 5)
+    for rank, phrase in enumerate(phrases):
+        for word in [phrase] + phrase.split():
+            signals[word] += max(1, MAX_KEYWORDS - rank) / 2
+
+    topic_scores = {
+        topic: sum(signals.get(term, 0) for term in terms)
+        for topic, terms in TOPIC_RULES.items()
+    }
+    best_topic, best_score = max(topic_scores.items(), key=lambda item: item[1])
+    topic = best_topic if best_score > 0 else (readme_title(snapshot) or "unknown")
+
+    keywords = []
+    for term in phrases[:MAX_KEYWORDS // 2] + dependencies + [m for m, _ in imports.most_common(20)] + phrases:
+        if term in GENERIC_DEPENDENCIES or term in keywords:
+            continue
+        keywords.append(term)
+        if len(keywords) >= MAX_KEYWORDS:
+            break
+
+    return {"topic": topic, "keywords": keywords}
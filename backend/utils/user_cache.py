@@ -0,0 +1,80 @@
+"""
+In-process cache of authenticated user records.
+
+auth_required resolves the JWT identity to a user document on every
+request; this keeps recently seen users in memory for AUTH_USER_CACHE_TTL
+seconds (LRU-bounded by AUTH_USER_CACHE_SIZE) so polling endpoints don't
+hit MongoDB each time. User.update_user invalidates the entry.
+"""
+import time
+import threading
+from collections import OrderedDict
+from .config_loader import get_settings
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class UserCache:
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else get_settings().get_float('AUTH_USER_CACHE_TTL', DEFAULT_TTL)
+        self.max_entries = max_entries or get_settings().get_int('AUTH_USER_CACHE_SIZE', DEFAULT_MAX_ENTRIES)
+        self.enabled = get_settings().get_bool('AUTH_USER_CACHE_ENABLED', True) and self.ttl > 0
+        self._entries = OrderedDict()  # user_id -> (expires_at, user)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["enabled"] = self.enabled
+        stats["ttl"] = self.ttl
+        return stats
+
+    def get(self, user_id):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._stats["hits"] += 1
+            # Callers get their own copy so request code can't alter the cache
+            return dict(entry[1])
+
+    def set(self, user_id, user):
+        if not self.enabled or user is None:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, dict(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, user_id, load):
+        """Return the cached user, or load(user_id) and remember it if found"""
+        user = self.get(user_id)
+        if user is None:
+            user = load(user_id)
+            self.set(user_id, user)
+        return user
+
+
+user_cache = UserCache()
@@ -0,0 +1,100 @@
+"""
+Per-job scratch directories.
+
+Every analysis gets its own directory under WORKSPACE_ROOT, so concurrent
+analyses never share (or delete) each other's checkouts. Directories are
+removed when the job finishes; ones left behind by crashed processes are
+swept on startup.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+from .config_loader import get_settings
+
+DEFAULT_WORKSPACE_ROOT = "/tmp/plaghunt_workspaces"
+DEFAULT_ORPHAN_MAX_AGE = 6 * 60 * 60   # seconds
+
+OWNER_FILE = ".owner.json"
+
+
+def get_workspace_root():
+    return get_settings().get('WORKSPACE_ROOT', DEFAULT_WORKSPACE_ROOT)
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Workspace:
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def create(cls, label=None):
+        """Create a fresh workspace owned by this process"""
+        root = get_workspace_root()
+        name = uuid.uuid4().hex if not label else f"{label}-{uuid.uuid4().hex[:12]}"
+        path = os.path.join(root, name)
+        os.makedirs(path)
+        with open(os.path.join(path, OWNER_FILE), "w") as f:
+            json.dump({
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "created_at": time.time()
+            }, f)
+        return cls(path)
+
+    def subdir(self, *parts):
+        """Return (without creating) a path inside the workspace"""
+        safe = [part.replace("/", "_") for part in parts]
+        return os.path.join(self.path, *safe)
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def sweep_orphaned_workspaces(max_age=None):
+    """Remove workspaces whose owning process is gone or that outlived max_age"""
+    root = get_workspace_root()
+    if not os.path.isdir(root):
+        return 0
+    max_age = max_age or get_settings().get_int('WORKSPACE_ORPHAN_MAX_AGE', DEFAULT_ORPHAN_MAX_AGE)
+    hostname = socket.gethostname()
+    now = time.time()
+    removed = 0
+
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, OWNER_FILE)) as f:
+                owner = json.load(f)
+        except (OSError, ValueError):
+            owner = {"created_at": os.path.getmtime(path)}
+
+        orphaned = now - owner.get("created_at", 0) > max_age
+        if owner.get("host") == hostname and owner.get("pid") and not _pid_alive(owner["pid"]):
+            orphaned = True
+
+        if orphaned:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+
+    if removed:
+        print(f"🧹 Removed {removed} orphaned workspaces")
+    return removed
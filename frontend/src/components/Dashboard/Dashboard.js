@@ -14,16 +14,22 @@ import {
   Code,
 } from "lucide-react";
 import AnalysisHistory from "./AnalysisHistory";
+import { streamAnalysis } from "./analysisStream";
 import dashboardBg from "../../assets/dashboard-bg.jpg";
 import { useTransition } from "react";
 
 const Dashboard = () => {
-  const { user, logout, api } = useAuth();
+  const { user, logout, token } = useAuth();
   const [activeTab, setActiveTab] = useState("analyze");
   const [repoUrl, setRepoUrl] = useState("");
   const [isAnalyzing, setIsAnalyzing] = useState(false);
   const [analysisResult, setAnalysisResult] = useState(null);
   const [analysisError, setAnalysisError] = useState(null);
+  // Live progress from the analysis stream
+  const [progress, setProgress] = useState(null);
+  const [candidateTotal, setCandidateTotal] = useState(0);
+  const [candidatesDone, setCandidatesDone] = useState(0);
+  const [partialResults, setPartialResults] = useState([]);
 
   const [optimisticAnalyses, addOptimisticAnalysis] = useOptimistic(
     [],
@@ -43,6 +49,10 @@ const Dashboard = () => {
       setIsAnalyzing(true);
       setAnalysisError(null);
       setAnalysisResult(null);
+      setProgress(null);
+      setCandidateTotal(0);
+      setCandidatesDone(0);
+      setPartialResults([]);
 
       const optimisticId = Date.now().toString();
       addOptimisticAnalysis({
@@ -53,16 +63,41 @@ const Dashboard = () => {
       });
 
       try {
-        const response = await api.post("/plagiarism/analyze", {
-          repo_url: repoUrl,
+        const result = await streamAnalysis({
+          token,
+          body: { repo_url: repoUrl },
+          onEvent: (event, data) => {
+            setProgress(data);
+            if (event === "search_complete") {
+              setCandidateTotal(data.candidate_total);
+            } else if (event === "candidate_compared") {
+              setCandidatesDone((done) => done + 1);
+              if (data.result) {
+                // Show each candidate as soon as it is scored, best match first
+                setPartialResults((results) =>
+                  [...results, data.result].sort(
+                    (a, b) =>
+                      b.similarity_scores.overall_similarity -
+                      a.similarity_scores.overall_similarity
+                  )
+                );
+              }
+            } else if (event === "candidate_failed") {
+              setCandidatesDone((done) => done + 1);
+            }
+          },
         });
 
-        setAnalysisResult(response.data);
+        setAnalysisResult(result);
       } catch (error) {
+        if (error.status === 401) {
+          logout();
+        }
         setAnalysisError(
-          error.response?.data?.error || "Analysis failed. Please try again."
+          error.data?.error || "Analysis failed. Please try again."
         );
       } finally {
+        setProgress(null);
         setIsAnalyzing(false);
       }
     });
@@ -206,6 +241,72 @@ const Dashboard = () => {
                 </button>
               </form>
 
+              {isAnalyzing && progress && (
+                <div className="mt-6 space-y-4 rounded-lg border border-gray-600 bg-black/70 p-6">
+                  <div className="flex items-center gap-3 text-yellow-300">
+                    <Loader2 className="h-5 w-5 animate-spin" />
+                    <span>{progress.message}</span>
+                  </div>
+
+                  {candidateTotal > 0 && (
+                    <div>
+                      <div className="mb-1 flex justify-between text-sm text-gray-300">
+                        <span>Candidates compared</span>
+                        <span>
+                          {candidatesDone} / {candidateTotal}
+                        </span>
+                      </div>
+                      <div className="h-2 w-full rounded-full bg-gray-700">
+                        <div
+                          className="h-2 rounded-full bg-yellow-500 transition-all"
+                          style={{
+                            width: `${(candidatesDone / candidateTotal) * 100}%`,
+                          }}
+                        />
+                      </div>
+                    </div>
+                  )}
+
+                  {partialResults.length > 0 && (
+                    <div className="space-y-2">
+                      {partialResults.map((result) => (
+                        <div
+                          key={result.candidate_repo.name}
+                          className="flex items-center justify-between rounded-lg border border-gray-700 p-3 text-sm"
+                        >
+                          <a
+                            href={result.candidate_repo.url}
+                            target="_blank"
+                            rel="noopener noreferrer"
+                            className="text-yellow-400 hover:text-yellow-300"
+                          >
+                            {result.candidate_repo.name}
+                          </a>
+                          <span
+                            className={`px-2 py-1 rounded text-xs font-medium ${
+                              result.risk_assessment?.risk_level === "Critical"
+                                ? "bg-red-600/30 text-red-300"
+                                : result.risk_assessment?.risk_level === "High"
+                                ? "bg-red-500/20 text-red-400"
+                                : result.risk_assessment?.risk_level ===
+                                  "Medium"
+                                ? "bg-yellow-500/20 text-yellow-400"
+                                : "bg-green-500/20 text-green-400"
+                            }`}
+                          >
+                            {result.similarity_scores.overall_similarity.toFixed(
+                              1
+                            )}
+                            % • {result.risk_assessment?.risk_level || "Low"}{" "}
+                            Risk
+                          </span>
+                        </div>
+                      ))}
+                    </div>
+                  )}
+                </div>
+              )}
+
               {analysisError && (
                 <div className="mt-6 flex items-center gap-3 rounded-lg border border-red-500/30 bg-red-500/10 p-3 text-sm text-red-700 dark:text-red-400">
                   <AlertCircle className="h-5 w-5 flex-shrink-0" />
@@ -0,0 +1,64 @@
+import API_BASE_URL from "../../config/api";
+
+// Reads the Server-Sent Events of POST /plagiarism/analyze/stream.
+// EventSource can't send the Authorization header, so this uses fetch and
+// parses the event stream by hand. onEvent(event, data) is called for
+// every progress event; resolves with the final result payload and
+// rejects with an Error carrying `status` and `data` otherwise.
+export const streamAnalysis = async ({ token, body, onEvent, signal }) => {
+  const response = await fetch(`${API_BASE_URL}/plagiarism/analyze/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(body),
+    signal,
+  });
+
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}));
+    throw Object.assign(new Error(data.error || "Analysis failed"), {
+      status: response.status,
+      data,
+    });
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Messages are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      const dataLines = [];
+      for (const line of message.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+      }
+      if (dataLines.length === 0) continue; // keepalive comment
+
+      const data = JSON.parse(dataLines.join("\n"));
+      if (event === "result") return data;
+      if (event === "error") {
+        throw Object.assign(new Error(data.error || "Analysis failed"), {
+          status: data.http_status,
+          data,
+        });
+      }
+      onEvent?.(event, data);
+    }
+  }
+
+  throw new Error("Connection closed before the analysis finished");
+};